@@ -7,7 +7,7 @@ Run: python examples/minimal_rp_sim.py
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 
 # Primitives for clarity
@@ -40,6 +40,7 @@ class Relation:
 class World:
     entities: Dict[str, Entity]
     relations: List[Relation]
+    gco_report: Dict[str, Any] = field(default_factory=dict)
 
 
 def apply_geometry(world: World) -> Dict[str, Dict[str, float]]:
@@ -59,9 +60,9 @@ def apply_geometry(world: World) -> Dict[str, Dict[str, float]]:
 
 
 def apply_constraint(world: World) -> None:
-    """Clamp positions to bounds."""
+    """Clamp positions to bounds (other constraints, e.g. graph edges, are left alone)."""
     for rel in world.relations:
-        if rel.primitive != CONSTRAINT:
+        if rel.primitive != CONSTRAINT or "xmin" not in rel.payload:
             continue
         ent = world.entities[rel.source]
         xmin, xmax = rel.payload["xmin"], rel.payload["xmax"]
@@ -106,17 +107,91 @@ def apply_meta(world: World) -> None:
     world.entities[new_id] = Entity(new_id, "Food", {"x": 5.0, "y": 5.0})
 
 
-def run_gco(world: World) -> None:
-    """GCO closure: prune duplicate relations."""
+# A closure step repairs the relations touching `scope` (None: all of them)
+# and returns (entity ids its repairs touched, relations examined)
+ClosureStep = Callable[[World, "set[str] | None"], Tuple["set[str]", int]]
+GCO_MAX_PASSES = 8  # Runs of one step before the closure is reported as not converged
+
+
+def dedupe_relations(world: World, scope: set[str] | None) -> Tuple[set[str], int]:
+    """Prune duplicate relations."""
     seen: set[Tuple[str, str, str | None, Tuple[Tuple[str, float], ...]]] = set()
-    deduped: List[Relation] = []
+    kept: List[Relation] = []
+    touched: set[str] = set()
+    examined = 0
     for rel in world.relations:
+        if scope is not None and rel.source not in scope:
+            kept.append(rel)
+            continue
+        examined += 1
         key = (rel.primitive, rel.source, rel.target, tuple(sorted(rel.payload.items())))
         if key in seen:
+            touched.add(rel.source)
             continue
         seen.add(key)
-        deduped.append(rel)
-    world.relations = deduped
+        kept.append(rel)
+    world.relations = kept
+    return touched, examined
+
+
+def remove_invalid_relations(world: World, scope: set[str] | None) -> Tuple[set[str], int]:
+    """Drop relations whose source or target entity doesn't exist."""
+    kept: List[Relation] = []
+    touched: set[str] = set()
+    examined = 0
+    for rel in world.relations:
+        if scope is not None and rel.source not in scope and rel.target not in scope:
+            kept.append(rel)
+            continue
+        examined += 1
+        if rel.source not in world.entities or (rel.target is not None and rel.target not in world.entities):
+            touched.update(e for e in (rel.source, rel.target) if e is not None)
+            continue
+        kept.append(rel)
+    world.relations = kept
+    return touched, examined
+
+
+CLOSURE_STEPS: List[ClosureStep] = [dedupe_relations, remove_invalid_relations]
+
+
+def run_gco(world: World) -> Dict[str, Any]:
+    """
+    GCO closure as a worklist fixed point, run like toy_game's run_gco:
+    every step runs once, then a step that repaired something re-enqueues
+    the other steps, scoped to the entities it touched, until nothing is
+    queued. A step that is already queued has the new ids merged into its
+    scope rather than being queued twice, and steps run in CLOSURE_STEPS
+    order. The report counts step runs (iterations), re-runs (requeued),
+    relations examined (work) and whether it converged within
+    GCO_MAX_PASSES runs per step.
+    """
+    report: Dict[str, Any] = {"iterations": 0, "requeued": 0, "work": 0, "converged": True}
+    queued: Dict[str, "set[str] | None"] = {fn.__name__: None for fn in CLOSURE_STEPS}  # step -> scope (None: all)
+    passes: Dict[str, int] = {}
+    while queued:
+        fn = next(fn for fn in CLOSURE_STEPS if fn.__name__ in queued)
+        scope = queued.pop(fn.__name__)
+        passes[fn.__name__] = passes.get(fn.__name__, 0) + 1
+        if passes[fn.__name__] > GCO_MAX_PASSES:
+            report["converged"] = False
+            break
+        touched, examined = fn(world, scope)
+        report["iterations"] += 1
+        report["work"] += examined
+        if not touched:
+            continue
+        for other in CLOSURE_STEPS:
+            if other is fn:
+                continue
+            if other.__name__ in queued:
+                pending = queued[other.__name__]
+                queued[other.__name__] = None if pending is None else pending | touched
+            else:
+                queued[other.__name__] = set(touched)
+                report["requeued"] += 1
+    world.gco_report = report
+    return report
 
 
 def step(world: World) -> None:
@@ -144,7 +219,7 @@ def demo() -> None:
     print("Initial:", {k: e.state for k, e in world.entities.items()})
     for i in range(4):
         step(world)
-        print(f"After step {i+1}:", {k: e.state for k, e in world.entities.items()})
+        print(f"After step {i+1}:", {k: e.state for k, e in world.entities.items()}, world.gco_report)
 
 
 if __name__ == "__main__":
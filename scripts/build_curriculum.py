@@ -15,7 +15,7 @@ import argparse
 import json
 import random
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA = ROOT / "data"
@@ -48,6 +48,16 @@ def write_jsonl(path: Path, rows: List[dict]) -> None:
             f.write("\n")
 
 
+def curriculum_rows(seeds: Iterable[dict], train_rows: Iterable[dict], shuffle_train: bool, seed: int) -> Iterator[dict]:
+    """Seeds in their fixed order, then train rows (shuffled only if asked)."""
+    yield from seeds
+    if shuffle_train:
+        train_rows = list(train_rows)
+        rng = random.Random(seed)
+        rng.shuffle(train_rows)
+    yield from train_rows
+
+
 def build_curriculum(shuffle_train: bool, seed: int) -> None:
     seeds: List[dict] = []
     for sf in SEED_FILES:
@@ -55,12 +65,7 @@ def build_curriculum(shuffle_train: bool, seed: int) -> None:
             raise FileNotFoundError(f"Seed file missing: {sf}")
         seeds.extend(load_jsonl(sf))
 
-    train_rows = load_jsonl(TRAIN_FILE)
-    if shuffle_train:
-        rng = random.Random(seed)
-        rng.shuffle(train_rows)
-
-    curriculum_train = seeds + train_rows
+    curriculum_train = list(curriculum_rows(seeds, load_jsonl(TRAIN_FILE), shuffle_train, seed))
     write_jsonl(OUT_TRAIN, curriculum_train)
 
     eval_rows: List[dict] = []
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Build the training dataset in one run: extract -> filter -> split -> curriculum -> preprocess.
+
+Run:
+  python scripts/build_dataset.py
+  python scripts/build_dataset.py --materialize all
+  python scripts/build_dataset.py --materialize split curriculum --shuffle-train --keep-metadata
+  python scripts/build_dataset.py --no-cache
+
+The five dataset scripts still work on their own. This runner chains the
+same functions as row iterators instead of going through their intermediate
+files:
+
+  extract     chunks          data/raw/rp_chunks.jsonl
+  filter      clean           data/raw/rp_chunks_clean.jsonl
+  split       train, test     data/train.jsonl, data/test.jsonl
+  curriculum  train, eval     data/curriculum/{train,eval}_curriculum.jsonl
+  preprocess  train, eval     data/processed/{train,eval}_prompts.jsonl
+
+Only the preprocess outputs are written by default. --materialize also
+writes the listed stages' outputs to the paths above. Every written file is
+byte-identical to what the scripts produce. Rows stream from stage to stage.
+Two places have to hold a whole row list: split, which shuffles, and
+curriculum with --shuffle-train.
+
+Caching: each stage's outputs are kept under data/cache/pipeline/<stage>/.
+Extract also keeps its per-file chunk cache in data/cache/extract, the same
+one extract_rp_chunks.py uses. With --cache-dir DIR it moves to DIR/../extract,
+or wherever --extract-cache-dir points.
+The cache key is a hash of:
+  - the stage's code,
+  - its parameters,
+  - the files it reads directly (markdown sources, seeds, eval),
+  - the content hashes of its upstream outputs.
+A stage whose key is unchanged is served from the cache without running.
+Because keys follow content, editing one seed file reruns only curriculum
+and preprocess. A corpus edit that leaves the filtered rows unchanged stops
+at filter. --no-cache streams the whole chain with no cache and no
+intermediate files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import build_curriculum
+import extract_rp_chunks
+import filter_rp_chunks
+import preprocess_for_training
+import split_rp_chunks
+from extract_rp_chunks import ChunkCache, _write_atomic, collect_sources, display_path, file_digest, iter_rendered
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = Path(__file__).resolve().parent
+CACHE_DIR = ROOT / "data" / "cache" / "pipeline"
+
+Rows = Iterator[dict]
+
+
+@dataclass
+class Stage:
+    name: str
+    outputs: Dict[str, Path]  # Output name -> path written when materialized
+    run: Callable[[Dict[str, Rows]], Dict[str, Rows]]  # Upstream rows by input name -> rows by output name
+    inputs: List[str] = field(default_factory=list)  # Upstream outputs, "stage.output"
+    files: List[Path] = field(default_factory=list)  # Files the stage reads itself
+    code: List[Path] = field(default_factory=list)  # Sources that shape the output
+    params: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class StageReport:
+    name: str
+    status: str  # "cached", "ran" or "streamed"
+    rows: Dict[str, int]
+    seconds: float
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ROW I/O
+# ═══════════════════════════════════════════════════════════════════════════════
+def iter_rows(path: Path) -> Rows:
+    """JSONL rows of `path`, one line at a time (blank lines skipped)."""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def render_row(row: dict) -> str:
+    """The scripts' JSONL line format."""
+    return json.dumps(row, ensure_ascii=True) + "\n"
+
+
+def write_rows(path: Path, rows: Iterable[dict]) -> Dict[str, object]:
+    """Stream `rows` into `path` atomically; returns the row count and content hash."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    h = hashlib.sha256()
+    count = 0
+    with tmp.open("w", encoding="utf-8") as f:
+        for row in rows:
+            line = render_row(row)
+            f.write(line)
+            h.update(line.encode("utf-8"))
+            count += 1
+    os.replace(tmp, path)
+    return {"rows": count, "sha256": h.hexdigest()}
+
+
+def tee_rows(path: Path, rows: Rows, counts: Dict[str, int], name: str) -> Rows:
+    """Pass `rows` through while writing them to `path` (and counting them)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts[name] = 0
+    with path.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(render_row(row))
+            counts[name] += 1
+            yield row
+
+
+def counted(rows: Rows, counts: Dict[str, int], name: str) -> Rows:
+    counts[name] = 0
+    for row in rows:
+        counts[name] += 1
+        yield row
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STAGES
+# ═══════════════════════════════════════════════════════════════════════════════
+def build_stages(sources: Sequence[Path], workers: int, chunk_cache: Optional[ChunkCache],
+                 shuffle_train: bool, seed: int, keep_metadata: bool) -> List[Stage]:
+    """The dataset DAG in run order; each stage calls the functions of its script."""
+    runner = Path(__file__).resolve()
+
+    def extract(_inputs: Dict[str, Rows]) -> Dict[str, Rows]:
+        def chunks() -> Rows:
+            for _count, text in iter_rendered(sources, workers, cache=chunk_cache):
+                for line in text.splitlines():
+                    yield json.loads(line)
+            if chunk_cache is not None:
+                chunk_cache.save()
+        return {"chunks": chunks()}
+
+    def filter_(inputs: Dict[str, Rows]) -> Dict[str, Rows]:
+        return {"clean": filter_rp_chunks.filter_rows(inputs["extract.chunks"])}
+
+    def split(inputs: Dict[str, Rows]) -> Dict[str, Rows]:
+        train, test = split_rp_chunks.split_rows(list(inputs["filter.clean"]))
+        return {"train": iter(train), "test": iter(test)}
+
+    def curriculum(inputs: Dict[str, Rows]) -> Dict[str, Rows]:
+        def seeds() -> Rows:
+            for sf in build_curriculum.SEED_FILES:
+                yield from iter_rows(sf)
+
+        def evals() -> Rows:
+            for ef in build_curriculum.EVAL_FILES:
+                yield from iter_rows(ef)
+        train = build_curriculum.curriculum_rows(seeds(), inputs["split.train"], shuffle_train, seed)
+        return {"train": train, "eval": evals()}
+
+    def preprocess(inputs: Dict[str, Rows]) -> Dict[str, Rows]:
+        transform_row = preprocess_for_training.transform_row
+        return {"train": (transform_row(r, keep_metadata) for r in inputs["curriculum.train"]),
+                "eval": (transform_row(r, keep_metadata) for r in inputs["curriculum.eval"])}
+
+    def script(module: ModuleType) -> Path:
+        return Path(module.__file__).resolve()
+
+    tagger = SCRIPTS / "rp_tagger.py"
+    return [
+        Stage("extract", {"chunks": extract_rp_chunks.OUTPUT_PATH}, extract,
+              files=list(sources), code=[runner, script(extract_rp_chunks), tagger]),
+        Stage("filter", {"clean": filter_rp_chunks.OUT_PATH}, filter_, inputs=["extract.chunks"],
+              code=[runner, script(filter_rp_chunks), tagger]),
+        Stage("split", {"train": split_rp_chunks.TRAIN_OUT, "test": split_rp_chunks.TEST_OUT}, split,
+              inputs=["filter.clean"], code=[runner, script(split_rp_chunks)],
+              params={"test_fraction": split_rp_chunks.TEST_FRACTION, "seed": split_rp_chunks.SEED}),
+        Stage("curriculum", {"train": build_curriculum.OUT_TRAIN, "eval": build_curriculum.OUT_EVAL}, curriculum,
+              inputs=["split.train"], files=[*build_curriculum.SEED_FILES, *build_curriculum.EVAL_FILES],
+              code=[runner, script(build_curriculum)], params={"shuffle_train": shuffle_train, "seed": seed}),
+        Stage("preprocess", {"train": preprocess_for_training.OUT_DIR / "train_prompts.jsonl",
+                             "eval": preprocess_for_training.OUT_DIR / "eval_prompts.jsonl"}, preprocess,
+              inputs=["curriculum.train", "curriculum.eval"], code=[runner, script(preprocess_for_training)],
+              params={"keep_metadata": keep_metadata}),
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════════════════════
+def stage_key(stage: Stage, input_hashes: Dict[str, str]) -> str:
+    """Hash of everything a stage's output depends on."""
+    h = hashlib.sha256()
+    h.update(stage.name.encode())
+    for code in stage.code:
+        h.update(b"\0code\0" + file_digest(code).encode())
+    h.update(b"\0params\0" + json.dumps(stage.params, sort_keys=True).encode())
+    for path in stage.files:
+        h.update(f"\0file\0{display_path(path)}\0{file_digest(path)}".encode())
+    for name in stage.inputs:
+        h.update(f"\0input\0{name}\0{input_hashes[name]}".encode())
+    return h.hexdigest()[:32]
+
+
+class StageCache:
+    """
+    data/cache/pipeline/<stage>/<key>.<output>.jsonl plus <key>.json, which
+    records each output's row count and content hash. The .json is written
+    last, so an interrupted stage never looks complete. Only the latest key
+    of each stage is kept.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+
+    def output_path(self, stage: Stage, key: str, output: str) -> Path:
+        return self.cache_dir / stage.name / f"{key}.{output}.jsonl"
+
+    def lookup(self, stage: Stage, key: str) -> Optional[Dict[str, Dict[str, object]]]:
+        """Output records for `key`, or None when the stage has to run."""
+        meta = self.cache_dir / stage.name / f"{key}.json"
+        if not meta.exists():
+            return None
+        outputs = json.loads(meta.read_text(encoding="utf-8"))["outputs"]
+        if outputs.keys() != stage.outputs.keys():
+            return None
+        if not all(self.output_path(stage, key, name).exists() for name in outputs):
+            return None
+        return outputs
+
+    def store(self, stage: Stage, key: str, results: Dict[str, Rows]) -> Dict[str, Dict[str, object]]:
+        outputs = {name: write_rows(self.output_path(stage, key, name), rows) for name, rows in results.items()}
+        _write_atomic(self.cache_dir / stage.name / f"{key}.json",
+                      json.dumps({"outputs": outputs}, indent=1, sort_keys=True).encode("utf-8"))
+        for old in (self.cache_dir / stage.name).iterdir():
+            if not old.name.startswith(key + "."):
+                old.unlink()
+        return outputs
+
+
+def run_cached(stages: Sequence[Stage], cache: StageCache, materialize: Iterable[str],
+               force: Iterable[str] = ()) -> List[StageReport]:
+    """
+    Run stages in order, each one streaming its inputs from upstream cache
+    files into its own. Stages whose key is unchanged are skipped.
+    """
+    materialize, force = set(materialize), set(force)
+    hashes: Dict[str, str] = {}
+    files: Dict[str, Path] = {}
+    reports: List[StageReport] = []
+    for stage in stages:
+        started = time.perf_counter()
+        key = stage_key(stage, hashes)
+        outputs = None if stage.name in force else cache.lookup(stage, key)
+        status = "cached"
+        if outputs is None:
+            results = stage.run({name: iter_rows(files[name]) for name in stage.inputs})
+            outputs = cache.store(stage, key, results)
+            status = "ran"
+        for name in stage.outputs:
+            record = outputs[name]
+            hashes[f"{stage.name}.{name}"] = str(record["sha256"])
+            files[f"{stage.name}.{name}"] = cache.output_path(stage, key, name)
+            if stage.name in materialize:
+                stage.outputs[name].parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(cache.output_path(stage, key, name), stage.outputs[name])
+        rows = {name: int(outputs[name]["rows"]) for name in stage.outputs}
+        reports.append(StageReport(stage.name, status, rows, time.perf_counter() - started))
+    return reports
+
+
+def run_streaming(stages: Sequence[Stage], materialize: Iterable[str]) -> List[StageReport]:
+    """
+    Chain the stages as generators with no cache. Materialized outputs are
+    written as rows pass through; whatever is left unconsumed at the end
+    (the final outputs, split's test rows) is drained.
+    """
+    materialize = set(materialize)
+    started = time.perf_counter()
+    streams: Dict[str, Rows] = {}
+    counts: Dict[str, Dict[str, int]] = {stage.name: {} for stage in stages}
+    for stage in stages:
+        results = stage.run({name: streams.pop(name) for name in stage.inputs})
+        for name, rows in results.items():
+            if stage.name in materialize:
+                rows = tee_rows(stage.outputs[name], rows, counts[stage.name], name)
+            else:
+                rows = counted(rows, counts[stage.name], name)
+            streams[f"{stage.name}.{name}"] = rows
+    for rows in streams.values():
+        for _ in rows:
+            pass
+    seconds = time.perf_counter() - started
+    return [StageReport(stage.name, "streamed", counts[stage.name], seconds) for stage in stages]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ═══════════════════════════════════════════════════════════════════════════════
+def main() -> None:
+    p = argparse.ArgumentParser(description="Build the dataset end to end with per-stage caching.")
+    p.add_argument("--materialize", nargs="+", default=[],
+                   choices=["extract", "filter", "split", "curriculum", "all"],
+                   help="Also write these stages' outputs to their usual paths.")
+    p.add_argument("--shuffle-train", action="store_true", help="Shuffle train rows (seeds remain ordered).")
+    p.add_argument("--seed", type=int, default=42, help="Random seed for train shuffling.")
+    p.add_argument("--keep-metadata", action="store_true", help="Keep metadata/id in the prompts.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes.")
+    p.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    p.add_argument("--extract-cache-dir", type=Path, default=None,
+                   help="Per-file chunk cache (default: extract/ next to --cache-dir).")
+    p.add_argument("--no-cache", action="store_true", help="Stream every stage without caching.")
+    p.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="Rerun these stages even if cached.")
+    args = p.parse_args()
+
+    extract_cache_dir = args.extract_cache_dir or args.cache_dir.parent / "extract"
+    chunk_cache = None if args.no_cache else ChunkCache(extract_cache_dir)
+    stages = build_stages(collect_sources(), args.workers, chunk_cache,
+                          args.shuffle_train, args.seed, args.keep_metadata)
+    materialize = {stage.name for stage in stages} if "all" in args.materialize else set(args.materialize)
+    materialize.add("preprocess")
+    if args.no_cache:
+        reports = run_streaming(stages, materialize)
+    else:
+        reports = run_cached(stages, StageCache(args.cache_dir), materialize, args.force)
+
+    for report in reports:
+        rows = ", ".join(f"{name} {count}" for name, count in report.rows.items())
+        timing = f"{report.seconds:6.2f}s" if report.status != "streamed" else ""
+        print(f"{report.name:<11} {report.status:<8} {timing:>7}  {rows}")
+    for stage in stages:
+        if stage.name in materialize:
+            for path in stage.outputs.values():
+                print(f"Wrote {path.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
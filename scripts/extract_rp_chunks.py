@@ -9,17 +9,43 @@ Outputs JSONL at data/raw/rp_chunks.jsonl with fields:
   - text: normalized chunk text
   - primitive_tags: list of primitive names inferred from the text
   - start_line / end_line: original line numbers (best-effort)
+
+Run:
+  python scripts/extract_rp_chunks.py
+  python scripts/extract_rp_chunks.py --workers 8 --source-dir big_corpus/ --output /tmp/chunks.jsonl
+
+Streaming: files are read line by line, and chunks are generated lazily.
+Source files are fanned out across a process pool. Each worker returns one
+file's chunks already rendered as JSONL. Results are written in source
+order as soon as they are next in line, while later files are still being
+processed. At most a small window of files is in flight, so memory stays
+bounded by a few files rather than by the corpus.
+
+Incremental: data/cache/extract/manifest.json records each source's
+content hash, and the JSONL it produced is kept next to it. A file whose
+hash (and the extractor's own code) is unchanged is served from the cache,
+so only edited files are re-chunked. The output is byte-identical to a full
+rebuild (--no-cache).
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
 import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from rp_tagger import PrimitiveTagger
 
 ROOT = Path(__file__).resolve().parent.parent
 OUTPUT_PATH = ROOT / "data" / "raw" / "rp_chunks.jsonl"
+CACHE_DIR = ROOT / "data" / "cache" / "extract"
 
 SOURCE_DIR = ROOT / "Relational Primitives"
 EXTRA_FILES = [ROOT / "Relational Primitives.md"]
@@ -34,17 +60,14 @@ PRIMITIVE_PATTERNS: Dict[str, Sequence[str]] = {
     "META": [r"\bmeta\b", r"\bmeta-?rel", r"\bmeta[- ]?relation", r"\brules about rules", r"\bhandler", r"\bhandlers"],
 }
 
+PRIMITIVE_TAGGER = PrimitiveTagger(PRIMITIVE_PATTERNS)
+
 SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\\[])")
 
 
 def detect_primitives(text: str) -> List[str]:
-    """Return primitive tags found in the text (case-insensitive)."""
-    lowered = text.lower()
-    tags = []
-    for name, patterns in PRIMITIVE_PATTERNS.items():
-        if any(re.search(pat, lowered) for pat in patterns):
-            tags.append(name)
-    return tags
+    """Return primitive tags found in the text (case-insensitive), in one regex pass."""
+    return PRIMITIVE_TAGGER.tags(text)
 
 
 def normalize_whitespace(text: str) -> str:
@@ -108,6 +131,13 @@ def chunk_by_words(text: str, max_len: int) -> List[str]:
     return chunks
 
 
+def iter_lines(path: Path) -> Iterator[str]:
+    """Lines of a file without reading it whole (same splitting as read_text().splitlines())."""
+    with path.open() as f:
+        for raw in f:
+            yield from raw.splitlines()
+
+
 def iter_paragraphs_with_context(path: Path) -> Iterable[Dict[str, object]]:
     heading_stack: List[str] = []
     paragraph_lines: List[str] = []
@@ -137,7 +167,7 @@ def iter_paragraphs_with_context(path: Path) -> Iterable[Dict[str, object]]:
         return results
 
     current_line = 0
-    for current_line, raw_line in enumerate(path.read_text().splitlines(), start=1):
+    for current_line, raw_line in enumerate(iter_lines(path), start=1):
         line = raw_line.rstrip("\n")
         heading_match = re.match(r"^(#+)\s*(.*)", line)
         if heading_match:
@@ -160,41 +190,203 @@ def iter_paragraphs_with_context(path: Path) -> Iterable[Dict[str, object]]:
     yield from flush(current_line)
 
 
-def collect_sources() -> List[Path]:
+def collect_sources(source_dir: Path = SOURCE_DIR, extra_files: Sequence[Path] = EXTRA_FILES) -> List[Path]:
     sources = []
-    if SOURCE_DIR.exists():
-        sources.extend(sorted(SOURCE_DIR.glob("*.md")))
-    for extra in EXTRA_FILES:
+    if source_dir.exists():
+        sources.extend(sorted(source_dir.glob("*.md")))
+    for extra in extra_files:
         if extra.exists():
             sources.append(extra)
     return sources
 
 
-def extract_chunks() -> List[Dict[str, object]]:
-    chunks: List[Dict[str, object]] = []
-    for source in collect_sources():
-        for idx, para in enumerate(iter_paragraphs_with_context(source)):
-            chunk = {
-                "id": f"{source.stem}:{idx:04d}",
-                "source_path": str(source.relative_to(ROOT)),
-                "section": para["section"],
-                "text": para["text"],
-                "primitive_tags": detect_primitives(para["text"]),
-                "start_line": para["start_line"],
-                "end_line": para["end_line"],
-            }
-            chunks.append(chunk)
-    return chunks
+def display_path(source: Path) -> str:
+    """source_path as recorded in chunks: relative to the repo root when inside it."""
+    try:
+        return str(source.relative_to(ROOT))
+    except ValueError:
+        return str(source)
+
+
+def iter_file_chunks(source: Path) -> Iterator[Dict[str, object]]:
+    """Chunks of one markdown file, generated as the file is read."""
+    source_path = display_path(source)
+    for idx, para in enumerate(iter_paragraphs_with_context(source)):
+        yield {
+            "id": f"{source.stem}:{idx:04d}",
+            "source_path": source_path,
+            "section": para["section"],
+            "text": para["text"],
+            "primitive_tags": detect_primitives(para["text"]),
+            "start_line": para["start_line"],
+            "end_line": para["end_line"],
+        }
+
+
+def render_chunk(chunk: Dict[str, object]) -> str:
+    return json.dumps(chunk, ensure_ascii=True) + "\n"
+
+
+def render_file(source: Path) -> Tuple[int, str]:
+    """Worker task: one file's chunks as JSONL text (cheaper to ship back than dicts)."""
+    lines = [render_chunk(chunk) for chunk in iter_file_chunks(source)]
+    return len(lines), "".join(lines)
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file's bytes, read in blocks."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def extractor_fingerprint() -> str:
+    """Hash of the code that shapes the output; a change invalidates every cached file."""
+    h = hashlib.sha256()
+    for code in (Path(__file__), Path(__file__).with_name("rp_tagger.py")):
+        h.update(code.read_bytes())
+    return h.hexdigest()
+
+
+class ChunkCache:
+    """
+    Manifest of source path -> content hash, chunk count and cached JSONL
+    blob. Blobs are named by a hash of (source path, content hash), so an
+    edited file gets a new blob and the stale one is pruned on save().
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.manifest_path = cache_dir / "manifest.json"
+        self.fingerprint = extractor_fingerprint()
+        self.files: Dict[str, Dict[str, object]] = {}
+        self.used: Dict[str, Dict[str, object]] = {}  # Entries for this run's sources
+        self.hits = 0
+        self.misses = 0
+        if self.manifest_path.exists():
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("extractor") == self.fingerprint:
+                self.files = manifest.get("files", {})
+
+    @staticmethod
+    def blob_name(source_path: str, digest: str) -> str:
+        return hashlib.sha256(f"{source_path}\0{digest}".encode()).hexdigest()[:32] + ".jsonl"
+
+    def lookup(self, source: Path) -> Tuple[str, Optional[Tuple[int, str]]]:
+        """(content hash, cached render_file() result or None)."""
+        source_path = display_path(source)
+        digest = file_digest(source)
+        entry = self.files.get(source_path)
+        if entry is not None and entry["sha256"] == digest:
+            blob = self.cache_dir / "blobs" / str(entry["blob"])
+            if blob.exists():
+                self.hits += 1
+                self.used[source_path] = entry
+                return digest, (int(entry["chunks"]), blob.read_bytes().decode("utf-8"))
+        self.misses += 1
+        return digest, None
+
+    def store(self, source: Path, digest: str, result: Tuple[int, str]) -> None:
+        source_path = display_path(source)
+        name = self.blob_name(source_path, digest)
+        _write_atomic(self.cache_dir / "blobs" / name, result[1].encode("utf-8"))
+        self.used[source_path] = {"sha256": digest, "chunks": result[0], "blob": name}
+
+    def save(self) -> None:
+        """Write the manifest for this run's sources and delete blobs nothing refers to."""
+        manifest = {"extractor": self.fingerprint, "files": self.used}
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8"))
+        live = {str(entry["blob"]) for entry in self.used.values()}
+        for blob in (self.cache_dir / "blobs").glob("*.jsonl"):
+            if blob.name not in live:
+                blob.unlink()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def iter_rendered(sources: Sequence[Path], workers: int = 1, window: int = 0,
+                  cache: Optional[ChunkCache] = None) -> Iterator[Tuple[int, str]]:
+    """
+    render_file() results in source order. With workers > 1 files run in a
+    process pool, at most `window` (default 2 * workers) in flight; each
+    result is yielded as soon as every earlier file's has been. With a
+    cache, unchanged files are read from it and only the rest are rendered.
+    """
+    def cached(source: Path) -> Tuple[str, Optional[Tuple[int, str]]]:
+        return cache.lookup(source) if cache is not None else ("", None)
+
+    if workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            digest, result = cached(source)
+            if result is None:
+                result = render_file(source)
+                if cache is not None:
+                    cache.store(source, digest, result)
+            yield result
+        return
+    window = window or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def start(source: Path) -> Tuple[Path, str, Union[Future, Tuple[int, str]]]:
+            digest, result = cached(source)
+            return source, digest, result if result is not None else pool.submit(render_file, source)
+
+        todo = iter(sources)
+        pending: Deque[Tuple[Path, str, Union[Future, Tuple[int, str]]]] = deque(
+            start(source) for source in islice(todo, window))
+        while pending:
+            source, digest, item = pending.popleft()
+            if isinstance(item, Future):
+                item = item.result()
+                if cache is not None:
+                    cache.store(source, digest, item)
+            nxt: Optional[Path] = next(todo, None)
+            if nxt is not None:
+                pending.append(start(nxt))
+            yield item
+
+
+def extract_chunks(sources: Optional[Sequence[Path]] = None) -> Iterator[Dict[str, object]]:
+    """Every chunk of the corpus, lazily, in source order (single process)."""
+    for source in collect_sources() if sources is None else sources:
+        yield from iter_file_chunks(source)
+
+
+def write_chunks(sources: Sequence[Path], output: Path, workers: int = 1,
+                 cache: Optional[ChunkCache] = None) -> int:
+    """Stream every source's chunks into `output`; returns the chunk count."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+    with output.open("w", encoding="utf-8") as f:
+        for count, text in iter_rendered(sources, workers, cache=cache):
+            f.write(text)
+            total += count
+    if cache is not None:
+        cache.save()
+    return total
 
 
 def main() -> None:
-    chunks = extract_chunks()
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with OUTPUT_PATH.open("w", encoding="utf-8") as f:
-        for chunk in chunks:
-            f.write(json.dumps(chunk, ensure_ascii=True))
-            f.write("\n")
-    print(f"Wrote {len(chunks)} chunks to {OUTPUT_PATH}")
+    p = argparse.ArgumentParser(description="Extract tagged chunks from the RP markdown corpus.")
+    p.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    p.add_argument("--source-dir", type=Path, default=None,
+                   help="Markdown directory to chunk instead of the corpus (no extra files).")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes.")
+    p.add_argument("--cache-dir", type=Path, default=CACHE_DIR)
+    p.add_argument("--no-cache", action="store_true", help="Re-chunk every file (full rebuild).")
+    args = p.parse_args()
+
+    sources = collect_sources() if args.source_dir is None else collect_sources(args.source_dir, [])
+    cache = None if args.no_cache else ChunkCache(args.cache_dir)
+    total = write_chunks(sources, args.output, args.workers, cache)
+    reused = f" ({cache.hits} of {len(sources)} files from cache)" if cache is not None else ""
+    print(f"Wrote {total} chunks to {args.output}{reused}")
 
 
 if __name__ == "__main__":
@@ -16,7 +16,9 @@ from __future__ import annotations
 import json
 import re
 from pathlib import Path
-from typing import List, Sequence
+from typing import Iterable, Iterator, List, Sequence
+
+from rp_tagger import PrimitiveTagger
 
 ROOT = Path(__file__).resolve().parent.parent
 RAW_PATH = ROOT / "data" / "raw" / "rp_chunks.jsonl"
@@ -31,6 +33,7 @@ HINT_PATTERNS: dict[str, Sequence[str]] = {
     "EPISTEMIC": [r"\bepistemic", r"\binformational", r"\bmeasurement", r"\buncertainty", r"\bobserv"],
     "META": [r"\bmeta", r"\bcross[- ]theory", r"\bfunctor", r"\badjunction", r"\brules about rules"],
 }
+HINT_TAGGER = PrimitiveTagger(HINT_PATTERNS)
 SOURCE_DEFAULT_TAGS: dict[str, Sequence[str]] = {
     "Relational Primitives/Ecosystem demo.md": ["ONTOLOGY", "GEOMETRY", "DYNAMICS", "CONSTRAINT", "EPISTEMIC", "META"],
     "Relational Primitives/GCO Log Synthesis.md": ["ONTOLOGY", "CONSTRAINT", "META", "DYNAMICS"],
@@ -50,11 +53,8 @@ def infer_tags(row: dict) -> List[str]:
     if row.get("primitive_tags"):
         return row["primitive_tags"]
     defaults = SOURCE_DEFAULT_TAGS.get(row.get("source_path", ""))
-    haystack = f"{row.get('section', '')} {row.get('text', '')}".lower()
-    tags: List[str] = []
-    for name, patterns in HINT_PATTERNS.items():
-        if any(re.search(pat, haystack) for pat in patterns):
-            tags.append(name)
+    haystack = f"{row.get('section', '')} {row.get('text', '')}"
+    tags = HINT_TAGGER.tags(haystack)
     if not tags and defaults:
         tags.extend(defaults)
     return sorted(set(tags))
@@ -71,15 +71,18 @@ def is_noise(row: dict) -> bool:
     return False
 
 
-def main() -> None:
-    rows = load_rows(RAW_PATH)
-    enriched = []
+def filter_rows(rows: Iterable[dict]) -> Iterator[dict]:
+    """Tag each row (infer_tags) and yield the ones that aren't noise and have tags."""
     for r in rows:
         r = dict(r)
         r["primitive_tags"] = infer_tags(r)
-        enriched.append(r)
-    kept = [r for r in enriched if not is_noise(r)]
-    kept = [r for r in kept if r.get("primitive_tags")]  # drop any still tagless
+        if not is_noise(r) and r.get("primitive_tags"):  # drop noise and any still tagless
+            yield r
+
+
+def main() -> None:
+    rows = load_rows(RAW_PATH)
+    kept = list(filter_rows(rows))
     removed = len(rows) - len(kept)
 
     OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
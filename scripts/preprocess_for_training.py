@@ -40,16 +40,17 @@ def make_prompt(instruction: str, input_text: str) -> str:
     return instruction
 
 
+def transform_row(r: Dict, keep_metadata: bool) -> Dict:
+    prompt = make_prompt(r.get("instruction", ""), r.get("input", ""))
+    item = {"prompt": prompt, "output": r.get("output", "")}
+    if keep_metadata:
+        item["metadata"] = r.get("metadata", {})
+        item["id"] = r.get("id")
+    return item
+
+
 def transform(rows: List[Dict], keep_metadata: bool) -> List[Dict]:
-    out = []
-    for r in rows:
-        prompt = make_prompt(r.get("instruction", ""), r.get("input", ""))
-        item = {"prompt": prompt, "output": r.get("output", "")}
-        if keep_metadata:
-            item["metadata"] = r.get("metadata", {})
-            item["id"] = r.get("id")
-        out.append(item)
-    return out
+    return [transform_row(r, keep_metadata) for r in rows]
 
 
 def write_jsonl(path: Path, rows: List[Dict]) -> None:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Single-pass primitive tagger shared by the dataset scripts.
+
+Run (benchmark on data/raw/rp_chunks.jsonl replicated N times):
+  python scripts/rp_tagger.py --replicate 100
+
+Both extract_rp_chunks.detect_primitives and filter_rp_chunks.infer_tags
+check whether a chunk matches any pattern of each primitive. Doing that
+with one re.search per pattern scans the text up to ~40 times. Here all
+patterns are compiled into one regex that stops only at word boundaries
+where some pattern matches, and tests each primitive there in a
+lookahead with its own named group:
+
+  \\b(?=any pattern)(?=(?P<ONTOLOGY>ontology|...)?)(?=(?P<GEOMETRY>...)?)...
+
+The lookaheads are zero-width, so every primitive is tried independently at
+every candidate position. The tags are exactly those of the per-pattern
+search, found in one pass that ends early once every primitive is found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+RAW_PATH = ROOT / "data" / "raw" / "rp_chunks.jsonl"
+
+
+class PrimitiveTagger:
+    """Tags text with every primitive that has a matching pattern, in pattern-table order."""
+
+    def __init__(self, patterns: Dict[str, Sequence[str]]) -> None:
+        self.names = list(patterns)
+        # Patterns anchored on \b share one boundary test up front
+        anchored = all(p.startswith(r"\b") for pats in patterns.values() for p in pats)
+        strip = (lambda p: p[2:]) if anchored else (lambda p: p)
+        groups = []
+        for i, name in enumerate(self.names):
+            alternation = "|".join(f"(?:{strip(p)})" for p in patterns[name])
+            groups.append(f"(?=(?P<g{i}>{alternation})?)")
+        any_pattern = "|".join(f"(?:{strip(p)})" for pats in patterns.values() for p in pats)
+        prefix = r"\b" if anchored else ""
+        self.regex = re.compile(f"{prefix}(?={any_pattern})" + "".join(groups))
+        # Group numbers by name: a pattern with its own capturing groups shifts the positions
+        self.slots = tuple(self.regex.groupindex[f"g{i}"] for i in range(len(self.names)))
+
+    def tags(self, text: str) -> List[str]:
+        """Primitive names found in `text` (case-insensitive, like the scripts' lowercase search)."""
+        found = [False] * len(self.names)
+        remaining = len(self.names)
+        slots = self.slots + (0,)  # group(*slots) returns a tuple even for one primitive
+        for match in self.regex.finditer(text.lower()):
+            for i, span in enumerate(match.group(*slots)[:-1]):
+                if span is not None and not found[i]:
+                    found[i] = True
+                    remaining -= 1
+            if not remaining:
+                break
+        return [name for name, hit in zip(self.names, found) if hit]
+
+
+def search_each(patterns: Dict[str, Sequence[str]], text: str) -> List[str]:
+    """The per-pattern re.search loop the tagger replaces (kept for the benchmark)."""
+    lowered = text.lower()
+    return [name for name, pats in patterns.items() if any(re.search(p, lowered) for p in pats)]
+
+
+def main() -> None:
+    from extract_rp_chunks import PRIMITIVE_PATTERNS
+    from filter_rp_chunks import HINT_PATTERNS
+
+    p = argparse.ArgumentParser(description="Benchmark the single-pass tagger against per-pattern search.")
+    p.add_argument("--input", type=Path, default=RAW_PATH)
+    p.add_argument("--replicate", type=int, default=100, help="Copies of the corpus to tag.")
+    args = p.parse_args()
+
+    rows = [json.loads(line) for line in args.input.read_text().splitlines()]
+    texts = [r["text"] for r in rows] * args.replicate
+    hay = [f"{r.get('section', '')} {r.get('text', '')}" for r in rows] * args.replicate
+    megabytes = sum(len(t) for t in texts) / 1e6
+    print(f"{len(texts)} chunks ({len(rows)} x {args.replicate}), {megabytes:.1f} MB of text")
+
+    for label, patterns, corpus in (("detect_primitives", PRIMITIVE_PATTERNS, texts),
+                                    ("infer_tags hints", HINT_PATTERNS, hay)):
+        tagger = PrimitiveTagger(patterns)
+        started = time.perf_counter()
+        fast = [tagger.tags(t) for t in corpus]
+        fast_s = time.perf_counter() - started
+        started = time.perf_counter()
+        slow = [search_each(patterns, t) for t in corpus]
+        slow_s = time.perf_counter() - started
+        same = "identical" if fast == slow else "MISMATCH"
+        print(f"  {label:<18} per-pattern {slow_s:6.2f}s ({len(corpus) / slow_s:8.0f} chunks/s) | "
+              f"single pass {fast_s:6.2f}s ({len(corpus) / fast_s:8.0f} chunks/s, {megabytes / fast_s:5.1f} MB/s) | "
+              f"{slow_s / fast_s:4.1f}x | tags {same}")
+
+
+if __name__ == "__main__":
+    main()
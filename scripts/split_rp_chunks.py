@@ -18,7 +18,7 @@ from __future__ import annotations
 import json
 import random
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 ROOT = Path(__file__).resolve().parent.parent
 INPUT = ROOT / "data" / "raw" / "rp_chunks_clean.jsonl"
@@ -32,13 +32,16 @@ def load_rows(path: Path) -> List[dict]:
     return [json.loads(line) for line in path.read_text().splitlines()]
 
 
+def split_rows(rows: List[dict], test_fraction: float = TEST_FRACTION, seed: int = SEED) -> Tuple[List[dict], List[dict]]:
+    """Shuffle `rows` in place with a fixed seed and cut off the test fraction."""
+    random.Random(seed).shuffle(rows)
+    split = int(len(rows) * (1 - test_fraction))
+    return rows[:split], rows[split:]
+
+
 def main() -> None:
     rows = load_rows(INPUT)
-    random.seed(SEED)
-    random.shuffle(rows)
-
-    split = int(len(rows) * (1 - TEST_FRACTION))
-    train, test = rows[:split], rows[split:]
+    train, test = split_rows(rows)
 
     TRAIN_OUT.parent.mkdir(parents=True, exist_ok=True)
     with TRAIN_OUT.open("w", encoding="utf-8") as f:
@@ -0,0 +1,144 @@
+"""
+Allocation and GC-pause profile of a long headless run, with and without the tick arena.
+
+Run:
+  python toy_game/allocs.py --ticks 20000
+  python toy_game/allocs.py --entities 150 --ticks 1000
+
+Plays the same seeded greedy-policy game twice: once with the World's
+TickArena (the default) and once with `world.scratch = None`, which makes
+every phase build fresh containers the way it used to. For each run it
+reports:
+
+  gc           collections per generation and the pause they cost, timed
+               with gc.callbacks start/stop hooks. Gen-0 collections fire
+               on ~700 *net* new containers, so they track growth (and
+               containers freed late, e.g. in a cycle), not refcount churn.
+  tracemalloc  mean and worst per-tick transient growth (peak above the
+               memory held when the tick started), i.e. how much the tick
+               allocates before refcounting hands it back, from a shorter
+               traced pass so tracing overhead doesn't skew gc/timing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from batch import POLICIES
+from main import World, create_world, handle_key_press, reset_world, step
+from parallel import crowded_world
+
+WIDTH, HEIGHT = 700, 500
+
+
+@dataclass
+class GcMonitor:
+    """Counts collections and times their pauses through gc.callbacks."""
+    collections: List[int] = field(default_factory=lambda: [0, 0, 0])
+    pause_total: float = 0.0
+    pause_max: float = 0.0
+    _started: float = 0.0
+
+    def __call__(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._started
+        self.collections[info["generation"]] += 1
+        self.pause_total += pause
+        self.pause_max = max(self.pause_max, pause)
+
+    def __enter__(self) -> "GcMonitor":
+        gc.collect()
+        gc.callbacks.append(self)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        gc.callbacks.remove(self)
+
+
+@dataclass
+class RunResult:
+    pooled: bool
+    ticks: int
+    elapsed: float
+    gc: GcMonitor
+    tick_peak_mean: float  # Bytes above the tick's starting footprint
+    tick_peak_max: float
+
+
+def new_world(seed: int, entities: int, pooled: bool) -> World:
+    world = crowded_world(entities, seed, double_buffered=False) if entities else create_world(WIDTH, HEIGHT, seed=seed)
+    if not pooled:
+        world.scratch = None
+    return world
+
+
+def play(world: World, ticks: int, step_fn: Callable[[World], None] = step) -> None:
+    """Greedy-policy game; resets (keeping the world object) on game over or victory."""
+    policy = POLICIES["greedy"]
+    for _ in range(ticks):
+        for keysym in policy(world):
+            handle_key_press(world, keysym)
+        step_fn(world)
+        if world.game_over or world.game_win:
+            reset_world(world, world.width, world.height)
+
+
+def measure(seed: int, ticks: int, traced_ticks: int, entities: int, pooled: bool) -> RunResult:
+    # Untraced pass: wall time and collector activity
+    random.seed(seed)
+    world = new_world(seed, entities, pooled)
+    with GcMonitor() as monitor:
+        started = time.perf_counter()
+        play(world, ticks)
+        elapsed = time.perf_counter() - started
+
+    # Traced pass: transient growth inside each tick
+    random.seed(seed)
+    world = new_world(seed, entities, pooled)
+    peaks: List[int] = []
+
+    def traced_step(w: World) -> None:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(w)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+
+    tracemalloc.start()
+    play(world, traced_ticks, traced_step)
+    tracemalloc.stop()
+    return RunResult(pooled, ticks, elapsed, monitor,
+                     sum(peaks) / max(len(peaks), 1), max(peaks, default=0))
+
+
+def report(r: RunResult) -> str:
+    label = "arena   " if r.pooled else "no arena"
+    gen = r.gc.collections
+    return (f"{label} | {r.ticks / r.elapsed:7.0f} ticks/s | gc gen0/1/2 {gen[0]:>6}/{gen[1]:>4}/{gen[2]:>3} "
+            f"({gen[0] / r.ticks:5.2f} gen0 per tick) | pauses {r.gc.pause_total * 1000:7.1f} ms total, "
+            f"{r.gc.pause_max * 1000:5.2f} ms max | tick transient {r.tick_peak_mean / 1024:6.1f} KiB mean, "
+            f"{r.tick_peak_max / 1024:6.1f} KiB max")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compare allocations and GC pauses with and without the tick arena.")
+    p.add_argument("--ticks", type=int, default=20000)
+    p.add_argument("--traced-ticks", type=int, default=0, help="Ticks in the tracemalloc pass (default ticks / 10).")
+    p.add_argument("--entities", type=int, default=0, help="Use a crowded world of this size instead of the standard map.")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    traced = args.traced_ticks or max(args.ticks // 10, 100)
+    for pooled in (False, True):
+        print(report(measure(args.seed, args.ticks, traced, args.entities, pooled)))
+
+
+if __name__ == "__main__":
+    main()
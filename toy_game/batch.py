@@ -0,0 +1,222 @@
+"""
+Headless batch runner - play many independent games in parallel.
+
+Run:
+  python toy_game/batch.py --games 32 --workers 8 --difficulty 1.0 1.3
+
+Each game gets its own seed and tuning parameters, runs without Tk, and is
+driven by a scripted player policy instead of the keyboard. Games fan out
+across a ProcessPoolExecutor and their outcomes stream back as they finish.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from main import (
+    World,
+    create_world,
+    handle_key_press,
+    rebuild_relations,
+    step,
+)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIG / RESULTS
+# ═══════════════════════════════════════════════════════════════════════════════
+@dataclass
+class GameConfig:
+    """Seed and tuning parameters for one headless game."""
+    seed: int
+    difficulty: float = 1.0
+    speed_boost_per_food: float = 0.08
+    wave_score_step: int = 3
+    sense_radii: Dict[str, float] = field(default_factory=dict)  # Overrides per kind
+    policy: str = "greedy"
+    double_buffered: bool = False
+    max_ticks: int = 3000
+    width: int = 700
+    height: int = 500
+
+
+@dataclass
+class GameResult:
+    """Outcome of one headless game."""
+    config: GameConfig
+    ticks: int
+    score: int
+    wave: int
+    conversions: int
+    won: bool
+    lost: bool
+    elapsed: float  # Wall-clock seconds spent in the worker
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SCRIPTED PLAYER POLICIES - stand-ins for keyboard input
+# ═══════════════════════════════════════════════════════════════════════════════
+def _direction_key(dx: float, dy: float) -> str:
+    """Arrow key for the dominant axis of (dx, dy)."""
+    if abs(dx) >= abs(dy):
+        return "Right" if dx > 0 else "Left"
+    return "Down" if dy > 0 else "Up"
+
+
+def idle_policy(world: World) -> List[str]:
+    """Never presses anything - measures how long hostiles take on their own."""
+    return []
+
+
+def random_policy(world: World) -> List[str]:
+    """Mash a random arrow key every 10 ticks, dash occasionally."""
+    if world.tick % 10 != 0:
+        return []
+    keys = [random.choice(["Up", "Down", "Left", "Right"])]
+    if random.random() < 0.1:
+        keys.append("space")
+    return keys
+
+
+def greedy_policy(world: World) -> List[str]:
+    """Head for the nearest food; flee, shield or dash when a hostile gets close."""
+    player = world.entities.get("player")
+    if not player:
+        return []
+
+    keys: List[str] = []
+    threats = [e for e in world.entities.values() if e.kind in ("Hostile", "Converted")]
+    nearest_threat = min(threats, key=lambda e: (e.x - player.x) ** 2 + (e.y - player.y) ** 2, default=None)
+    if nearest_threat:
+        dx = player.x - nearest_threat.x
+        dy = player.y - nearest_threat.y
+        dist = math.sqrt(dx * dx + dy * dy)
+        if dist < 60:
+            keys.append(_direction_key(dx, dy))
+            if dist < 40 and player.state.get("energy", 0) >= 30:
+                keys.append("s")
+            if dist < 25:
+                keys.append("space")
+            return keys
+
+    foods = [e for e in world.entities.values() if e.kind == "Food"]
+    if foods:
+        nearest = min(foods, key=lambda f: (f.x - player.x) ** 2 + (f.y - player.y) ** 2)
+        keys.append(_direction_key(nearest.x - player.x, nearest.y - player.y))
+    return keys
+
+
+POLICIES: Dict[str, Callable[[World], List[str]]] = {
+    "idle": idle_policy,
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ═══════════════════════════════════════════════════════════════════════════════
+def build_world(config: GameConfig) -> World:
+    """Create a fresh world with the config's tuning applied."""
+    random.seed(config.seed)  # Only scripted policies still use the global RNG
+    world = create_world(config.width, config.height, seed=config.seed)
+    world.difficulty = config.difficulty
+    world.speed_boost_per_food = config.speed_boost_per_food
+    world.wave_score_step = config.wave_score_step
+    world.sense_radii.update(config.sense_radii)
+    world.double_buffered = config.double_buffered
+    rebuild_relations(world)
+    return world
+
+
+def run_game(config: GameConfig) -> GameResult:
+    """Play one game to completion (or max_ticks) with a scripted policy."""
+    started = time.perf_counter()
+    world = build_world(config)
+    policy = POLICIES[config.policy]
+    converted_ids: Set[str] = set()
+
+    while not (world.game_over or world.game_win) and world.tick < config.max_ticks:
+        for keysym in policy(world):
+            handle_key_press(world, keysym)
+        step(world)
+        for ent in world.entities.values():
+            if ent.kind == "Converted":
+                converted_ids.add(ent.id)
+
+    return GameResult(
+        config=config,
+        ticks=world.tick,
+        score=world.score,
+        wave=world.wave,
+        conversions=len(converted_ids),
+        won=world.game_win,
+        lost=world.game_over,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def run_batch(configs: Iterable[GameConfig], max_workers: Optional[int] = None) -> Iterator[GameResult]:
+    """Run games across a process pool, yielding results in completion order."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(run_game, cfg) for cfg in configs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sweep(games: int, difficulties: List[float], base_seed: int = 0, **params) -> List[GameConfig]:
+    """Build `games` configs per difficulty, each with its own seed."""
+    configs: List[GameConfig] = []
+    for d_idx, difficulty in enumerate(difficulties):
+        for g in range(games):
+            seed = base_seed + d_idx * games + g
+            configs.append(GameConfig(seed=seed, difficulty=difficulty, **params))
+    return configs
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Run many headless games in parallel.")
+    p.add_argument("--games", type=int, default=8, help="Games per difficulty setting.")
+    p.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    p.add_argument("--difficulty", type=float, nargs="+", default=[1.0], help="Difficulty values to sweep.")
+    p.add_argument("--speed-boost", type=float, default=0.08, help="Enemy speed gain per food eaten.")
+    p.add_argument("--wave-step", type=int, default=3, help="Score needed per wave.")
+    p.add_argument("--policy", choices=sorted(POLICIES), default="greedy", help="Scripted player policy.")
+    p.add_argument("--max-ticks", type=int, default=3000, help="Tick cap per game.")
+    p.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed + i.")
+    p.add_argument("--double-buffered", action="store_true", help="Run phases against last tick's snapshot.")
+    args = p.parse_args()
+
+    configs = sweep(
+        args.games, args.difficulty, base_seed=args.seed,
+        speed_boost_per_food=args.speed_boost, wave_score_step=args.wave_step,
+        policy=args.policy, max_ticks=args.max_ticks, double_buffered=args.double_buffered,
+    )
+    started = time.perf_counter()
+    results: List[GameResult] = []
+    for res in run_batch(configs, max_workers=args.workers):
+        results.append(res)
+        outcome = "WIN " if res.won else ("LOSS" if res.lost else "CAP ")
+        print(f"{outcome} seed={res.config.seed:<5} difficulty={res.config.difficulty:.2f} "
+              f"ticks={res.ticks:<5} score={res.score:<3} wave={res.wave} conversions={res.conversions}")
+
+    elapsed = time.perf_counter() - started
+    total_ticks = sum(r.ticks for r in results)
+    print(f"\n{len(results)} games, {total_ticks} ticks in {elapsed:.2f}s ({total_ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    for difficulty in args.difficulty:
+        group = [r for r in results if r.config.difficulty == difficulty]
+        if not group:
+            continue
+        n = len(group)
+        print(f"  difficulty {difficulty:.2f}: win rate {sum(r.won for r in group) / n:.0%}, "
+              f"mean ticks {sum(r.ticks for r in group) / n:.0f}, "
+              f"mean score {sum(r.score for r in group) / n:.1f}")
+
+
+if __name__ == "__main__":
+    main()
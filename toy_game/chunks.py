@@ -0,0 +1,322 @@
+"""
+Chunked open world - simulate only the region around the player.
+
+Run:
+  python toy_game/chunks.py --grid 4 8 16 32 --density 12 --ticks 100
+
+The map is split into square chunks. Chunks within `active_radius` of the
+player (or any extra observer) are live: their entities and walls sit in
+the ordinary World and go through every phase of step(). All other chunks
+are dormant - their entities are packed into compact snapshot bytes and not
+touched at all, so tick cost and live memory follow the active region,
+not the map size.
+
+When a dormant chunk becomes active again it is rehydrated with catch-up:
+for the ticks it slept, hostiles advance along their patrol loops, wanderers
+drift (deterministically, from the chunk's RNG stream), and stale AI state
+- alerts, memories, hunts - is dropped, since nothing was watching.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+import tracemalloc
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from main import (
+    AI_STATE_PATROL,
+    Entity,
+    Wall,
+    World,
+    create_world,
+    rebuild_relations,
+    rng_uniform,
+    step,
+)
+from snapshot import dump_value, load_value
+
+ChunkKey = Tuple[int, int]
+
+
+@dataclass
+class DormantChunk:
+    since: int  # Tick the chunk went to sleep
+    count: int
+    data: bytes  # zlib-compressed snapshot of its entity list
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CATCH-UP - coarse model for the ticks a chunk slept through
+# ═══════════════════════════════════════════════════════════════════════════════
+def advance_patrol(ent: Entity, distance: float) -> None:
+    """Walk `distance` along the patrol loop, as execute_patrol would (minus wall avoidance)."""
+    points = ent.state.get("patrol_points") or []
+    if not points:
+        return
+    idx = ent.state.get("patrol_idx", 0) % len(points)
+    x, y = ent.x, ent.y
+    # Full laps don't change anything - skip them
+    loop = sum(math.dist(points[i], points[(i + 1) % len(points)]) for i in range(len(points)))
+    if loop > 0 and distance > loop:
+        distance = distance % loop
+    for _ in range(len(points) + 1):
+        tx, ty = points[idx]
+        leg = math.hypot(tx - x, ty - y)
+        if leg >= distance:
+            if leg > 0:
+                x += (tx - x) / leg * distance
+                y += (ty - y) / leg * distance
+            break
+        distance -= leg
+        x, y = tx, ty
+        idx = (idx + 1) % len(points)
+    ent.x, ent.y = x, y
+    ent.state["patrol_idx"] = idx
+
+
+def catch_up(world: World, key: ChunkKey, bounds: Tuple[float, float, float, float],
+             entities: List[Entity], elapsed: int) -> None:
+    """Fast-forward a rehydrated chunk's entities by `elapsed` ticks."""
+    if elapsed <= 0:
+        return
+    stream = f"chunk.{key[0]}.{key[1]}"
+    x0, y0, x1, y1 = bounds
+    for ent in entities:
+        if ent.kind == "Food":
+            continue
+        speed = ent.state.get("speed", 1.0)
+        if ent.state.get("patrol_points"):
+            advance_patrol(ent, speed * 0.5 * elapsed)
+        else:
+            # Random-walk spread grows with sqrt(time); stay inside the home chunk
+            spread = speed * 0.5 * math.sqrt(elapsed * 20)
+            ent.x = max(x0 + 5, min(x1 - 5, ent.x + rng_uniform(world, stream, -spread, spread)))
+            ent.y = max(y0 + 5, min(y1 - 5, ent.y + rng_uniform(world, stream, -spread, spread)))
+        ent.state["vx"] = 0
+        ent.state["vy"] = 0
+        if "alert_level" in ent.state:
+            ent.state["alert_level"] = 0
+        if "memory" in ent.state:
+            ent.state["memory"] = {}
+        if "ai_state" in ent.state:
+            ent.state["ai_state"] = AI_STATE_PATROL
+        # Its expiry timer fired (and was skipped) while the chunk slept
+        ent.state.pop("conversion_cooldown", None)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHUNKED WORLD
+# ═══════════════════════════════════════════════════════════════════════════════
+class ChunkedWorld:
+    """Wraps a World so only chunks near observers are simulated."""
+
+    def __init__(self, world: World, chunk_size: float = 350.0, active_radius: int = 1,
+                 check_every: int = 10) -> None:
+        self.world = world
+        self.chunk_size = chunk_size
+        self.active_radius = active_radius
+        self.check_every = check_every
+        self.cols = max(1, math.ceil(world.width / chunk_size))
+        self.rows = max(1, math.ceil(world.height / chunk_size))
+        self.observers: List[Tuple[float, float]] = []  # Extra points kept live (cameras, spectators)
+        self.dormant: Dict[ChunkKey, DormantChunk] = {}
+        self.active: Set[ChunkKey] = set()
+        self.walls_by_chunk: Dict[ChunkKey, List[Wall]] = defaultdict(list)
+        for wall in world.walls:
+            for key in self._chunks_touching(wall):
+                self.walls_by_chunk[key].append(wall)
+        self.rehydrated = 0
+        self.frozen = 0
+        self.update_active()
+
+    def chunk_of(self, x: float, y: float) -> ChunkKey:
+        cx = min(self.cols - 1, max(0, int(x // self.chunk_size)))
+        cy = min(self.rows - 1, max(0, int(y // self.chunk_size)))
+        return cx, cy
+
+    def chunk_bounds(self, key: ChunkKey) -> Tuple[float, float, float, float]:
+        size = self.chunk_size
+        return (key[0] * size, key[1] * size,
+                min(self.world.width, (key[0] + 1) * size), min(self.world.height, (key[1] + 1) * size))
+
+    def _chunks_touching(self, wall: Wall) -> Iterable[ChunkKey]:
+        cx0, cy0 = self.chunk_of(min(wall.x1, wall.x2), min(wall.y1, wall.y2))
+        cx1, cy1 = self.chunk_of(max(wall.x1, wall.x2), max(wall.y1, wall.y2))
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield cx, cy
+
+    def wanted_chunks(self, radius: Optional[int] = None) -> Set[ChunkKey]:
+        """Chunks within `radius` (default: the active radius) of the player or an observer."""
+        points = list(self.observers)
+        player = self.world.entities.get("player")
+        if player:
+            points.append((player.x, player.y))
+        r = self.active_radius if radius is None else radius
+        keys: Set[ChunkKey] = set()
+        for x, y in points:
+            cx, cy = self.chunk_of(x, y)
+            for dx in range(-r, r + 1):
+                for dy in range(-r, r + 1):
+                    if 0 <= cx + dx < self.cols and 0 <= cy + dy < self.rows:
+                        keys.add((cx + dx, cy + dy))
+        return keys
+
+    # --- Freezing / rehydration -------------------------------------------
+    def _freeze(self, key: ChunkKey, entities: List[Entity]) -> None:
+        existing = self.dormant.get(key)
+        if existing:
+            entities = self._thaw(key) + entities
+        self.dormant[key] = DormantChunk(self.world.tick, len(entities), zlib.compress(dump_value(entities)))
+        self.frozen += len(entities)
+
+    def _thaw(self, key: ChunkKey) -> List[Entity]:
+        chunk = self.dormant.pop(key)
+        entities: List[Entity] = load_value(zlib.decompress(chunk.data))
+        catch_up(self.world, key, self.chunk_bounds(key), entities, self.world.tick - chunk.since)
+        return entities
+
+    def update_active(self) -> None:
+        """Freeze entities outside the wanted region and rehydrate chunks entering it."""
+        world = self.world
+        wanted = self.wanted_chunks()
+        changed = wanted != self.active
+
+        leaving: Dict[ChunkKey, List[Entity]] = defaultdict(list)
+        for eid, ent in world.entities.items():
+            if eid == "player":
+                continue
+            key = self.chunk_of(ent.x, ent.y)
+            if key not in wanted:
+                leaving[key].append(ent)
+        for key, ents in leaving.items():
+            for ent in ents:
+                del world.entities[ent.id]
+            self._freeze(key, ents)
+            changed = True
+
+        for key in wanted:
+            if key in self.dormant:
+                for ent in self._thaw(key):
+                    world.entities[ent.id] = ent
+                    self.rehydrated += 1
+                changed = True
+
+        if changed:
+            self.active = wanted
+            seen: Set[int] = set()
+            walls: List[Wall] = []
+            for key in sorted(wanted):
+                for wall in self.walls_by_chunk.get(key, ()):
+                    if id(wall) not in seen:
+                        seen.add(id(wall))
+                        walls.append(wall)
+            world.walls = walls
+            rebuild_relations(world)
+
+    def step(self) -> None:
+        if self.world.tick % self.check_every == 0:
+            self.update_active()
+        step(self.world)
+
+    # --- Stats ------------------------------------------------------------
+    def dormant_entities(self) -> int:
+        return sum(c.count for c in self.dormant.values())
+
+    def dormant_bytes(self) -> int:
+        return sum(len(c.data) for c in self.dormant.values())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# OPEN-WORLD GENERATOR + BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+def open_world(grid: int, chunk_size: float = 350.0, density: int = 12, seed: int = 0) -> World:
+    """A grid x grid chunk map with `density` entities and one wall per chunk, player in the middle."""
+    side = int(grid * chunk_size)
+    world = create_world(side, side, seed=seed)
+    world.entities = {"player": world.entities["player"]}
+    world.walls = []
+    player = world.entities["player"]
+    player.x = player.y = side / 2
+    for cx in range(grid):
+        for cy in range(grid):
+            x0, y0 = cx * chunk_size, cy * chunk_size
+            stream = f"gen.{cx}.{cy}"
+
+            def spot() -> Tuple[float, float]:
+                return (rng_uniform(world, stream, x0 + 30, x0 + chunk_size - 30),
+                        rng_uniform(world, stream, y0 + 30, y0 + chunk_size - 30))
+
+            wx, wy = spot()
+            world.walls.append(Wall(wx, wy, min(side - 10, wx + 60), wy))
+            for n in range(density):
+                x, y = spot()
+                roll = n % 10
+                if roll < 3:
+                    eid = f"hostile_{cx}_{cy}_{n}"
+                    patrol = [(x, y), (min(side - 20, x + 80), y), (x, min(side - 20, y + 80))]
+                    world.entities[eid] = Entity(eid, "Hostile", "red", x, y, {
+                        "speed": 1.3, "vx": 0, "vy": 0, "patrol_points": patrol, "patrol_idx": 0,
+                        "alert_level": 0, "memory": {},
+                    })
+                elif roll < 8:
+                    eid = f"passive_{cx}_{cy}_{n}"
+                    world.entities[eid] = Entity(eid, "Passive", "green", x, y, {
+                        "vx": 0, "vy": 0, "speed": 0.9, "alert_level": 0, "memory": {},
+                    })
+                else:
+                    eid = f"food_{cx}_{cy}_{n}"
+                    world.entities[eid] = Entity(eid, "Food", "yellow", x, y)
+    rebuild_relations(world)
+    return world
+
+
+def _measure(run_tick, ticks: int, traced_ticks: int = 5) -> Tuple[float, int]:
+    """Mean seconds per tick, then peak traced memory over a few more ticks."""
+    started = time.perf_counter()
+    for _ in range(ticks):
+        run_tick()
+    per_tick = (time.perf_counter() - started) / ticks
+    tracemalloc.start()
+    for _ in range(traced_ticks):
+        run_tick()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_tick, peak
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compare chunked vs whole-world simulation cost.")
+    p.add_argument("--grid", type=int, nargs="+", default=[4, 8, 16, 32], help="Map sizes in chunks per side.")
+    p.add_argument("--chunk-size", type=float, default=350.0)
+    p.add_argument("--density", type=int, default=12, help="Entities per chunk.")
+    p.add_argument("--radius", type=int, default=1, help="Active radius in chunks around the player.")
+    p.add_argument("--ticks", type=int, default=100)
+    p.add_argument("--full-max", type=int, default=300, help="Skip whole-world runs above this many entities.")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    for grid in args.grid:
+        world = open_world(grid, args.chunk_size, args.density, args.seed)
+        total = len(world.entities)
+        line = f"{grid:>3}x{grid:<3} chunks, {total:>6} entities |"
+        if total <= args.full_max:
+            full_s, full_mem = _measure(lambda: step(world), args.ticks)
+            line += f" whole world {full_s * 1000:8.2f} ms/tick, peak {full_mem / 1e6:6.1f} MB |"
+            world = open_world(grid, args.chunk_size, args.density, args.seed)
+        else:
+            line += f" whole world {'skipped':>16}, {'':>12} |"
+        chunked = ChunkedWorld(world, args.chunk_size, args.radius)
+        chunk_s, chunk_mem = _measure(chunked.step, args.ticks)
+        print(f"{line} chunked {chunk_s * 1000:7.2f} ms/tick, peak {chunk_mem / 1e6:5.1f} MB, "
+              f"{len(chunked.world.entities)} live / {chunked.dormant_entities()} dormant "
+              f"({chunked.dormant_bytes() / 1e3:.0f} KB packed)")
+
+
+if __name__ == "__main__":
+    main()
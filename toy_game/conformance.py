@@ -0,0 +1,292 @@
+"""
+Differential conformance harness: reference step() against alternative engine paths.
+
+Run:
+  python toy_game/conformance.py
+  python toy_game/conformance.py --backends sharded fork --entities 150 --ticks 300
+  python toy_game/conformance.py --backends buffered --ticks 200 --shrink
+
+Every scenario is built twice from the same seed. One copy advances with the
+reference tick (main.step with default settings), the other with a backend;
+both receive the same scripted inputs, chosen from the reference world. After
+every tick the two worlds are compared:
+
+  entities    same ids, same kinds, positions within --pos-tol
+  ai_state    equal
+  memory      same remembered ids and ticks, positions within --mem-tol
+  gco_report  equal (numbers within --report-tol)
+  world       score, wave, game_over / game_win equal
+
+The first divergent tick is reported with the differences found. With
+--shrink, entities are then removed (delta debugging over the initial
+world, the player always kept) as long as the pair still diverges within
+the same tick budget, leaving a minimal entity set that reproduces it.
+
+Backends (register more in BACKENDS):
+
+  no-arena   world.scratch = None: every phase builds fresh containers
+  sharded    parallel.ShardedStepper: sensing, AI and META contacts in workers
+  snapshot   every tick goes through snapshot.dump_world / load_world
+  fork       every tick runs in World.fork() of the previous one
+  buffered   double-buffered phases; order-independent by design, so it
+             is *expected* to diverge (useful to see shrinking at work)
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from batch import POLICIES
+from main import World, create_world, handle_key_press, step
+from parallel import ShardedStepper, crowded_world
+from snapshot import dump_world, load_world
+
+# A stepper advances a world one tick and returns the world to continue with
+Stepper = Callable[[World], World]
+
+MAX_DIFFS = 8  # Differences listed per divergence
+
+
+@dataclass
+class Tolerances:
+    position: float = 0.0  # Entity x/y
+    memory: float = 0.0  # Remembered x/y
+    report: float = 0.0  # Numbers inside gco_report
+
+
+@dataclass
+class Scenario:
+    name: str
+    seed: int
+    entities: int = 0  # 0: the standard 700x500 map, otherwise a crowded world
+
+    def build(self) -> World:
+        random.seed(self.seed)
+        if self.entities:
+            return crowded_world(self.entities, self.seed, double_buffered=False)
+        return create_world(700, 500, seed=self.seed)
+
+
+@dataclass
+class Divergence:
+    tick: int
+    diffs: List[str]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BACKENDS
+# ═══════════════════════════════════════════════════════════════════════════════
+def _reference(world: World) -> World:
+    step(world)
+    return world
+
+
+@contextmanager
+def no_arena_backend() -> Iterator[Stepper]:
+    def stepper(world: World) -> World:
+        world.scratch = None
+        step(world)
+        return world
+    yield stepper
+
+
+@contextmanager
+def sharded_backend(workers: int = 2) -> Iterator[Stepper]:
+    with ShardedStepper(workers) as sharded:
+        def stepper(world: World) -> World:
+            sharded.step(world)
+            return world
+        yield stepper
+
+
+@contextmanager
+def snapshot_backend() -> Iterator[Stepper]:
+    def stepper(world: World) -> World:
+        world = load_world(dump_world(world))
+        step(world)
+        return world
+    yield stepper
+
+
+@contextmanager
+def fork_backend() -> Iterator[Stepper]:
+    def stepper(world: World) -> World:
+        world = world.fork()
+        step(world)
+        return world
+    yield stepper
+
+
+@contextmanager
+def buffered_backend() -> Iterator[Stepper]:
+    def stepper(world: World) -> World:
+        world.double_buffered = True
+        step(world)
+        return world
+    yield stepper
+
+
+BACKENDS: Dict[str, Callable[[], Any]] = {
+    "no-arena": no_arena_backend,
+    "sharded": sharded_backend,
+    "snapshot": snapshot_backend,
+    "fork": fork_backend,
+    "buffered": buffered_backend,
+}
+DEFAULT_BACKENDS = ("no-arena", "sharded", "snapshot", "fork")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPARISON
+# ═══════════════════════════════════════════════════════════════════════════════
+def _close(a: Any, b: Any, tol: float) -> bool:
+    """Structural equality with numbers compared to within `tol`."""
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)) and not isinstance(a, bool):
+        return a == b or abs(a - b) <= tol
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k], tol) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_close(x, y, tol) for x, y in zip(a, b))
+    return a == b
+
+
+def compare_worlds(ref: World, alt: World, tol: Tolerances) -> List[str]:
+    """Differences between two worlds at the same tick (empty when they conform)."""
+    diffs: List[str] = []
+    for name in ("tick", "score", "wave", "game_over", "game_win"):
+        if getattr(ref, name) != getattr(alt, name):
+            diffs.append(f"{name}: {getattr(ref, name)!r} != {getattr(alt, name)!r}")
+
+    missing = ref.entities.keys() - alt.entities.keys()
+    extra = alt.entities.keys() - ref.entities.keys()
+    if missing:
+        diffs.append(f"entities missing: {sorted(missing)}")
+    if extra:
+        diffs.append(f"entities extra: {sorted(extra)}")
+
+    for eid, r in ref.entities.items():
+        a = alt.entities.get(eid)
+        if a is None:
+            continue
+        if r.kind != a.kind:
+            diffs.append(f"{eid} kind: {r.kind} != {a.kind}")
+        if abs(r.x - a.x) > tol.position or abs(r.y - a.y) > tol.position:
+            diffs.append(f"{eid} position: ({r.x:.6f}, {r.y:.6f}) != ({a.x:.6f}, {a.y:.6f})")
+        if r.state.get("ai_state") != a.state.get("ai_state"):
+            diffs.append(f"{eid} ai_state: {r.state.get('ai_state')} != {a.state.get('ai_state')}")
+        r_mem, a_mem = r.state.get("memory") or {}, a.state.get("memory") or {}
+        if r_mem.keys() != a_mem.keys():
+            diffs.append(f"{eid} memory ids: {sorted(r_mem.keys() ^ a_mem.keys())} differ")
+        else:
+            for mid, (rx, ry, rt) in r_mem.items():
+                ax, ay, at = a_mem[mid]
+                if rt != at or abs(rx - ax) > tol.memory or abs(ry - ay) > tol.memory:
+                    diffs.append(f"{eid} memory of {mid}: {(rx, ry, rt)} != {(ax, ay, at)}")
+
+    if not _close(ref.gco_report, alt.gco_report, tol.report):
+        diffs.append(f"gco_report: {ref.gco_report!r} != {alt.gco_report!r}")
+    return diffs
+
+
+def run_pair(initial: World, backend: str, ticks: int, tol: Tolerances,
+             policy: str = "greedy", seed: int = 0) -> Optional[Divergence]:
+    """Advance forks of `initial` with the reference and with `backend`; first divergence or None."""
+    keys_for = POLICIES[policy]
+    ref, alt = initial.fork(), initial.fork()
+    random.seed(seed)
+    with BACKENDS[backend]() as stepper:
+        for _ in range(ticks):
+            for keysym in keys_for(ref):
+                handle_key_press(ref, keysym)
+                handle_key_press(alt, keysym)
+            ref = _reference(ref)
+            alt = stepper(alt)
+            diffs = compare_worlds(ref, alt, tol)
+            if diffs:
+                return Divergence(ref.tick - 1, diffs)
+            if ref.game_over or ref.game_win:
+                break
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHRINKING
+# ═══════════════════════════════════════════════════════════════════════════════
+def shrink(initial: World, backend: str, ticks: int, tol: Tolerances, policy: str = "greedy",
+           seed: int = 0) -> Sequence[str]:
+    """
+    Minimal set of non-player entity ids whose world still diverges (ddmin).
+    Removal is done by forking the initial world down to the kept ids.
+    """
+    def fails(ids: Sequence[str]) -> bool:
+        return run_pair(initial.fork(["player", *ids]), backend, ticks, tol, policy, seed) is not None
+
+    ids = [eid for eid in initial.entities if eid != "player"]
+    chunks = 2
+    while len(ids) >= 2:
+        size = math.ceil(len(ids) / chunks)
+        parts = [ids[k:k + size] for k in range(0, len(ids), size)]
+        for part in parts:
+            rest = [eid for eid in ids if eid not in part]
+            if fails(rest):
+                ids, chunks = rest, max(chunks - 1, 2)
+                break
+        else:
+            if chunks >= len(ids):
+                break
+            chunks = min(len(ids), chunks * 2)
+    if len(ids) == 1 and fails([]):
+        ids = []
+    return ids
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAIN
+# ═══════════════════════════════════════════════════════════════════════════════
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compare engine backends against the reference step().")
+    p.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=list(DEFAULT_BACKENDS))
+    p.add_argument("--seeds", type=int, nargs="+", default=[0, 1])
+    p.add_argument("--entities", type=int, nargs="+", default=[0, 80],
+                   help="Scenario sizes (0: the standard map).")
+    p.add_argument("--ticks", type=int, default=300)
+    p.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    p.add_argument("--pos-tol", type=float, default=0.0)
+    p.add_argument("--mem-tol", type=float, default=0.0)
+    p.add_argument("--report-tol", type=float, default=0.0)
+    p.add_argument("--shrink", action="store_true", help="Reduce failing scenarios to a minimal entity set.")
+    args = p.parse_args()
+
+    tol = Tolerances(args.pos_tol, args.mem_tol, args.report_tol)
+    scenarios = [Scenario(f"{'map' if n == 0 else f'crowd{n}'}/seed{seed}", seed, n)
+                 for n in args.entities for seed in args.seeds]
+    failures = 0
+    for backend in args.backends:
+        for scenario in scenarios:
+            initial = scenario.build()
+            found = run_pair(initial, backend, args.ticks, tol, args.policy, scenario.seed)
+            if found is None:
+                print(f"{backend:<9} {scenario.name:<16} OK ({args.ticks} ticks)")
+                continue
+            failures += 1
+            print(f"{backend:<9} {scenario.name:<16} DIVERGED at tick {found.tick} "
+                  f"({len(found.diffs)} differences)")
+            for diff in found.diffs[:MAX_DIFFS]:
+                print(f"    {diff}")
+            if args.shrink:
+                ids = shrink(initial, backend, found.tick + 1, tol, args.policy, scenario.seed)
+                small = run_pair(initial.fork(["player", *ids]), backend, found.tick + 1, tol,
+                                 args.policy, scenario.seed)
+                print(f"    shrunk to player + {len(ids)} of {len(initial.entities) - 1} entities: {list(ids)}")
+                if small is not None:
+                    print(f"    minimal scenario diverges at tick {small.tick}: {small.diffs[0]}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Cost of forking a world for lookahead, and what forecasting intercepts buys.
+
+Run:
+  python toy_game/lookahead.py
+  python toy_game/lookahead.py --entities 100 200 --rollout 10 --games 20
+
+Two measurements:
+
+  fork         World.fork() + `rollout` step() calls versus
+               copy.deepcopy(world) + the same steps, on the standard map
+               and on crowded worlds, plus the neighbourhood fork that
+               forecast_player() actually rolls out. Also checks both
+               directions of independence (snapshot dumps compare equal):
+               the parent is untouched by the rollouts, and a fork is
+               untouched when the parent steps on.
+  intercepts   scripted games with straight-line intercepts (lookahead 0)
+               and with forked rollouts (lookahead N): how often the player
+               was caught, ticks survived, mean distance from the player to
+               the nearest pursuer, and tick cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import math
+import random
+import time
+from typing import List
+
+from batch import POLICIES
+from main import FORECAST_RANGE, World, compute_distance, create_world, handle_key_press, step
+from parallel import crowded_world
+from snapshot import dump_world
+
+WIDTH, HEIGHT = 700, 500
+
+
+def warmed_world(entities: int, seed: int, ticks: int = 50) -> World:
+    world = crowded_world(entities, seed, double_buffered=False) if entities else create_world(WIDTH, HEIGHT, seed=seed)
+    policy = POLICIES["greedy"]
+    for _ in range(ticks):
+        for keysym in policy(world):
+            handle_key_press(world, keysym)
+        step(world)
+    return world
+
+
+def time_copies(world: World, rollout: int, repeats: int) -> None:
+    before = dump_world(world)
+    player = world.entities["player"]
+    near = [eid for eid, e in world.entities.items() if compute_distance(player, e) < FORECAST_RANGE]
+    results = []
+    for label, make in (("deepcopy", copy.deepcopy), ("fork", World.fork),
+                        (f"fork({len(near)} near)", lambda w: w.fork(near))):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            make(world)
+        copy_s = (time.perf_counter() - started) / repeats
+        started = time.perf_counter()
+        for _ in range(repeats):
+            future = make(world)
+            for _ in range(rollout):
+                step(future)
+        total_s = (time.perf_counter() - started) / repeats
+        results.append((label, copy_s, total_s))
+    untouched = dump_world(world) == before
+    # The other direction: the parent's tick arena must not reach into a fork
+    child = world.fork()
+    child_before = dump_world(child)
+    for _ in range(max(rollout, 2)):  # Two ticks cycle through both arena memory buffers
+        step(world)
+    independent = dump_world(child) == child_before
+    line = [f"{len(world.entities):>4} entities"]
+    for label, copy_s, total_s in results:
+        line.append(f"{label} {copy_s * 1000:7.3f} ms, +{rollout} ticks {total_s * 1000:7.2f} ms")
+    line.append(f"copy speedup {results[0][1] / results[1][1]:5.1f}x")
+    line.append("parent untouched" if untouched else "PARENT MODIFIED")
+    line.append("fork untouched" if independent else "FORK MODIFIED")
+    print(" | ".join(line))
+
+
+def nearest_pursuer(world: World) -> float:
+    player = world.entities.get("player")
+    return min((compute_distance(player, e) for e in world.entities.values()
+                if e.kind in ("Hostile", "Converted")), default=math.inf) if player else math.inf
+
+
+def play_games(policy_name: str, lookahead: int, games: int, max_ticks: int) -> None:
+    policy = POLICIES[policy_name]
+    survived: List[int] = []
+    distances: List[float] = []
+    caught = 0
+    started = time.perf_counter()
+    for seed in range(games):
+        random.seed(seed)
+        world = create_world(WIDTH, HEIGHT, seed=seed)
+        world.lookahead = lookahead
+        while world.tick < max_ticks and not (world.game_over or world.game_win):
+            for keysym in policy(world):
+                handle_key_press(world, keysym)
+            step(world)
+            d = nearest_pursuer(world)
+            if d < math.inf:
+                distances.append(d)
+        survived.append(world.tick)
+        caught += world.game_over
+    elapsed = time.perf_counter() - started
+    print(f"{policy_name} lookahead {lookahead:>2} | caught {caught}/{games} | "
+          f"mean ticks survived {sum(survived) / games:7.1f} | "
+          f"nearest pursuer {sum(distances) / max(len(distances), 1):6.1f} px | "
+          f"{elapsed / max(sum(survived), 1) * 1000:6.3f} ms/tick")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Fork cost and forecast intercepts.")
+    p.add_argument("--entities", type=int, nargs="+", default=[0, 100, 200],
+                   help="World sizes (0: the standard map).")
+    p.add_argument("--rollout", type=int, default=10, help="Ticks stepped in each fork.")
+    p.add_argument("--repeats", type=int, default=20)
+    p.add_argument("--games", type=int, default=20)
+    p.add_argument("--max-ticks", type=int, default=3000)
+    p.add_argument("--lookahead", type=int, default=10)
+    p.add_argument("--policy", choices=sorted(POLICIES), default="random", help="Scripted player for the games.")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    for n in args.entities:
+        time_copies(warmed_world(n, args.seed), args.rollout, args.repeats)
+    for lookahead in (0, args.lookahead):
+        play_games(args.policy, lookahead, args.games, args.max_ticks)
+
+
+if __name__ == "__main__":
+    main()
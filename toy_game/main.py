@@ -2,7 +2,8 @@
 Advanced RP-style Rule Engine Demo - Showcasing RPE Principles
 
 Run:
-  python toy_game/main.py
+  python toy_game/main.py [--seed N] [--record session.rpil]
+  python toy_game/main.py --rules      # print the compiled rule DAG
 
 Controls:
   Arrow keys: Move player (blue square)
@@ -20,11 +21,14 @@ RPE Primitives Demonstrated:
 
 from __future__ import annotations
 
+import hashlib
 import math
 import random
+import time
 import tkinter as tk
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PRIMITIVE LABELS
@@ -32,6 +36,15 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 ONTOLOGY, GEOMETRY, CONSTRAINT, EPISTEMIC, DYNAMICS, META = (
     "ONTOLOGY", "GEOMETRY", "CONSTRAINT", "EPISTEMIC", "DYNAMICS", "META"
 )
+GCO = "GCO"  # End-of-tick closure; a phase for rules, never a relation primitive
+
+# Default EPISTEMIC sense radius per entity kind
+DEFAULT_SENSE_RADII: Dict[str, float] = {
+    "Player": 200,
+    "Hostile": 140,
+    "Converted": 160,
+    "Passive": 100,
+}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -86,6 +99,726 @@ class GeometryContext:
     occluded_by: Dict[Tuple[str, str], Wall]  # (src, tgt) -> blocking wall
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# EVENTS - typed records, formatted only when displayed
+# ═══════════════════════════════════════════════════════════════════════════════
+EV_BOUNDARY = "boundary"
+EV_DEPLETED = "depleted"
+EV_SPAWNED = "spawned"
+EV_WAVE = "wave"
+EV_COLLIDED = "collided"
+EV_CONVERTED = "converted"
+EV_FOOD_EATEN = "food_eaten"
+EV_VICTORY = "victory"
+EV_ACCELERATED = "accelerated"
+EV_SHIELD_BLOCK = "shield_block"
+EV_GAME_OVER = "game_over"
+
+# Per-entity, per-tick chatter: only recorded when a subscriber asks for it
+QUIET_EVENTS = {EV_BOUNDARY, EV_DEPLETED}
+
+EVENT_FORMATS: Dict[str, Callable[["GameEvent"], str]] = {
+    EV_BOUNDARY: lambda e: f"{e.ids[0]} hit boundary",
+    EV_DEPLETED: lambda e: f"{e.ids[0]} {e.detail} depleted",
+    EV_SPAWNED: lambda e: f"META: Spawned {e.ids[0]}",
+    EV_WAVE: lambda e: f"META: Wave {int(e.values[0])} - Difficulty increased to {e.values[1]:.2f}",
+    EV_COLLIDED: lambda e: f"META: {e.ids[0]} and {e.ids[1]} collided -> Converted",
+    EV_CONVERTED: lambda e: f"META: {e.ids[0]} converted {e.ids[1]}",
+    EV_FOOD_EATEN: lambda e: f"Player ate {e.ids[0]} (Score: {int(e.values[0])})",
+    EV_VICTORY: lambda e: "VICTORY!",
+    EV_ACCELERATED: lambda e: f"META: Enemies accelerated! (+{e.values[0]:.0%} speed)",
+    EV_SHIELD_BLOCK: lambda e: f"Shield blocked hit from {e.ids[0]}!",
+    EV_GAME_OVER: lambda e: f"Game Over - Hit by {e.ids[0]}",
+}
+
+
+@dataclass
+class GameEvent:
+    """Something that happened during a tick; text is built only on display."""
+    kind: str
+    tick: int
+    ids: Tuple[str, ...] = ()
+    values: Tuple[float, ...] = ()
+    detail: str = ""
+    
+    def __str__(self) -> str:
+        return EVENT_FORMATS[self.kind](self)
+
+
+class EventBus:
+    """Per-world subscribers, filtered by event kind."""
+    
+    def __init__(self) -> None:
+        self.subscribers: Dict[Optional[str], List[Callable[[GameEvent], None]]] = {}
+    
+    def subscribe(self, callback: Callable[[GameEvent], None],
+                  kinds: Optional[Sequence[str]] = None) -> Callable[[], None]:
+        """Call `callback` for each event of `kinds` (all kinds if None); returns an unsubscribe function."""
+        keys: List[Optional[str]] = list(kinds) if kinds is not None else [None]
+        for key in keys:
+            self.subscribers.setdefault(key, []).append(callback)
+        
+        def unsubscribe() -> None:
+            for key in keys:
+                callbacks = self.subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self.subscribers.pop(key, None)
+        return unsubscribe
+    
+    def wants(self, kind: str) -> bool:
+        return kind in self.subscribers or None in self.subscribers
+    
+    def publish(self, events: Sequence[GameEvent]) -> None:
+        if not self.subscribers:
+            return
+        everything = self.subscribers.get(None, ())
+        for event in events:
+            for callback in self.subscribers.get(event.kind, ()):
+                callback(event)
+            for callback in everything:
+                callback(event)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TIMERS - hierarchical timer wheel for timed effects
+# ═══════════════════════════════════════════════════════════════════════════════
+# A timer is (due_tick, kind, entity_id). Kinds name a handler in
+# TIMER_HANDLERS, so pending timers are plain data (snapshots, forks).
+Timer = Tuple[int, str, str]
+
+WHEEL_SLOT_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_SLOT_BITS  # 64 slots per level
+WHEEL_LEVELS = 3  # Level n slots span 64**n ticks; later timers wait in overflow
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel: scheduling is O(1), and advancing a tick only
+    touches the timers due that tick (plus an amortized cascade when a
+    coarser slot comes due), however many entities carry timers.
+    """
+    
+    def __init__(self, now: int = 0) -> None:
+        self.now = now  # Next tick to be fired
+        self.levels: List[List[List[Timer]]] = [[[] for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)]
+        self.overflow: List[Timer] = []
+        self.expired: List[str] = []  # Notes from this tick's handlers, for the GCO report
+    
+    def schedule(self, due: int, kind: str, eid: str) -> None:
+        """Fire `kind` for `eid` during tick `due` (next tick if that has passed)."""
+        self._place((max(due, self.now), kind, eid))
+    
+    def _place(self, timer: Timer) -> None:
+        delta = timer[0] - self.now
+        for level in range(WHEEL_LEVELS):
+            if delta < 1 << (WHEEL_SLOT_BITS * (level + 1)):
+                slot = (timer[0] >> (WHEEL_SLOT_BITS * level)) & (WHEEL_SLOTS - 1)
+                self.levels[level][slot].append(timer)
+                return
+        self.overflow.append(timer)
+    
+    def advance(self, tick: int) -> List[Timer]:
+        """Collect every timer due up to and including `tick`."""
+        due: List[Timer] = []
+        while self.now <= tick:
+            t = self.now
+            # Cascade coarser slots that start at this tick, coarsest first
+            for level in range(WHEEL_LEVELS, 0, -1):
+                if t & ((1 << (WHEEL_SLOT_BITS * level)) - 1):
+                    continue
+                if level == WHEEL_LEVELS:
+                    pending, self.overflow = self.overflow, []
+                else:
+                    slots = self.levels[level]
+                    slot = (t >> (WHEEL_SLOT_BITS * level)) & (WHEEL_SLOTS - 1)
+                    pending, slots[slot] = slots[slot], []
+                for timer in pending:
+                    self._place(timer)
+            slot = t & (WHEEL_SLOTS - 1)
+            if self.levels[0][slot]:
+                due.extend(self.levels[0][slot])
+                self.levels[0][slot] = []
+            self.now = t + 1
+        return due
+    
+    def pending(self) -> List[Timer]:
+        timers = [t for level in self.levels for slot in level for t in slot] + self.overflow
+        return sorted(timers)
+    
+    def clear(self, now: int = 0) -> None:
+        self.__init__(now)
+    
+    def copy(self) -> "TimerWheel":
+        """Independent wheel with the same pending timers (timers are immutable tuples)."""
+        wheel = TimerWheel.__new__(TimerWheel)
+        wheel.now = self.now
+        wheel.levels = [[list(slot) for slot in level] for level in self.levels]
+        wheel.overflow = list(self.overflow)
+        wheel.expired = []
+        return wheel
+    
+    def __len__(self) -> int:
+        return sum(len(slot) for level in self.levels for slot in level) + len(self.overflow)
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TimerWheel) and self.now == other.now and self.pending() == other.pending()
+    
+    def __repr__(self) -> str:
+        return f"TimerWheel(now={self.now}, pending={len(self)})"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TICK ARENA - per-tick containers reused instead of reallocated
+# ═══════════════════════════════════════════════════════════════════════════════
+class TickArena:
+    """
+    Scratch containers that survive from tick to tick. Phases ask the arena
+    for a cleared list/set (or the pooled GeometryContext, KnowledgeGraph)
+    instead of building fresh ones, so a steady-state tick only
+    allocates the tuples and events it actually produces. Whatever a slot
+    holds is valid until that slot is requested again.
+    """
+    
+    def __init__(self) -> None:
+        self.lists: Dict[str, list] = {}
+        self.sets: Dict[str, set] = {}
+        self.entity_lists: Dict[Tuple[str, str], list] = {}  # (slot, entity id) -> list
+        self.geometry: Optional[GeometryContext] = None
+        self.knowledge: Dict[str, KnowledgeGraph] = {}
+        # Two memory dicts per entity, used alternately: last tick's stays
+        # readable (the buffered read view shares it) while this tick's fills
+        self.memory: Dict[str, Tuple[dict, dict]] = {}
+        self.forecast: Optional[Tuple[int, Optional[Tuple[float, float]]]] = None  # (tick, forecast_player result)
+    
+    def list(self, slot: str) -> list:
+        out = self.lists.get(slot)
+        if out is None:
+            out = self.lists[slot] = []
+        else:
+            out.clear()
+        return out
+    
+    def set(self, slot: str) -> set:
+        out = self.sets.get(slot)
+        if out is None:
+            out = self.sets[slot] = set()
+        else:
+            out.clear()
+        return out
+    
+    def entity_list(self, slot: str, eid: str) -> list:
+        """A cleared list owned by one entity, for results that outlive the loop iteration."""
+        key = (slot, eid)
+        out = self.entity_lists.get(key)
+        if out is None:
+            out = self.entity_lists[key] = []
+        else:
+            out.clear()
+        return out
+    
+    def memory_buffer(self, eid: str, current: Optional[dict]) -> dict:
+        """A cleared memory dict for `eid` that is not `current`."""
+        pair = self.memory.get(eid)
+        if pair is None:
+            pair = self.memory[eid] = ({}, {})
+        out = pair[1] if current is pair[0] else pair[0]
+        out.clear()
+        return out
+    
+    def prune(self, live: Set[str]) -> None:
+        """Forget per-entity slots of entities that no longer exist."""
+        if not self.knowledge.keys() <= live:
+            for eid in [eid for eid in self.knowledge if eid not in live]:
+                del self.knowledge[eid]
+        if not self.memory.keys() <= live:
+            for eid in [eid for eid in self.memory if eid not in live]:
+                del self.memory[eid]
+        if len(self.entity_lists) > 4 * len(live):
+            for key in [key for key in self.entity_lists if key[1] not in live]:
+                del self.entity_lists[key]
+
+
+def scratch_list(world: World, slot: str) -> list:
+    """Cleared arena list, or a new one when the world runs without an arena."""
+    return world.scratch.list(slot) if world.scratch is not None else []
+
+
+def scratch_set(world: World, slot: str) -> set:
+    return world.scratch.set(slot) if world.scratch is not None else set()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TACTICAL MAPS - coarse influence grids for ambush and search planning
+# ═══════════════════════════════════════════════════════════════════════════════
+# Cells are TACTIC_CELL px squares keyed (cx, cy); a sector is a block of
+# SECTOR_CELLS x SECTOR_CELLS cells. Layers are sparse dicts:
+#   food      attractiveness, a ring peaking AMBUSH_DIST from each food
+#   heat      decaying count of ticks the player spent in the cell
+#   choke     (static) how hemmed in by walls and borders the cell is
+#   coverage  (static) share of open sightline length around the cell
+Cell = Tuple[int, int]
+
+TACTIC_CELL = 25.0
+SECTOR_CELLS = 8
+FOOD_RANGE = 200.0  # Food this close makes a hostile consider an ambush
+AMBUSH_DIST = 35.0  # Preferred stand-off from the food
+FOOD_PEAK = 1000  # Integer kernel, so adding/removing food is exact in any order
+HEAT_DECAY = 0.995  # Per-tick heat retention (half-life ~140 ticks)
+HEAT_FULL = 50.0  # Heat at which a cell counts as a player haunt
+CHOKE_RANGE = 45.0
+SIGHT_RANGE = 150.0
+SIGHT_RAYS = 8
+SEARCH_CELLS = 3  # Search window: this many cells around the last sighting
+SEARCH_POINTS = 8
+
+_RAYS = [(math.cos(2 * math.pi * k / SIGHT_RAYS), math.sin(2 * math.pi * k / SIGHT_RAYS)) for k in range(SIGHT_RAYS)]
+
+
+def _ray_hit(x: float, y: float, dx: float, dy: float, wall: Wall) -> float:
+    """Distance along the unit ray (dx, dy) from (x, y) to `wall`, or inf."""
+    ex, ey = wall.x2 - wall.x1, wall.y2 - wall.y1
+    denom = dx * ey - dy * ex
+    if abs(denom) < 1e-12:
+        return math.inf
+    wx, wy = wall.x1 - x, wall.y1 - y
+    t = (wx * ey - wy * ex) / denom
+    u = (wx * dy - wy * dx) / denom
+    return t if t >= 0 and 0 <= u <= 1 else math.inf
+
+
+class TacticalMap:
+    """
+    Influence maps kept up to date incrementally on a coarse grid. Food
+    kernels are stamped/unstamped as food appears and disappears, player
+    heat is deposited once per tick (decay is a global scale, so cold cells
+    are never touched), and the static wall layers are computed a sector at
+    a time on first use. Ambush and search read a sector's cached best
+    cells, recomputed only after something in that sector changed.
+    """
+    
+    def __init__(self) -> None:
+        self.food_sources: Dict[str, Tuple[float, float]] = {}  # food id -> position stamped
+        self._food: Optional[Dict[Cell, int]] = {}  # None: not built yet (see the food property)
+        self.heat: Dict[Cell, float] = {}  # Stored pre-multiplied by heat_scale
+        self.heat_scale = 1.0
+        self.static: Dict[Cell, Tuple[float, float]] = {}  # cell -> (choke, coverage)
+        self.static_sectors: Set[Cell] = set()
+        self.ambush: Dict[Cell, Dict[Tuple[str, ...], Optional[Cell]]] = {}  # sector -> known food ids -> best cell
+        self._walls: Optional[List[Wall]] = None
+        self._wall_count = 0
+    
+    @staticmethod
+    def cell_of(x: float, y: float) -> Cell:
+        return (int(x // TACTIC_CELL), int(y // TACTIC_CELL))
+    
+    @staticmethod
+    def center(cell: Cell) -> Tuple[float, float]:
+        return ((cell[0] + 0.5) * TACTIC_CELL, (cell[1] + 0.5) * TACTIC_CELL)
+    
+    @staticmethod
+    def sector_of(cell: Cell) -> Cell:
+        return (cell[0] // SECTOR_CELLS, cell[1] // SECTOR_CELLS)
+    
+    @property
+    def food(self) -> Dict[Cell, int]:
+        """
+        Food attractiveness per cell. A restored map only has food_sources;
+        its kernels are stamped here on first use rather than while loading.
+        """
+        if self._food is None:
+            self._food = {}
+            for x, y in self.food_sources.values():
+                self._stamp_food(x, y, 1)
+        return self._food
+    
+    def food_at(self, x: float, y: float) -> int:
+        return self.food.get(self.cell_of(x, y), 0)
+    
+    def heat_at(self, cell: Cell) -> float:
+        """Player heat of `cell`, 0 (never visited) to 1 (a haunt)."""
+        return min(1.0, self.heat.get(cell, 0.0) / self.heat_scale / HEAT_FULL)
+    
+    @classmethod
+    def food_value(cls, cell: Cell, x: float, y: float) -> int:
+        """Kernel of food at (x, y) in `cell`: peaks AMBUSH_DIST away, 0 from FOOD_RANGE on."""
+        px, py = cls.center(cell)
+        dist = math.sqrt((px - x) ** 2 + (py - y) ** 2)
+        if dist >= FOOD_RANGE:
+            return 0
+        return max(0, int(FOOD_PEAK * (1 - abs(dist - AMBUSH_DIST) / FOOD_RANGE)))
+    
+    def _stamp_food(self, x: float, y: float, sign: int) -> None:
+        reach = int(FOOD_RANGE // TACTIC_CELL) + 1
+        cx, cy = self.cell_of(x, y)
+        food = self._food
+        if food is not None:  # Not built yet: the build stamps from food_sources
+            for gx in range(cx - reach, cx + reach + 1):
+                for gy in range(cy - reach, cy + reach + 1):
+                    value = self.food_value((gx, gy), x, y)
+                    if value <= 0:
+                        continue
+                    total = food.get((gx, gy), 0) + sign * value
+                    if total:
+                        food[(gx, gy)] = total
+                    else:
+                        del food[(gx, gy)]
+        s0, s1 = self.sector_of((cx - reach, cy - reach)), self.sector_of((cx + reach, cy + reach))
+        for sx in range(s0[0], s1[0] + 1):
+            for sy in range(s0[1], s1[1] + 1):
+                self.ambush.pop((sx, sy), None)
+    
+    def add_food(self, fid: str, x: float, y: float) -> None:
+        self.food_sources[fid] = (x, y)
+        self._stamp_food(x, y, 1)
+    
+    def remove_food(self, fid: str) -> None:
+        x, y = self.food_sources.pop(fid)
+        self._stamp_food(x, y, -1)
+    
+    def update(self, world: World) -> None:
+        """Fold this tick's changes in: walls swapped, food spawned/eaten, player position."""
+        if world.walls is not self._walls or len(world.walls) != self._wall_count:
+            self._walls, self._wall_count = world.walls, len(world.walls)
+            # Fresh containers rather than clear(): forks may share the old ones
+            self.static = {}
+            self.static_sectors = set()
+            self.ambush = {}
+    
+        live = 0
+        for ent in world.entities.values():
+            if ent.kind == "Food":
+                live += 1
+                if ent.id not in self.food_sources:
+                    self.add_food(ent.id, ent.x, ent.y)
+        if len(self.food_sources) > live:
+            for fid in [fid for fid in self.food_sources
+                        if fid not in world.entities or world.entities[fid].kind != "Food"]:
+                self.remove_food(fid)
+    
+        self.heat_scale /= HEAT_DECAY
+        player = world.entities.get("player")
+        if player:
+            cell = self.cell_of(player.x, player.y)
+            self.heat[cell] = self.heat.get(cell, 0.0) + self.heat_scale
+            self.ambush.pop(self.sector_of(cell), None)
+        if self.heat_scale > 1e50:
+            # Rebase before the scale overflows; long-cold cells drop out
+            for cell in list(self.heat):
+                value = self.heat[cell] / self.heat_scale
+                if value < 1e-6:
+                    del self.heat[cell]
+                else:
+                    self.heat[cell] = value
+            self.heat_scale = 1.0
+    
+    def _ensure_static(self, world: World, sector: Cell) -> None:
+        if sector in self.static_sectors:
+            return
+        self.static_sectors.add(sector)
+        x0, y0 = sector[0] * SECTOR_CELLS * TACTIC_CELL, sector[1] * SECTOR_CELLS * TACTIC_CELL
+        x1, y1 = x0 + SECTOR_CELLS * TACTIC_CELL, y0 + SECTOR_CELLS * TACTIC_CELL
+        m = max(CHOKE_RANGE, SIGHT_RANGE)
+        walls = [
+            w for w in world.walls
+            if min(w.x1, w.x2) <= x1 + m and max(w.x1, w.x2) >= x0 - m
+            and min(w.y1, w.y2) <= y1 + m and max(w.y1, w.y2) >= y0 - m
+        ]
+        for gx in range(sector[0] * SECTOR_CELLS, (sector[0] + 1) * SECTOR_CELLS):
+            for gy in range(sector[1] * SECTOR_CELLS, (sector[1] + 1) * SECTOR_CELLS):
+                x, y = self.center((gx, gy))
+                # Choke: obstacles (walls and map edges) within reach on more than one side
+                near = sum(1 for edge in (x, y, world.width - x, world.height - y) if edge < CHOKE_RANGE)
+                for w in walls:
+                    px, py = closest_point_on_segment(x, y, w.x1, w.y1, w.x2, w.y2)
+                    if math.sqrt((x - px) ** 2 + (y - py) ** 2) < CHOKE_RANGE:
+                        near += 1
+                choke = min(1.0, max(0, near - 1) / 2)
+                # Coverage: mean open length of SIGHT_RAYS rays, clipped by walls and edges
+                seen = 0.0
+                for dx, dy in _RAYS:
+                    reach = SIGHT_RANGE
+                    if dx > 1e-9:
+                        reach = min(reach, (world.width - x) / dx)
+                    elif dx < -1e-9:
+                        reach = min(reach, -x / dx)
+                    if dy > 1e-9:
+                        reach = min(reach, (world.height - y) / dy)
+                    elif dy < -1e-9:
+                        reach = min(reach, -y / dy)
+                    for w in walls:
+                        reach = min(reach, _ray_hit(x, y, dx, dy, w))
+                    seen += max(0.0, reach)
+                self.static[(gx, gy)] = (choke, seen / (SIGHT_RAYS * SIGHT_RANGE))
+    
+    def static_at(self, world: World, cell: Cell) -> Tuple[float, float]:
+        """(choke, coverage) of `cell`."""
+        self._ensure_static(world, self.sector_of(cell))
+        return self.static[cell]
+    
+    def best_ambush(self, world: World, x: float, y: float, known: Sequence[str]) -> Optional[Tuple[float, float]]:
+        """
+        Best ambush spot in the sector around (x, y) near the food ids in
+        `known` (what the hostile has sensed), preferably at a chokepoint
+        with good sightlines where the player has been before. Only the
+        known foods' kernels count, so other food in range neither draws
+        the hostile nor shifts its choice. None if no known food reaches
+        the sector.
+        """
+        sources = [self.food_sources[fid] for fid in known if fid in self.food_sources]
+        sector = self.sector_of(self.cell_of(x, y))
+        cached = self.ambush.setdefault(sector, {})
+        key = tuple(sorted(known))
+        if key not in cached:
+            self._ensure_static(world, sector)
+            layer = self.food
+            best: Optional[Cell] = None
+            best_score = 0.0
+            for gx in range(sector[0] * SECTOR_CELLS, (sector[0] + 1) * SECTOR_CELLS):
+                for gy in range(sector[1] * SECTOR_CELLS, (sector[1] + 1) * SECTOR_CELLS):
+                    if layer.get((gx, gy), 0) <= 0:  # No food at all reaches this cell
+                        continue
+                    food = sum(self.food_value((gx, gy), fx, fy) for fx, fy in sources)
+                    if food <= 0:
+                        continue
+                    choke, coverage = self.static[(gx, gy)]
+                    score = food / FOOD_PEAK * (1 + 0.5 * choke + 0.3 * coverage) + 0.5 * self.heat_at((gx, gy))
+                    if score > best_score:
+                        best, best_score = (gx, gy), score
+            cached[key] = best
+        best = cached[key]
+        return self.center(best) if best is not None else None
+    
+    def search_points(self, world: World, x: float, y: float) -> List[Tuple[float, float]]:
+        """
+        Route for searching around a last sighting at (x, y): the sighting
+        itself, then the SEARCH_POINTS cells nearby the player is most likely
+        to be in or seen from, visited nearest-first.
+        """
+        cx, cy = self.cell_of(x, y)
+        ranked: List[Tuple[float, Cell]] = []
+        for gx in range(cx - SEARCH_CELLS, cx + SEARCH_CELLS + 1):
+            for gy in range(cy - SEARCH_CELLS, cy + SEARCH_CELLS + 1):
+                if (gx, gy) == (cx, cy):
+                    continue
+                px, py = self.center((gx, gy))
+                if not (0 <= px <= world.width and 0 <= py <= world.height):
+                    continue
+                choke, coverage = self.static_at(world, (gx, gy))
+                ranked.append((-(self.heat_at((gx, gy)) + 0.5 * coverage + 0.3 * choke), (gx, gy)))
+        ranked.sort()
+        todo = [self.center(cell) for _, cell in ranked[:SEARCH_POINTS]]
+        route = [(x, y)]
+        while todo:
+            lx, ly = route[-1]
+            nxt = min(todo, key=lambda p: (p[0] - lx) ** 2 + (p[1] - ly) ** 2)
+            todo.remove(nxt)
+            route.append(nxt)
+        return route
+    
+    def clear(self) -> None:
+        self.__init__()
+    
+    def fork(self) -> "TacticalMap":
+        """
+        Copy for a forked world. Food and heat layers are copied; the static
+        wall layers only depend on the walls, so both maps share (and fill)
+        them until one of them sees the walls change.
+        """
+        tactics = TacticalMap.__new__(TacticalMap)
+        tactics.food_sources = dict(self.food_sources)
+        tactics._food = dict(self._food) if self._food is not None else None
+        tactics.heat = dict(self.heat)
+        tactics.heat_scale = self.heat_scale
+        tactics.static = self.static
+        tactics.static_sectors = self.static_sectors
+        tactics.ambush = {sector: dict(best) for sector, best in self.ambush.items()}
+        tactics._walls, tactics._wall_count = self._walls, self._wall_count
+        return tactics
+    
+    @classmethod
+    def restore(cls, food_sources: Dict[str, Tuple[float, float]], heat: Dict[Cell, float],
+                heat_scale: float) -> "TacticalMap":
+        """Rebuild from the persistent state (derived layers are recomputed on first use)."""
+        tactics = cls()
+        tactics.food_sources = dict(food_sources)
+        tactics._food = None
+        tactics.heat = dict(heat)
+        tactics.heat_scale = heat_scale
+        return tactics
+    
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, TacticalMap) and self.food_sources == other.food_sources
+                and self.heat == other.heat and self.heat_scale == other.heat_scale)
+    
+    def __repr__(self) -> str:
+        return f"TacticalMap(food={len(self.food_sources)}, heat_cells={len(self.heat)})"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RULE REGISTRY - declarative rules compiled into a per-phase dependency DAG
+# ═══════════════════════════════════════════════════════════════════════════════
+# Rules name the primitive (phase) they belong to and the world fields they
+# read and write, using the vocabulary below. Within a phase, a rule depends
+# on every earlier-registered rule it conflicts with (write/read, read/write
+# or write/write); rules in the same DAG level are independent.
+#
+#   entities  the entity set         relations  the relation list
+#   pos kind speed stamina energy shield invulnerable memory alert
+#             per-entity state       conversion_cooldown timers
+#   walls tick score wave difficulty game_over game_win   world scalars
+#
+# TRACKED_FIELDS carry a version in World.changes, bumped by whoever
+# mutates them. A rule registered with skip_unchanged=True may only read
+# tracked fields and is skipped while none of them changed since it last ran.
+# GCO rules touch() every field they actually changed (naming the entity ids
+# involved), which is what drives the GCO fixed point (see run_gco).
+TRACKED_FIELDS = frozenset({"entities", "relations", "score", "wave"})
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One registered world rule: its phase, its read/write sets and the function applying it."""
+    name: str
+    primitive: str
+    fn: Callable[[World], Optional[List[GameEvent]]]
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    skip_unchanged: bool = False
+    scoped: bool = False  # fn(world, scope) can limit itself to a set of entity ids
+
+
+RULES: List[Rule] = []  # Registration order breaks ties between conflicting rules
+
+
+def rule(primitive: str, reads: Sequence[str], writes: Sequence[str], skip_unchanged: bool = False,
+         scoped: bool = False):
+    """Decorator registering `fn(world) -> Optional[List[GameEvent]]` as a rule of `primitive`."""
+    def register(fn: Callable[[World], Optional[List[GameEvent]]]):
+        r = Rule(fn.__name__, primitive, fn, frozenset(reads), frozenset(writes), skip_unchanged, scoped)
+        if skip_unchanged and not r.reads <= TRACKED_FIELDS:
+            raise ValueError(f"Rule {r.name} reads untracked fields {sorted(r.reads - TRACKED_FIELDS)}; it can't be skipped")
+        RULES.append(r)
+        _SCHEDULES.clear()
+        return fn
+    return register
+
+
+@dataclass
+class PhaseSchedule:
+    """A phase's rules compiled into dependency levels."""
+    primitive: str
+    after: Dict[str, List[str]]  # rule -> earlier rules it must follow
+    levels: List[List[Rule]]  # Rules of one level are independent of each other
+    
+    @property
+    def order(self) -> List[Rule]:
+        """Sequential run order: level by level."""
+        return [r for level in self.levels for r in level]
+
+
+_SCHEDULES: Dict[str, PhaseSchedule] = {}
+
+
+def compile_phase(primitive: str) -> PhaseSchedule:
+    rules = [r for r in RULES if r.primitive == primitive]
+    after: Dict[str, List[str]] = {}
+    level_of: Dict[str, int] = {}
+    for i, r in enumerate(rules):
+        before = [p for p in rules[:i] if p.writes & (r.reads | r.writes) or p.reads & r.writes]
+        after[r.name] = [p.name for p in before]
+        level_of[r.name] = 1 + max((level_of[p.name] for p in before), default=-1)
+    depth = max(level_of.values(), default=-1) + 1
+    return PhaseSchedule(primitive, after, [[r for r in rules if level_of[r.name] == k] for k in range(depth)])
+
+
+def phase_schedule(primitive: str) -> PhaseSchedule:
+    schedule = _SCHEDULES.get(primitive)
+    if schedule is None:
+        schedule = _SCHEDULES[primitive] = compile_phase(primitive)
+    return schedule
+
+
+class ChangeLog:
+    """Version counters for TRACKED_FIELDS and the versions each skippable rule last ran on."""
+    
+    def __init__(self) -> None:
+        self.clock = 0
+        self.versions: Dict[str, int] = {}
+        self.seen: Dict[str, Tuple[int, ...]] = {}
+        self.ran = 0
+        self.skipped = 0
+        self.affected: Optional[Set[str]] = set()  # Entity ids named by touches since reset (None: all)
+    
+    def touch(self, *names: str, ids: Optional[Iterable[str]] = None) -> None:
+        self.clock += 1
+        for name in names:
+            self.versions[name] = self.clock
+        if ids is None:
+            self.affected = None
+        elif self.affected is not None:
+            self.affected.update(ids)
+    
+    def changed_since(self, clock: int, names: FrozenSet[str]) -> Set[str]:
+        return {name for name in names if self.versions.get(name, 0) > clock}
+    
+    def stamp(self, names: FrozenSet[str]) -> Tuple[int, ...]:
+        return tuple(self.versions.get(name, 0) for name in sorted(names))
+    
+    def copy(self) -> "ChangeLog":
+        log = ChangeLog()
+        log.clock = self.clock
+        log.versions = dict(self.versions)
+        log.seen = dict(self.seen)
+        return log
+
+
+def run_rule(world: World, r: Rule, scope: Optional[Set[str]] = None) -> Optional[List[GameEvent]]:
+    changes = world.changes
+    if r.skip_unchanged and changes.seen.get(r.name) == changes.stamp(r.reads):
+        changes.skipped += 1
+        return None
+    changes.ran += 1
+    out = r.fn(world, scope) if r.scoped else r.fn(world)
+    if r.skip_unchanged:
+        changes.seen[r.name] = changes.stamp(r.reads)
+    return out
+
+
+def run_phase(world: World, primitive: str, executor: Optional[Any] = None) -> List[GameEvent]:
+    """
+    Run a phase's rules level by level. With an executor (anything with
+    .map, e.g. a ThreadPoolExecutor) the rules of a level run concurrently;
+    events are collected in registration order either way.
+    """
+    events: List[GameEvent] = []
+    for level in phase_schedule(primitive).levels:
+        if executor is None or len(level) == 1:
+            results = [run_rule(world, r) for r in level]
+        else:
+            results = list(executor.map(lambda r: run_rule(world, r), level))
+        for out in results:
+            if out:
+                events.extend(out)
+    return events
+
+
+def describe_rules() -> str:
+    """Human-readable dump of every phase's compiled DAG."""
+    lines: List[str] = []
+    for primitive in (CONSTRAINT, META, GCO):
+        schedule = phase_schedule(primitive)
+        lines.append(primitive)
+        for k, level in enumerate(schedule.levels):
+            for r in level:
+                deps = ", ".join(schedule.after[r.name]) or "-"
+                skip = " (skipped while unchanged)" if r.skip_unchanged else ""
+                lines.append(f"  L{k} {r.name:<26} reads {','.join(sorted(r.reads))} | "
+                             f"writes {','.join(sorted(r.writes))} | after {deps}{skip}")
+    return "\n".join(lines)
+
+
 @dataclass
 class World:
     """The complete simulation state."""
@@ -102,10 +835,144 @@ class World:
     wave: int = 1
     difficulty: float = 1.0
     enemy_speed_boost: float = 0.0  # Accumulated speed boost from player eating food
+    # Tuning knobs (defaults reproduce the hand-tuned game)
+    wave_score_step: int = 3  # Score needed per wave advance
+    speed_boost_per_food: float = 0.08  # Enemy speed gain each time the player eats
+    lookahead: int = 0  # Ticks of forked rollouts behind intercepts (0: straight-line extrapolation)
+    sense_radii: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_SENSE_RADII))
     # GCO report for debugging/visualization
     gco_report: Dict[str, Any] = field(default_factory=dict)
-    # Closure events for narrative
-    events: List[str] = field(default_factory=list)
+    # Closure events for narrative (this tick's records) and their subscribers
+    events: List[GameEvent] = field(default_factory=list)
+    event_bus: EventBus = field(default_factory=EventBus, compare=False, repr=False)
+    # Double-buffered mode: EPISTEMIC/DYNAMICS/META read `previous` (the state
+    # committed at the start of their tick) and write into `entities`
+    double_buffered: bool = False
+    previous: Optional[Dict[str, Entity]] = None
+    # Deterministic randomness: world seed + per-stream draw counters
+    seed: int = 0
+    rng_counters: Dict[str, int] = field(default_factory=dict)
+    # Expiry of cooldowns, invulnerability and other timed effects
+    timers: TimerWheel = field(default_factory=TimerWheel)
+    # Influence maps for ambush/search planning
+    tactics: TacticalMap = field(default_factory=TacticalMap)
+    # Versions of tracked fields, for skipping rules whose inputs didn't change
+    changes: ChangeLog = field(default_factory=ChangeLog, compare=False, repr=False)
+    # Reused per-tick containers (None allocates fresh ones every tick)
+    scratch: Optional[TickArena] = field(default_factory=TickArena, compare=False, repr=False)
+    
+    def fork(self, keep: Optional[Iterable[str]] = None) -> "World":
+        """
+        Independent copy to step() into possible futures, e.g. for lookahead.
+        Copy-on-write at container level: each entity gets its own Entity,
+        state dict and memory dict. Memory is copied because the tick arena
+        refills its memory buffers in place (TickArena.memory_buffer), so a
+        shared dict would change under the fork whenever the parent steps.
+        The other state values (patrol and search points, tuples), the
+        Relation objects, walls and tuning are shared, because step()
+        replaces those instead of mutating them. Timers, RNG counters and
+        influence maps are copied; subscribers, this tick's events and the
+        tick arena are not. `keep` limits the fork to those entity ids.
+        """
+        source = self.entities
+        ids = source.keys() if keep is None else [eid for eid in keep if eid in source]
+        entities: Dict[str, Entity] = {}
+        for eid in ids:
+            e = source[eid]
+            state = dict(e.state)
+            memory = state.get("memory")
+            if memory is not None:
+                state["memory"] = dict(memory)
+            entities[eid] = Entity(e.id, e.kind, e.color, e.x, e.y, state)
+        if keep is None:
+            relations = list(self.relations)
+        else:
+            relations = [r for r in self.relations
+                         if r.source in entities and (r.target is None or r.target in entities)]
+        fork = replace(
+            self, entities=entities, relations=relations, gco_report={}, events=[],
+            event_bus=EventBus(), previous=None, rng_counters=dict(self.rng_counters),
+            timers=self.timers.copy(), tactics=self.tactics.fork(), changes=self.changes.copy(),
+            scratch=TickArena() if self.scratch is not None else None,
+        )
+        if keep is not None:
+            fork.changes.touch("entities", "relations")
+        return fork
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DETERMINISTIC RNG STREAMS
+# ═══════════════════════════════════════════════════════════════════════════════
+# Counter-based: draw n of a stream is a pure function of (seed, stream, n).
+# Each entity draws from the stream named by its id and each subsystem from its
+# own ("meta.food", "meta.wave", ...), so results don't depend on how many draws
+# other entities made first - serial, sharded and replayed runs agree bit-for-bit.
+MASK64 = (1 << 64) - 1
+
+
+def _mix64(z: int) -> int:
+    """SplitMix64 finalizer."""
+    z = (z + 0x9E3779B97F4A7C15) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+@lru_cache(maxsize=4096)
+def stable_hash(text: str) -> int:
+    """64-bit string hash that, unlike hash(), is not salted per process."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def rng_random(world: World, stream: str) -> float:
+    """Next float in [0, 1) from the named stream."""
+    n = world.rng_counters.get(stream, 0)
+    world.rng_counters[stream] = n + 1
+    key = _mix64((world.seed & MASK64) ^ stable_hash(stream))
+    return (_mix64((key + _mix64(n)) & MASK64) >> 11) * (1.0 / (1 << 53))
+
+
+def rng_uniform(world: World, stream: str, a: float, b: float) -> float:
+    """Uniform float in [a, b) from the named stream."""
+    return a + (b - a) * rng_random(world, stream)
+
+
+def rng_choice(world: World, stream: str, seq: Sequence[Any]) -> Any:
+    """Pick one element of seq using the named stream."""
+    return seq[int(rng_random(world, stream) * len(seq))]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DOUBLE BUFFERING - order-independent phase evaluation
+# ═══════════════════════════════════════════════════════════════════════════════
+def snapshot_entities(entities: Dict[str, Entity]) -> Dict[str, Entity]:
+    """Copy entities deeply enough that later writes to the live ones don't leak in."""
+    return {
+        eid: Entity(e.id, e.kind, e.color, e.x, e.y, dict(e.state))
+        for eid, e in entities.items()
+    }
+
+
+def begin_buffered_tick(world: World) -> None:
+    """Freeze the read buffer for this tick (no-op unless double-buffered)."""
+    if world.double_buffered:
+        world.previous = snapshot_entities(world.entities)
+
+
+def read_view(world: World) -> World:
+    """
+    World to read *other* entities from.
+    In double-buffered mode this is the frozen snapshot, so per-entity work only
+    depends on last committed state and never on who was processed first.
+    """
+    if world.previous is None:
+        return world
+    return replace(world, entities=world.previous)
+
+
+def commit_buffered_tick(world: World) -> None:
+    """Commit the write buffer: it becomes the state the next tick reads."""
+    world.previous = None
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -130,6 +997,22 @@ def compute_distance(e1: Entity, e2: Entity) -> float:
     return math.sqrt((e1.x - e2.x) ** 2 + (e1.y - e2.y) ** 2)
 
 
+def _by_distance(item: Tuple[str, float]) -> float:
+    return item[1]
+
+
+def geometry_context(world: World) -> GeometryContext:
+    """This tick's GeometryContext: the arena's, emptied of last tick's pairs, or a new one."""
+    arena = world.scratch
+    if arena is None:
+        return GeometryContext(proximity={}, line_of_sight={}, influence_fields={}, occluded_by={})
+    if arena.geometry is None:
+        arena.geometry = GeometryContext(proximity={}, line_of_sight={}, influence_fields={}, occluded_by={})
+    arena.geometry.influence_fields.clear()
+    arena.geometry.occluded_by.clear()
+    return arena.geometry
+
+
 def apply_geometry(world: World) -> GeometryContext:
     """
     GEOMETRY Phase: Build geometric snapshot for the tick.
@@ -137,29 +1020,32 @@ def apply_geometry(world: World) -> GeometryContext:
     - Determine line-of-sight with wall occlusion
     - Calculate influence/danger fields
     """
-    ctx = GeometryContext(
-        proximity={},
-        line_of_sight={},
-        influence_fields={},
-        occluded_by={}
-    )
+    ctx = geometry_context(world)
     
     entities = list(world.entities.values())
     
     # Proximity computation
     for ent in entities:
-        ctx.proximity[ent.id] = []
+        near = ctx.proximity.get(ent.id)
+        if near is None:
+            near = ctx.proximity[ent.id] = []
+        else:
+            near.clear()
         for other in entities:
             if other.id == ent.id:
                 continue
             dist = compute_distance(ent, other)
-            ctx.proximity[ent.id].append((other.id, dist))
+            near.append((other.id, dist))
         # Sort by distance
-        ctx.proximity[ent.id].sort(key=lambda x: x[1])
+        near.sort(key=_by_distance)
     
     # Line-of-sight with wall occlusion
     for ent in entities:
-        ctx.line_of_sight[ent.id] = set()
+        seen = ctx.line_of_sight.get(ent.id)
+        if seen is None:
+            seen = ctx.line_of_sight[ent.id] = set()
+        else:
+            seen.clear()
         for other in entities:
             if other.id == ent.id:
                 continue
@@ -171,10 +1057,16 @@ def apply_geometry(world: World) -> GeometryContext:
                     blocking_wall = wall
                     break
             if not blocked:
-                ctx.line_of_sight[ent.id].add(other.id)
+                seen.add(other.id)
             else:
                 ctx.occluded_by[(ent.id, other.id)] = blocking_wall
     
+    # Pooled context: drop entries of entities that have left the world
+    if len(ctx.proximity) > len(entities):
+        for eid in [eid for eid in ctx.proximity if eid not in world.entities]:
+            del ctx.proximity[eid]
+            del ctx.line_of_sight[eid]
+    
     # Influence/danger fields - hostiles emit danger
     player = world.entities.get("player")
     if player:
@@ -193,60 +1085,70 @@ def apply_geometry(world: World) -> GeometryContext:
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONSTRAINT PHASE - Physical, systemic, resource bounds
 # ═══════════════════════════════════════════════════════════════════════════════
-def apply_constraint(world: World) -> List[str]:
+def apply_constraint(world: World) -> List[GameEvent]:
     """
     CONSTRAINT Phase: Enforce bounds and resource limits.
     - Clamp positions to world bounds (respecting walls)
     - Enforce stamina/energy caps
-    - Apply cooldowns
     - Validate state consistency
+    (Cooldowns expire through the timer wheel, see TIMED EFFECTS.)
     """
-    violations: List[str] = []
-    
+    return run_phase(world, CONSTRAINT)
+
+
+@rule(CONSTRAINT, reads=("relations", "pos"), writes=("pos",))
+def clamp_to_bounds(world: World) -> List[GameEvent]:
+    """Position clamping for every entity with a bounds relation."""
+    violations: List[GameEvent] = []
+    log_boundary = world.event_bus.wants(EV_BOUNDARY)
     for rel in world.relations:
-        if rel.primitive != CONSTRAINT:
+        if rel.primitive != CONSTRAINT or rel.payload.get("type", "bounds") != "bounds":
             continue
         ent = world.entities.get(rel.source)
         if not ent:
             continue
+        xmin = rel.payload.get("xmin", 0)
+        xmax = rel.payload.get("xmax", world.width)
+        ymin = rel.payload.get("ymin", 0)
+        ymax = rel.payload.get("ymax", world.height)
         
-        constraint_type = rel.payload.get("type", "bounds")
+        old_x, old_y = ent.x, ent.y
+        ent.x = max(xmin, min(xmax, ent.x))
+        ent.y = max(ymin, min(ymax, ent.y))
         
-        if constraint_type == "bounds":
-            # Position clamping
-            xmin = rel.payload.get("xmin", 0)
-            xmax = rel.payload.get("xmax", world.width)
-            ymin = rel.payload.get("ymin", 0)
-            ymax = rel.payload.get("ymax", world.height)
-            
-            old_x, old_y = ent.x, ent.y
-            ent.x = max(xmin, min(xmax, ent.x))
-            ent.y = max(ymin, min(ymax, ent.y))
-            
-            if old_x != ent.x or old_y != ent.y:
-                violations.append(f"{ent.id} hit boundary")
-        
-        elif constraint_type == "resource":
-            # Resource clamping (stamina, energy)
-            resource = rel.payload.get("resource", "stamina")
-            max_key = f"max_{resource}"
-            current = ent.state.get(resource, 0)
-            maximum = ent.state.get(max_key, 100)
-            
-            if current < 0:
-                ent.state[resource] = 0
-                violations.append(f"{ent.id} {resource} depleted")
-            elif current > maximum:
-                ent.state[resource] = maximum
+        if log_boundary and (old_x != ent.x or old_y != ent.y):
+            violations.append(GameEvent(EV_BOUNDARY, world.tick, (ent.id,)))
+    return violations
+
+
+@rule(CONSTRAINT, reads=("relations", "stamina", "energy"), writes=("stamina", "energy"))
+def clamp_resources(world: World) -> List[GameEvent]:
+    """Resource clamping (stamina, energy) to [0, max_<resource>]."""
+    violations: List[GameEvent] = []
+    log_depleted = world.event_bus.wants(EV_DEPLETED)
+    for rel in world.relations:
+        if rel.primitive != CONSTRAINT or rel.payload.get("type", "bounds") != "resource":
+            continue
+        ent = world.entities.get(rel.source)
+        if not ent:
+            continue
+        resource = rel.payload.get("resource", "stamina")
+        max_key = f"max_{resource}"
+        current = ent.state.get(resource, 0)
+        maximum = ent.state.get(max_key, 100)
         
-        elif constraint_type == "cooldown":
-            # Cooldown enforcement
-            ability = rel.payload.get("ability", "dash")
-            cooldown_key = f"{ability}_cooldown"
-            if ent.state.get(cooldown_key, 0) > 0:
-                ent.state[cooldown_key] -= 1
-    
-    # Wall collision constraint
+        if current < 0:
+            ent.state[resource] = 0
+            if log_depleted:
+                violations.append(GameEvent(EV_DEPLETED, world.tick, (ent.id,), detail=resource))
+        elif current > maximum:
+            ent.state[resource] = maximum
+    return violations
+
+
+@rule(CONSTRAINT, reads=("entities", "walls", "pos"), writes=("pos",))
+def push_out_of_walls(world: World) -> None:
+    """Wall collision constraint."""
     for ent in world.entities.values():
         for wall in world.walls:
             # Simple point-to-line-segment distance push
@@ -259,8 +1161,6 @@ def apply_constraint(world: World) -> List[str]:
                     push_y = (ent.y - closest[1]) / dist * (8 - dist)
                     ent.x += push_x
                     ent.y += push_y
-    
-    return violations
 
 
 def closest_point_on_segment(px, py, x1, y1, x2, y2) -> Tuple[float, float]:
@@ -284,6 +1184,8 @@ AI_STATE_AMBUSH = "ambush"       # Waiting near food/chokepoint
 AI_STATE_FLANK = "flank"         # Coordinating with allies to surround
 AI_STATE_INTERCEPT = "intercept" # Cutting off predicted escape route
 
+_NO_IDS: frozenset = frozenset()  # Shared default for entities missing from the geometry context
+
 
 @dataclass
 class KnowledgeGraph:
@@ -296,7 +1198,6 @@ class KnowledgeGraph:
     player_velocity: Tuple[float, float]  # Observed player movement direction
     player_predicted_pos: Tuple[float, float]  # Where player will likely be
     nearby_allies: List[str]  # Other hostiles we can coordinate with
-    nearby_food: List[Tuple[float, float]]  # Food locations for ambush planning
     search_points: List[Tuple[float, float]]  # Points to check when searching
     current_search_idx: int  # Current search point index
 
@@ -308,19 +1209,12 @@ def apply_epistemic(world: World, geo_ctx: GeometryContext) -> Dict[str, Knowled
     - Memory of last known positions
     - Player velocity tracking and prediction
     - Alert propagation between nearby hostiles
-    - Tactical awareness (allies, food positions, search patterns)
+    - Tactical awareness (allies; food and search spots come from world.tactics)
     """
     knowledge: Dict[str, KnowledgeGraph] = {}
-    player = world.entities.get("player")
-    
-    # Track player velocity globally for prediction
-    player_vel = (0.0, 0.0)
-    if player:
-        player_vel = (player.state.get("vx", 0) * player.state.get("speed", 2.8),
-                      player.state.get("vy", 0) * player.state.get("speed", 2.8))
-    
-    # Gather food positions for ambush planning
-    food_positions = [(e.x, e.y) for e in world.entities.values() if e.kind == "Food"]
+    view = read_view(world)
+    player_vel = observed_player_velocity(view)
+    arena = world.scratch
     
     for rel in world.relations:
         if rel.primitive != EPISTEMIC:
@@ -331,85 +1225,148 @@ def apply_epistemic(world: World, geo_ctx: GeometryContext) -> Dict[str, Knowled
             continue
         
         sense_radius = rel.payload.get("sense_radius", 100)
-        memory_duration = rel.payload.get("memory_duration", 60)  # ticks
-        
-        # Initialize knowledge graph with tactical fields
-        kg = KnowledgeGraph(
-            visible_entities=set(),
-            remembered_positions={},
-            alert_level=ent.state.get("alert_level", 0.0),
-            threats=set(),
-            player_velocity=(0.0, 0.0),
-            player_predicted_pos=(0.0, 0.0),
-            nearby_allies=[],
-            nearby_food=[],
-            search_points=ent.state.get("search_points", []),
-            current_search_idx=ent.state.get("current_search_idx", 0)
-        )
-        
-        # Copy existing memory
-        if "memory" in ent.state:
-            for mem_id, mem_data in ent.state["memory"].items():
-                if world.tick - mem_data[2] < memory_duration:
-                    kg.remembered_positions[mem_id] = mem_data
         
         # Check visibility
-        los = geo_ctx.line_of_sight.get(ent.id, set())
-        for other_id, dist in geo_ctx.proximity.get(ent.id, []):
-            if other_id in los and dist <= sense_radius:
-                kg.visible_entities.add(other_id)
-                other = world.entities.get(other_id)
-                if other:
-                    # Update memory with current position
-                    kg.remembered_positions[other_id] = (other.x, other.y, world.tick)
-                    
-                    # Threat assessment
-                    if ent.kind == "Player" and other.kind in ("Hostile", "Converted"):
-                        kg.threats.add(other_id)
-                    elif ent.kind in ("Hostile", "Converted") and other.kind == "Player":
-                        kg.threats.add(other_id)
-                        kg.alert_level = 1.0  # Spotted player!
-                        # Track player velocity when visible
-                        kg.player_velocity = player_vel
-                        # Predict where player will be in ~20 ticks
-                        predict_ticks = 20
-                        kg.player_predicted_pos = (
-                            other.x + player_vel[0] * predict_ticks,
-                            other.y + player_vel[1] * predict_ticks
-                        )
-                    elif ent.kind == "Hostile" and other.kind == "Passive":
-                        kg.threats.add(other_id)  # Target
-                    elif ent.kind == "Passive" and other.kind == "Hostile":
-                        kg.threats.add(other_id)  # Danger!
+        los = geo_ctx.line_of_sight.get(ent.id, _NO_IDS)
+        visible = scratch_list(world, "epistemic.visible")
+        visible.extend(
+            other_id for other_id, dist in geo_ctx.proximity.get(ent.id, ())
+            if other_id in los and dist <= sense_radius
+        )
         
         # Find nearby allies (for coordination)
+        allies: List[str] = arena.entity_list("allies", ent.id) if arena is not None else []
         if ent.kind in ("Hostile", "Converted"):
-            for other in world.entities.values():
+            for other in view.entities.values():
                 if other.id != ent.id and other.kind in ("Hostile", "Converted"):
                     if compute_distance(ent, other) < 150:
-                        kg.nearby_allies.append(other.id)
+                        allies.append(other.id)
         
-        # Find nearby food (for ambush planning)
-        for fx, fy in food_positions:
-            dist = math.sqrt((ent.x - fx) ** 2 + (ent.y - fy) ** 2)
-            if dist < 200:
-                kg.nearby_food.append((fx, fy))
-        
-        # Alert decay
-        if not kg.threats:
-            kg.alert_level = max(0, kg.alert_level - 0.02)
-        
-        # Update entity state with knowledge
-        ent.state["memory"] = kg.remembered_positions
-        ent.state["alert_level"] = kg.alert_level
-        
-        knowledge[ent.id] = kg
+        knowledge[ent.id] = build_knowledge(world, view, ent, rel, visible, allies, player_vel)
     
     # Enhanced alert propagation with tactical info sharing
-    hostiles = [e for e in world.entities.values() if e.kind in ("Hostile", "Converted")]
+    def can_relay(h1: Entity, h2: Entity) -> bool:
+        return compute_distance(h1, h2) < 120 and h2.id in geo_ctx.line_of_sight.get(h1.id, _NO_IDS)
+    
+    propagate_alerts(world, view, knowledge, can_relay)
+    return knowledge
+
+
+def observed_player_velocity(view: World) -> Tuple[float, float]:
+    """Track player velocity globally for prediction."""
+    player = view.entities.get("player")
+    if not player:
+        return (0.0, 0.0)
+    return (player.state.get("vx", 0) * player.state.get("speed", 2.8),
+            player.state.get("vy", 0) * player.state.get("speed", 2.8))
+
+
+def knowledge_graph(world: World, ent: Entity) -> KnowledgeGraph:
+    """
+    Empty KnowledgeGraph for `ent`: its pooled one with the sets and memory
+    dict cleared, or a new one without an arena. The memory dict alternates
+    between two buffers, as the entity's current memory is read while the
+    new one is filled.
+    """
+    arena = world.scratch
+    if arena is None:
+        return KnowledgeGraph(set(), {}, 0.0, set(), (0.0, 0.0), (0.0, 0.0), [], [], 0)
+    memory = arena.memory_buffer(ent.id, ent.state.get("memory"))
+    kg = arena.knowledge.get(ent.id)
+    if kg is None:
+        kg = arena.knowledge[ent.id] = KnowledgeGraph(set(), memory, 0.0, set(), (0.0, 0.0), (0.0, 0.0), [], [], 0)
+        return kg
+    kg.visible_entities.clear()
+    kg.threats.clear()
+    kg.remembered_positions = memory
+    return kg
+
+
+def build_knowledge(world: World, view: World, ent: Entity, rel: Relation,
+                    visible: List[str], allies: List[str],
+                    player_vel: Tuple[float, float]) -> KnowledgeGraph:
+    """
+    Turn one entity's sensing results (visible ids in proximity order, allies)
+    into its KnowledgeGraph and persist memory/alert on the entity.
+    """
+    memory_duration = rel.payload.get("memory_duration", 60)  # ticks
+    
+    # Initialize knowledge graph with tactical fields
+    kg = knowledge_graph(world, ent)
+    kg.alert_level = ent.state.get("alert_level", 0.0)
+    kg.player_velocity = (0.0, 0.0)
+    kg.player_predicted_pos = (0.0, 0.0)
+    kg.nearby_allies = allies
+    kg.search_points = ent.state.get("search_points", [])
+    kg.current_search_idx = ent.state.get("current_search_idx", 0)
+    
+    # Copy existing memory
+    if "memory" in ent.state:
+        for mem_id, mem_data in ent.state["memory"].items():
+            if world.tick - mem_data[2] < memory_duration:
+                kg.remembered_positions[mem_id] = mem_data
+    
+    for other_id in visible:
+        kg.visible_entities.add(other_id)
+        other = view.entities.get(other_id)
+        if not other:
+            continue
+        # Update memory with current position
+        kg.remembered_positions[other_id] = (other.x, other.y, world.tick)
+        
+        # Threat assessment
+        if ent.kind == "Player" and other.kind in ("Hostile", "Converted"):
+            kg.threats.add(other_id)
+        elif ent.kind in ("Hostile", "Converted") and other.kind == "Player":
+            kg.threats.add(other_id)
+            kg.alert_level = 1.0  # Spotted player!
+            # Track player velocity when visible
+            kg.player_velocity = player_vel
+            # Predict where player will be in ~20 ticks
+            predict_ticks = 20
+            kg.player_predicted_pos = (
+                other.x + player_vel[0] * predict_ticks,
+                other.y + player_vel[1] * predict_ticks
+            )
+        elif ent.kind == "Hostile" and other.kind == "Passive":
+            kg.threats.add(other_id)  # Target
+        elif ent.kind == "Passive" and other.kind == "Hostile":
+            kg.threats.add(other_id)  # Danger!
+    
+    # Alert decay
+    if not kg.threats:
+        kg.alert_level = max(0, kg.alert_level - 0.02)
+    
+    # Update entity state with knowledge
+    ent.state["memory"] = kg.remembered_positions
+    ent.state["alert_level"] = kg.alert_level
+    return kg
+
+
+def propagate_alerts(world: World, view: World, knowledge: Dict[str, KnowledgeGraph],
+                     can_relay: Callable[[Entity, Entity], bool]) -> None:
+    """Share alert level and player sightings between hostiles that can reach each other."""
+    hostiles = scratch_list(world, "epistemic.hostiles")
+    hostiles.extend(e for e in view.entities.values() if e.kind in ("Hostile", "Converted"))
+    # Double-buffered: propagate from pre-propagation values so relays within
+    # the same loop can't make the result depend on iteration order
+    sources: Optional[Dict[str, tuple]] = None
+    if world.double_buffered:
+        sources = {
+            hid: (kg.alert_level, kg.remembered_positions.get("player"),
+                  kg.player_velocity, kg.player_predicted_pos)
+            for hid, kg in knowledge.items()
+        }
     for h1 in hostiles:
         kg1 = knowledge.get(h1.id)
-        if not kg1 or kg1.alert_level < 0.5:
+        if not kg1:
+            continue
+        if sources is not None:
+            alert1, player_mem1, velocity1, predicted1 = sources[h1.id]
+        else:
+            alert1, player_mem1 = kg1.alert_level, kg1.remembered_positions.get("player")
+            velocity1, predicted1 = kg1.player_velocity, kg1.player_predicted_pos
+        if alert1 < 0.5:
             continue
         for h2 in hostiles:
             if h1.id == h2.id:
@@ -417,19 +1374,68 @@ def apply_epistemic(world: World, geo_ctx: GeometryContext) -> Dict[str, Knowled
             kg2 = knowledge.get(h2.id)
             if not kg2:
                 continue
-            dist = compute_distance(h1, h2)
-            if dist < 120 and h2.id in geo_ctx.line_of_sight.get(h1.id, set()):
+            if can_relay(h1, h2):
                 # Propagate alert and player memory
-                kg2.alert_level = max(kg2.alert_level, kg1.alert_level * 0.8)
-                if "player" in kg1.remembered_positions:
-                    kg2.remembered_positions["player"] = kg1.remembered_positions["player"]
+                kg2.alert_level = max(kg2.alert_level, alert1 * 0.8)
+                if player_mem1 is not None:
+                    # Buffered mode keeps the freshest sighting instead of the last writer
+                    current = kg2.remembered_positions.get("player")
+                    if sources is None or current is None or player_mem1[2] >= current[2]:
+                        kg2.remembered_positions["player"] = player_mem1
                     # Share velocity and prediction info!
-                    if kg1.player_velocity != (0.0, 0.0):
-                        kg2.player_velocity = kg1.player_velocity
-                        kg2.player_predicted_pos = kg1.player_predicted_pos
+                    if velocity1 != (0.0, 0.0):
+                        kg2.player_velocity = velocity1
+                        kg2.player_predicted_pos = predicted1
                 world.entities[h2.id].state["alert_level"] = kg2.alert_level
-    
-    return knowledge
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOOKAHEAD - forked rollouts of the player's next moves
+# ═══════════════════════════════════════════════════════════════════════════════
+FORECAST_RANGE = 250.0  # Entities this close to the player take part in rollouts
+HELD_BONUS = 60.0  # Preference (px) for the player keeping their current input
+
+
+def forecast_player(world: World) -> Optional[Tuple[float, float]]:
+    """
+    Where the player will be `world.lookahead` ticks from now. Forks the
+    neighbourhood of the player and steps it forward once per candidate
+    input: keep going, turn left, turn right. Unlike straight-line
+    extrapolation the rollouts see walls, bounds, dashes ending and being
+    caught. The future that ends nearest food wins, with a bias to the
+    held input. Computed once per tick and shared by every pursuer.
+    """
+    arena = world.scratch
+    if arena is not None and arena.forecast is not None and arena.forecast[0] == world.tick:
+        return arena.forecast[1]
+    view = read_view(world)
+    player = view.entities.get("player")
+    best: Optional[Tuple[float, Tuple[float, float]]] = None
+    if player:
+        keep = [eid for eid, e in view.entities.items() if compute_distance(player, e) < FORECAST_RANGE]
+        foods = [(e.x, e.y) for e in view.entities.values() if e.kind == "Food"]
+        vx, vy = player.state.get("vx", 0), player.state.get("vy", 0)
+        candidates = [(HELD_BONUS, vx, vy)]
+        if vx or vy:
+            candidates += [(0.0, vy, -vx), (0.0, -vy, vx)]
+        for bonus, cvx, cvy in candidates:
+            future = view.fork(keep)
+            future.lookahead = 0  # No rollouts inside rollouts
+            future.entities["player"].state.update(vx=cvx, vy=cvy)
+            for _ in range(world.lookahead):
+                step(future)
+                if future.game_over or future.game_win:
+                    break
+            me = future.entities.get("player")
+            if me is None:
+                continue
+            score = bonus - min((math.sqrt((me.x - fx) ** 2 + (me.y - fy) ** 2) for fx, fy in foods), default=0.0)
+            if best is None or score > best[0]:
+                best = (score, (me.x, me.y))
+    target = best[1] if best else None
+    if arena is not None:
+        arena.forecast = (world.tick, target)
+    return target
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -442,7 +1448,11 @@ def apply_dynamics(world: World, knowledge: Dict[str, KnowledgeGraph], geo_ctx:
     - AI decision-making based on knowledge
     - Patrol patterns
     - Combat resolution
+    
+    Each entity only writes itself; AI reads other entities through read_view(),
+    so in double-buffered mode the loop order doesn't matter.
     """
+    view = read_view(world)
     for rel in world.relations:
         if rel.primitive != DYNAMICS:
             continue
@@ -451,46 +1461,45 @@ def apply_dynamics(world: World, knowledge: Dict[str, KnowledgeGraph], geo_ctx:
         if not ent:
             continue
         
-        speed = ent.state.get("speed", rel.payload.get("speed", 1.0))
-        kg = knowledge.get(ent.id)
-        
+        speed = dynamics_speed(ent, rel)
         if ent.kind == "Player":
-            # Player movement with stamina regen
-            vx = ent.state.get("vx", 0)
-            vy = ent.state.get("vy", 0)
-            
-            # Dash handling
-            if ent.state.get("dashing", False):
-                dash_dir = ent.state.get("dash_direction", (0, 0))
-                ent.x += dash_dir[0] * speed * 4
-                ent.y += dash_dir[1] * speed * 4
-                ent.state["dash_frames"] = ent.state.get("dash_frames", 0) - 1
-                if ent.state["dash_frames"] <= 0:
-                    ent.state["dashing"] = False
-            else:
-                ent.x += vx * speed
-                ent.y += vy * speed
-            
-            # Stamina regeneration
-            stamina = ent.state.get("stamina", 100)
-            max_stamina = ent.state.get("max_stamina", 100)
-            if stamina < max_stamina and not ent.state.get("dashing", False):
-                ent.state["stamina"] = min(max_stamina, stamina + 0.5)
-            
-            # Energy regeneration
-            energy = ent.state.get("energy", 50)
-            max_energy = ent.state.get("max_energy", 50)
-            if energy < max_energy:
-                ent.state["energy"] = min(max_energy, energy + 0.2)
-        
-        elif ent.kind == "Hostile":
-            apply_hostile_ai(ent, world, kg, speed)
-        
-        elif ent.kind == "Converted":
-            apply_converted_ai(ent, world, kg, speed)
-        
-        elif ent.kind == "Passive":
-            apply_passive_ai(ent, world, kg, speed)
+            move_player(ent, speed)
+        else:
+            behaviour = AI_BEHAVIOURS.get(ent.kind)
+            if behaviour:
+                behaviour(ent, view, knowledge.get(ent.id), speed)
+
+
+def dynamics_speed(ent: Entity, rel: Relation) -> float:
+    """Speed of an entity's DYNAMICS turn: its own, else its relation's."""
+    return ent.state.get("speed", rel.payload.get("speed", 1.0))
+
+
+def move_player(ent: Entity, speed: float) -> None:
+    """Player movement with stamina and energy regen."""
+    vx = ent.state.get("vx", 0)
+    vy = ent.state.get("vy", 0)
+    
+    # Dash handling
+    if ent.state.get("dashing", False):
+        dash_dir = ent.state.get("dash_direction", (0, 0))
+        ent.x += dash_dir[0] * speed * 4
+        ent.y += dash_dir[1] * speed * 4
+    else:
+        ent.x += vx * speed
+        ent.y += vy * speed
+    
+    # Stamina regeneration
+    stamina = ent.state.get("stamina", 100)
+    max_stamina = ent.state.get("max_stamina", 100)
+    if stamina < max_stamina and not ent.state.get("dashing", False):
+        ent.state["stamina"] = min(max_stamina, stamina + 0.5)
+    
+    # Energy regeneration
+    energy = ent.state.get("energy", 50)
+    max_energy = ent.state.get("max_energy", 50)
+    if energy < max_energy:
+        ent.state["energy"] = min(max_energy, energy + 0.2)
 
 
 def apply_hostile_ai(ent: Entity, world: World, kg: Optional[KnowledgeGraph], speed: float) -> None:
@@ -536,7 +1545,7 @@ def determine_ai_state(ent: Entity, world: World, kg: Optional[KnowledgeGraph],
     can_see_player = player and "player" in kg.visible_entities
     has_memory = "player" in kg.remembered_positions
     memory_age = world.tick - kg.remembered_positions.get("player", (0, 0, 0))[2] if has_memory else 999
-    has_food_nearby = len(kg.nearby_food) > 0
+    has_food_nearby = bool(known_food(world, ent, kg))
     
     # Priority 1: If we can see the player
     if can_see_player and player:
@@ -544,8 +1553,8 @@ def determine_ai_state(ent: Entity, world: World, kg: Optional[KnowledgeGraph],
         if has_allies and len(kg.nearby_allies) >= 1:
             # Coordinate with allies - some flank, some intercept
             ally_count = len(kg.nearby_allies)
-            # Use entity ID hash to consistently assign roles
-            role_hash = hash(ent.id) % (ally_count + 1)
+            # Use entity ID hash to consistently assign roles (stable across runs)
+            role_hash = stable_hash(ent.id) % (ally_count + 1)
             if role_hash == 0:
                 return AI_STATE_INTERCEPT  # Cut off escape
             elif role_hash == 1 and ally_count >= 2:
@@ -581,6 +1590,8 @@ def execute_intercept(ent: Entity, world: World, kg: KnowledgeGraph, player: Opt
     """Cut off the player's predicted escape route."""
     if kg.player_predicted_pos != (0.0, 0.0):
         pred_x, pred_y = kg.player_predicted_pos
+        if world.lookahead:
+            pred_x, pred_y = forecast_player(world) or (pred_x, pred_y)
         # Clamp to world bounds
         pred_x = max(20, min(world.width - 20, pred_x))
         pred_y = max(20, min(world.height - 20, pred_y))
@@ -607,7 +1618,7 @@ def execute_flank(ent: Entity, world: World, kg: KnowledgeGraph, player: Optiona
         return
     
     # Perpendicular offset for flanking (alternates based on entity ID)
-    perp_sign = 1 if hash(ent.id) % 2 == 0 else -1
+    perp_sign = 1 if stable_hash(ent.id) % 2 == 0 else -1
     perp_x = -dy / dist * 50 * perp_sign
     perp_y = dx / dist * 50 * perp_sign
     
@@ -632,19 +1643,9 @@ def execute_search(ent: Entity, world: World, kg: KnowledgeGraph, speed: float)
     
     # Generate search points if we don't have them or they're stale
     if not kg.search_points or ent.state.get("search_origin") != (last_x, last_y):
-        # Create a search pattern around last known position
-        search_radius = 60
-        kg.search_points = [
-            (last_x, last_y),  # Start at last known pos
-            (last_x + search_radius, last_y),
-            (last_x + search_radius, last_y + search_radius),
-            (last_x, last_y + search_radius),
-            (last_x - search_radius, last_y + search_radius),
-            (last_x - search_radius, last_y),
-            (last_x - search_radius, last_y - search_radius),
-            (last_x, last_y - search_radius),
-            (last_x + search_radius, last_y - search_radius),
-        ]
+        # Start at the last known position, then check the player's haunts
+        # and the best vantage points around it
+        kg.search_points = world.tactics.search_points(world, last_x, last_y)
         # Clamp to bounds
         kg.search_points = [
             (max(20, min(world.width - 20, x)), max(20, min(world.height - 20, y)))
@@ -672,34 +1673,31 @@ def execute_search(ent: Entity, world: World, kg: KnowledgeGraph, speed: float)
         ent.state["search_points"] = []
 
 
+def known_food(world: World, ent: Entity, kg: KnowledgeGraph) -> List[str]:
+    """Food ids within FOOD_RANGE that `ent` has sensed (visible now or still remembered)."""
+    sources = world.tactics.food_sources
+    return [fid for fid, (fx, fy, _) in kg.remembered_positions.items()
+            if fid in sources and (ent.x - fx) ** 2 + (ent.y - fy) ** 2 < FOOD_RANGE ** 2]
+
+
 def execute_ambush(ent: Entity, world: World, kg: KnowledgeGraph, speed: float) -> None:
     """Position near food and wait for player to approach."""
-    if not kg.nearby_food:
+    # Best spot near known food: stand-off distance, chokepoint, sightlines, player haunts
+    known = known_food(world, ent, kg)
+    spot = world.tactics.best_ambush(world, ent.x, ent.y, known) if known else None
+    if spot is None:
         execute_patrol(ent, world, kg, speed)
         return
     
-    # Find the best food to ambush near (closest)
-    target_food = min(kg.nearby_food, key=lambda f: (ent.x - f[0]) ** 2 + (ent.y - f[1]) ** 2)
-    
-    # Position slightly away from food (ambush distance)
-    ambush_dist = 35
-    dx = ent.x - target_food[0]
-    dy = ent.y - target_food[1]
-    current_dist = math.sqrt(dx * dx + dy * dy)
-    
-    if current_dist < ambush_dist - 5:
-        # Too close, back off slightly
-        if current_dist > 0:
-            ent.x += (dx / current_dist) * speed * 0.3
-            ent.y += (dy / current_dist) * speed * 0.3
-    elif current_dist > ambush_dist + 10:
-        # Too far, move closer
-        chase_target(ent, target_food[0], target_food[1], speed * 0.6)
+    dist = math.sqrt((ent.x - spot[0]) ** 2 + (ent.y - spot[1]) ** 2)
+    if dist > TACTIC_CELL / 2:
+        # Not in position yet, move there
+        chase_target(ent, spot[0], spot[1], speed * 0.6)
     # else: In position, hold and wait (small random movement to look natural)
     else:
         if world.tick % 30 == 0:
-            ent.x += random.uniform(-2, 2)
-            ent.y += random.uniform(-2, 2)
+            ent.x += rng_uniform(world, ent.id, -2, 2)
+            ent.y += rng_uniform(world, ent.id, -2, 2)
 
 
 def execute_patrol(ent: Entity, world: World, kg: Optional[KnowledgeGraph], speed: float) -> None:
@@ -717,8 +1715,8 @@ def execute_patrol(ent: Entity, world: World, kg: Optional[KnowledgeGraph], spee
     
     # No patrol points - wander
     if world.tick % 20 == 0:
-        ent.state["vx"] = random.choice([-1, 0, 1])
-        ent.state["vy"] = random.choice([-1, 0, 1])
+        ent.state["vx"] = rng_choice(world, ent.id, (-1, 0, 1))
+        ent.state["vy"] = rng_choice(world, ent.id, (-1, 0, 1))
     ent.x += speed * 0.5 * ent.state.get("vx", 0)
     ent.y += speed * 0.5 * ent.state.get("vy", 0)
 
@@ -736,6 +1734,8 @@ def apply_converted_ai(ent: Entity, world: World, kg: Optional[KnowledgeGraph],
         predict_ticks = 30  # Look further ahead than regular hostile
         pred_x = player.x + kg.player_velocity[0] * predict_ticks
         pred_y = player.y + kg.player_velocity[1] * predict_ticks
+        if world.lookahead:
+            pred_x, pred_y = forecast_player(world) or (pred_x, pred_y)
         
         # Clamp to bounds
         pred_x = max(20, min(world.width - 20, pred_x))
@@ -765,8 +1765,8 @@ def apply_converted_ai(ent: Entity, world: World, kg: Optional[KnowledgeGraph],
     
     # No info - aggressive random search
     if world.tick % 8 == 0:
-        ent.state["vx"] = random.choice([-1, 0, 1])
-        ent.state["vy"] = random.choice([-1, 0, 1])
+        ent.state["vx"] = rng_choice(world, ent.id, (-1, 0, 1))
+        ent.state["vy"] = rng_choice(world, ent.id, (-1, 0, 1))
     ent.x += speed * 0.8 * ent.state.get("vx", 0)
     ent.y += speed * 0.8 * ent.state.get("vy", 0)
 
@@ -799,13 +1799,22 @@ def apply_passive_ai(ent: Entity, world: World, kg: Optional[KnowledgeGraph], sp
     
     # Priority 3: Wander (with wall avoidance)
     if world.tick % 15 == 0:
-        ent.state["vx"] = random.choice([-1, 0, 1])
-        ent.state["vy"] = random.choice([-1, 0, 1])
+        ent.state["vx"] = rng_choice(world, ent.id, (-1, 0, 1))
+        ent.state["vy"] = rng_choice(world, ent.id, (-1, 0, 1))
     wander_x = ent.x + ent.state.get("vx", 0) * 50
     wander_y = ent.y + ent.state.get("vy", 0) * 50
     move_toward_with_wall_avoidance(ent, wander_x, wander_y, speed, world)
 
 
+# Decision-making per entity kind: behaviour(ent, view, kg, speed). Each only
+# writes `ent` (and its own RNG stream) and reads other entities from `view`.
+AI_BEHAVIOURS: Dict[str, Callable[[Entity, World, Optional[KnowledgeGraph], float], None]] = {
+    "Hostile": apply_hostile_ai,
+    "Converted": apply_converted_ai,
+    "Passive": apply_passive_ai,
+}
+
+
 def chase_target(ent: Entity, tx: float, ty: float, speed: float) -> None:
     """Move entity toward target position."""
     dx = tx - ent.x
@@ -890,7 +1899,7 @@ def move_toward_with_wall_avoidance(ent: Entity, tx: float, ty: float, speed: fl
 # ═══════════════════════════════════════════════════════════════════════════════
 # META PHASE - Rules about rules, structural mutations
 # ═══════════════════════════════════════════════════════════════════════════════
-def apply_meta(world: World) -> List[str]:
+def apply_meta(world: World) -> List[GameEvent]:
     """
     META Phase: System-level mutations and rule changes.
     - Spawn food to maintain minimum
@@ -898,16 +1907,22 @@ def apply_meta(world: World) -> List[str]:
     - Difficulty scaling
     - Faction conversions
     - Role changes
+    Also runs the game-logic rules registered here (eating, player collisions).
     """
-    events: List[str] = []
-    
-    # Ensure minimum food exists
-    foods = [e for e in world.entities.values() if e.kind == "Food"]
-    food_target = 3 + world.wave
-    if len(foods) < food_target and world.tick % 25 == 0:
+    return run_phase(world, META)
+
+
+@rule(META, reads=("tick", "entities", "kind", "wave", "walls"), writes=("entities",))
+def spawn_food(world: World) -> List[GameEvent]:
+    """Ensure minimum food exists."""
+    events: List[GameEvent] = []
+    if world.tick % 25 != 0:
+        return events
+    food_count = sum(1 for e in world.entities.values() if e.kind == "Food")
+    if food_count < 3 + world.wave:
         new_id = f"food_{world.tick}"
-        x = random.uniform(50, world.width - 50)
-        y = random.uniform(50, world.height - 50)
+        x = rng_uniform(world, "meta.food", 50, world.width - 50)
+        y = rng_uniform(world, "meta.food", 50, world.height - 50)
         # Avoid spawning on walls
         valid = True
         for wall in world.walls:
@@ -917,19 +1932,26 @@ def apply_meta(world: World) -> List[str]:
                 break
         if valid:
             world.entities[new_id] = Entity(new_id, "Food", "yellow", x, y)
-            events.append(f"META: Spawned {new_id}")
-    
-    # Wave progression - spawn more enemies when score hits thresholds
-    wave_threshold = world.wave * 3
+            world.changes.touch("entities")
+            events.append(GameEvent(EV_SPAWNED, world.tick, (new_id,)))
+    return events
+
+
+@rule(META, reads=("score", "wave"), writes=("wave", "difficulty", "entities", "relations"), skip_unchanged=True)
+def advance_wave(world: World) -> List[GameEvent]:
+    """Wave progression - spawn more enemies when score hits thresholds."""
+    events: List[GameEvent] = []
+    wave_threshold = world.wave * world.wave_score_step
     if world.score >= wave_threshold and world.wave < 5:
         world.wave += 1
         world.difficulty += 0.15
-        events.append(f"META: Wave {world.wave} - Difficulty increased to {world.difficulty:.2f}")
+        world.changes.touch("wave")
+        events.append(GameEvent(EV_WAVE, world.tick, values=(world.wave, world.difficulty)))
         
         # Spawn new hostile (with accumulated speed boost from player eating food)
         new_id = f"hostile_w{world.wave}_{world.tick}"
-        spawn_x = random.uniform(world.width * 0.6, world.width - 50)
-        spawn_y = random.uniform(50, world.height - 50)
+        spawn_x = rng_uniform(world, "meta.wave", world.width * 0.6, world.width - 50)
+        spawn_y = rng_uniform(world, "meta.wave", 50, world.height - 50)
         patrol = generate_patrol_points(world, spawn_x, spawn_y)
         base_speed = 1.3 + world.wave * 0.1 + world.enemy_speed_boost
         world.entities[new_id] = Entity(
@@ -937,10 +1959,21 @@ def apply_meta(world: World) -> List[str]:
             {"speed": base_speed, "vx": 0, "vy": 0, "patrol_points": patrol, "patrol_idx": 0}
         )
         rebuild_relations(world)
-        events.append(f"META: Spawned {new_id}")
+        events.append(GameEvent(EV_SPAWNED, world.tick, (new_id,)))
+    return events
+
+
+@rule(META, reads=("entities", "kind", "pos", "conversion_cooldown"),
+      writes=("kind", "speed", "conversion_cooldown", "timers", "relations"))
+def convert_factions(world: World) -> List[GameEvent]:
+    """Hostile-Hostile collisions and Hostile-Passive contact turn both into Converted."""
+    if world.double_buffered:
+        return resolve_conversions_buffered(world)
+    events: List[GameEvent] = []
     
     # Hostile-Hostile collision -> Converted (demonstrate faction change)
-    hostile_ids = [e.id for e in world.entities.values() if e.kind == "Hostile"]
+    hostile_ids = scratch_list(world, "meta.hostile_ids")
+    hostile_ids.extend(e.id for e in world.entities.values() if e.kind == "Hostile")
     for i in range(len(hostile_ids)):
         for j in range(i + 1, len(hostile_ids)):
             a = world.entities[hostile_ids[i]]
@@ -950,44 +1983,163 @@ def apply_meta(world: World) -> List[str]:
                     ent.kind = "Converted"
                     ent.color = "purple"
                     ent.state["speed"] = 1.5 + world.enemy_speed_boost  # Inherit speed boost
-                    ent.state["last_conversion_tick"] = world.tick
-                events.append(f"META: {a.id} and {b.id} collided -> Converted")
+                    start_conversion_cooldown(world, ent)
+                events.append(GameEvent(EV_COLLIDED, world.tick, (a.id, b.id)))
                 rebuild_relations(world)
     
     # Hostile converts Passive on contact
-    passives = [e for e in world.entities.values() if e.kind == "Passive"]
-    hostiles = [e for e in world.entities.values() if e.kind == "Hostile"]
+    passives = scratch_list(world, "meta.passives")
+    passives.extend(e for e in world.entities.values() if e.kind == "Passive")
+    hostiles = scratch_list(world, "meta.hostiles")
+    hostiles.extend(e for e in world.entities.values() if e.kind == "Hostile")
     for h in hostiles:
-        if world.tick - h.state.get("last_conversion_tick", -100) < 15:
+        if h.state.get("conversion_cooldown"):
             continue
         for p in passives:
-            if world.tick - p.state.get("last_conversion_tick", -100) < 15:
+            if p.state.get("conversion_cooldown"):
                 continue
             if compute_distance(h, p) <= 10:
                 p.kind = "Converted"
                 p.color = "purple"
                 p.state["speed"] = 1.4 + world.enemy_speed_boost  # Inherit speed boost
-                p.state["last_conversion_tick"] = world.tick
-                events.append(f"META: {h.id} converted {p.id}")
+                start_conversion_cooldown(world, p)
+                events.append(GameEvent(EV_CONVERTED, world.tick, (h.id, p.id)))
                 rebuild_relations(world)
                 break
     
     return events
 
 
+def resolve_conversions_buffered(world: World) -> List[GameEvent]:
+    """
+    Order-independent faction conversions for double-buffered mode.
+    Contacts are detected on the read buffer, then applied to the write buffer
+    in one batch; ties are broken by entity id rather than dict order.
+    """
+    events: List[GameEvent] = []
+    view = read_view(world)
+    hostiles = sorted((e for e in view.entities.values() if e.kind == "Hostile"), key=lambda e: e.id)
+    passives = sorted((e for e in view.entities.values() if e.kind == "Passive"), key=lambda e: e.id)
+    new_speeds: Dict[str, float] = {}
+    
+    # Hostile-Hostile collision -> Converted
+    for i, a in enumerate(hostiles):
+        for b in hostiles[i + 1:]:
+            if compute_distance(a, b) <= 12:
+                new_speeds[a.id] = new_speeds[b.id] = 1.5 + world.enemy_speed_boost
+                events.append(GameEvent(EV_COLLIDED, world.tick, (a.id, b.id)))
+    
+    # Hostile converts the nearest eligible Passive on contact
+    converted_by: Dict[str, str] = {}
+    for h in hostiles:
+        if h.id in new_speeds or h.state.get("conversion_cooldown"):
+            continue
+        in_reach = [
+            (compute_distance(h, p), p.id) for p in passives
+            if not p.state.get("conversion_cooldown")
+            and compute_distance(h, p) <= 10
+        ]
+        if in_reach:
+            converted_by.setdefault(min(in_reach)[1], h.id)
+    for pid, hid in sorted(converted_by.items()):
+        new_speeds[pid] = 1.4 + world.enemy_speed_boost
+        events.append(GameEvent(EV_CONVERTED, world.tick, (hid, pid)))
+    
+    for eid, speed in new_speeds.items():
+        ent = world.entities[eid]
+        ent.kind = "Converted"
+        ent.color = "purple"
+        ent.state["speed"] = speed  # Inherit speed boost
+        start_conversion_cooldown(world, ent)
+    if new_speeds:
+        rebuild_relations(world)
+    return events
+
+
 def generate_patrol_points(world: World, start_x: float, start_y: float) -> List[Tuple[float, float]]:
     """Generate random patrol points near starting position."""
     points = [(start_x, start_y)]
     for _ in range(3):
-        px = max(50, min(world.width - 50, start_x + random.uniform(-100, 100)))
-        py = max(50, min(world.height - 50, start_y + random.uniform(-100, 100)))
+        px = max(50, min(world.width - 50, start_x + rng_uniform(world, "meta.patrol", -100, 100)))
+        py = max(50, min(world.height - 50, start_y + rng_uniform(world, "meta.patrol", -100, 100)))
         points.append((px, py))
     return points
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TIMED EFFECTS - expiry handlers run from the timer wheel
+# ═══════════════════════════════════════════════════════════════════════════════
+TIMER_DASH_END = "dash_end"
+TIMER_DASH_READY = "dash_ready"
+TIMER_INVULN_END = "invulnerability_end"
+TIMER_CONVERSION_READY = "conversion_ready"
+CONVERSION_COOLDOWN = 15  # Ticks before a converted entity takes part in another conversion
+
+
+def start_conversion_cooldown(world: World, ent: Entity) -> None:
+    ent.state["conversion_cooldown"] = True
+    world.timers.schedule(world.tick + CONVERSION_COOLDOWN, TIMER_CONVERSION_READY, ent.id)
+
+
+def _end_dash(world: World, ent: Entity) -> Optional[str]:
+    if ent.state.get("dashing") and world.tick >= ent.state.get("dash_until", 0):
+        ent.state["dashing"] = False
+    return None
+
+
+def _dash_ready(world: World, ent: Entity) -> Optional[str]:
+    ent.state["dash_cooldown"] = 0
+    return None
+
+
+def _end_invulnerability(world: World, ent: Entity) -> Optional[str]:
+    # A later dash may have extended it; only the timer matching the deadline clears it
+    if 0 < ent.state.get("invulnerable_until", 0) <= world.tick:
+        ent.state["invulnerable_until"] = 0
+        return "Invulnerability expired"
+    return None
+
+
+def _conversion_ready(world: World, ent: Entity) -> Optional[str]:
+    ent.state.pop("conversion_cooldown", None)
+    return None
+
+
+TIMER_HANDLERS: Dict[str, Callable[[World, Entity], Optional[str]]] = {
+    TIMER_DASH_END: _end_dash,
+    TIMER_DASH_READY: _dash_ready,
+    TIMER_INVULN_END: _end_invulnerability,
+    TIMER_CONVERSION_READY: _conversion_ready,
+}
+
+
+def fire_timers(world: World) -> None:
+    """Run the handlers of every timed effect expiring this tick."""
+    world.timers.expired = []
+    for _, kind, eid in world.timers.advance(world.tick):
+        ent = world.entities.get(eid)
+        if ent is None:
+            continue  # Despawned (or frozen out of the live world)
+        note = TIMER_HANDLERS[kind](world, ent)
+        if note:
+            world.timers.expired.append(note)
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # GCO - Global Closure Operator
 # ═══════════════════════════════════════════════════════════════════════════════
+def gco_report(world: World) -> Dict[str, Any]:
+    """
+    Empty GCO report. Always a new dict (not an arena slot): callers keep
+    world.gco_report from one tick to compare with the next.
+    """
+    return {"deduped": 0, "contradictions": [], "cleaned_effects": [], "removed_invalid": [],
+            "iterations": 0, "requeued": 0, "work": 0, "converged": True}
+
+
+GCO_MAX_PASSES = 8  # Runs of one rule in a tick before the closure is reported as not converged
+
+
 def run_gco(world: World) -> Dict[str, Any]:
     """
     GCO Phase: Ensure world consistency and finalize tick.
@@ -996,81 +2148,159 @@ def run_gco(world: World) -> Dict[str, Any]:
     - Clean up expired status effects
     - Remove invalid references
     - Freeze stable states
+    Structural passes are skipped on ticks where relations and the entity
+    set are unchanged, as they would find nothing to do.
+    
+    The closure is a fixed point, computed with a worklist: every rule runs
+    once, then a rule that changed something re-enqueues the rules reading
+    what it changed, scoped to the entity ids it named, until nothing is
+    left to do. The report counts rule applications (iterations), re-runs
+    (requeued), items examined (work) and whether it converged within
+    GCO_MAX_PASSES runs per rule.
     """
-    report: Dict[str, Any] = {
-        "deduped": 0,
-        "contradictions": [],
-        "cleaned_effects": [],
-        "removed_invalid": [],
-    }
+    report = gco_report(world)
+    report["cleaned_effects"].extend(world.timers.expired)  # Timed effects that ran out this tick
+    world.gco_report = report
     
-    # 1. Dedupe identical relations
-    seen: Set[tuple] = set()
-    deduped: List[Relation] = []
+    changes = world.changes
+    rules = phase_schedule(GCO).order
+    queued: Dict[str, Optional[Set[str]]] = {r.name: None for r in rules}  # rule -> scope (None: everything)
+    passes: Dict[str, int] = {}
+    while queued:
+        r = next(r for r in rules if r.name in queued)
+        scope = queued.pop(r.name)
+        passes[r.name] = passes.get(r.name, 0) + 1
+        if passes[r.name] > GCO_MAX_PASSES:
+            report["converged"] = False
+            break
+        clock = changes.clock
+        changes.affected = scratch_set(world, "gco.affected")
+        run_rule(world, r, scope)
+        report["iterations"] += 1
+        changed = changes.changed_since(clock, r.writes)
+        if not changed:
+            continue
+        affected = changes.affected
+        for q in rules:
+            if q is r or not q.reads & changed:
+                continue
+            if q.name in queued:
+                pending = queued[q.name]
+                queued[q.name] = None if pending is None or affected is None else pending | affected
+            else:
+                queued[q.name] = None if affected is None or not q.scoped else set(affected)
+                report["requeued"] += 1
+    return report
+
+
+@rule(GCO, reads=("relations",), writes=("relations",), skip_unchanged=True, scoped=True)
+def dedupe_relations(world: World, scope: Optional[Set[str]] = None) -> None:
+    """1. Dedupe identical relations (with a scope: only relations from those entities)."""
+    report = world.gco_report
+    seen: Set[tuple] = scratch_set(world, "gco.seen")
+    deduped: List[Relation] = scratch_list(world, "gco.relations")
+    dropped: Set[str] = scratch_set(world, "gco.touched")
     for rel in world.relations:
+        if scope is not None and rel.source not in scope:
+            deduped.append(rel)
+            continue
+        report["work"] += 1
         key = (rel.primitive, rel.source, rel.target, tuple(sorted(rel.payload.items())))
         if key not in seen:
             seen.add(key)
             deduped.append(rel)
         else:
             report["deduped"] += 1
-    world.relations = deduped
-    
-    # 2. Detect contradictions (e.g., entity both dead and alive - simplified)
+            dropped.add(rel.source)
+    if dropped:
+        world.relations[:] = deduped
+        world.changes.touch("relations", ids=dropped)
+
+
+@rule(GCO, reads=("shield", "energy"), writes=("shield",), scoped=True)
+def resolve_contradictions(world: World, scope: Optional[Set[str]] = None) -> None:
+    """2. Detect contradictions (e.g., entity both dead and alive - simplified)."""
     player = world.entities.get("player")
-    if player:
+    if player and (scope is None or player.id in scope):
+        world.gco_report["work"] += 1
         # Contradiction: shield active with zero energy
         if player.state.get("shield_active", False) and player.state.get("energy", 0) <= 0:
             player.state["shield_active"] = False
-            report["contradictions"].append("Shield active with no energy -> disabled")
-        
-        # Contradiction: invulnerable but past duration
-        if player.state.get("invulnerable_until", 0) > 0:
-            if world.tick >= player.state["invulnerable_until"]:
-                player.state["invulnerable_until"] = 0
-                report["cleaned_effects"].append("Invulnerability expired")
-    
-    # 3. Remove relations referencing non-existent entities
-    valid_ids = set(world.entities.keys())
-    cleaned: List[Relation] = []
+            world.gco_report["contradictions"].append("Shield active with no energy -> disabled")
+            world.changes.touch("shield", ids=(player.id,))
+
+
+@rule(GCO, reads=("relations", "entities"), writes=("relations",), skip_unchanged=True, scoped=True)
+def remove_invalid_relations(world: World, scope: Optional[Set[str]] = None) -> None:
+    """3. Remove relations referencing non-existent entities (with a scope: only relations touching those ids)."""
+    report = world.gco_report
+    valid_ids = world.entities
+    cleaned: List[Relation] = scratch_list(world, "gco.relations")
+    removed: Set[str] = scratch_set(world, "gco.touched")
     for rel in world.relations:
+        if scope is not None and rel.source not in scope and rel.target not in scope:
+            cleaned.append(rel)
+            continue
+        report["work"] += 1
         if rel.source not in valid_ids:
             report["removed_invalid"].append(f"Relation with invalid source: {rel.source}")
+            removed.add(rel.source)
             continue
         if rel.target is not None and rel.target not in valid_ids:
             report["removed_invalid"].append(f"Relation with invalid target: {rel.target}")
+            removed.update((rel.source, rel.target))
             continue
         cleaned.append(rel)
-    world.relations = cleaned
-    
-    # 4. Clean up memory references to despawned entities
+    if removed:
+        world.relations[:] = cleaned
+        world.changes.touch("relations", ids=removed)
+
+
+@rule(GCO, reads=("entities",), writes=("memory",), skip_unchanged=True)
+def forget_despawned(world: World) -> None:
+    """
+    4. Clean up memory references to despawned entities (only where a stale
+    id is actually remembered). Memory only ever gains ids seen this tick,
+    so a stale id needs a change to the entity set. The dict is replaced,
+    not edited: forked worlds may share it.
+    """
+    valid_ids = world.entities.keys()
+    world.gco_report["work"] += len(valid_ids)
+    forgot: List[str] = []
     for ent in world.entities.values():
-        if "memory" in ent.state:
-            ent.state["memory"] = {
-                k: v for k, v in ent.state["memory"].items()
-                if k in valid_ids
-            }
-    
-    # 5. Decay alert levels globally
+        memory = ent.state.get("memory")
+        if memory and not memory.keys() <= valid_ids:
+            ent.state["memory"] = {k: v for k, v in memory.items() if k in valid_ids}
+            forgot.append(ent.id)
+    if forgot:
+        world.changes.touch("memory", ids=forgot)
+    if world.scratch is not None:
+        world.scratch.prune(valid_ids)
+
+
+@rule(GCO, reads=("entities", "kind", "alert"), writes=("alert",))
+def decay_alerts(world: World) -> None:
+    """5. Decay alert levels globally (a per-tick step, not a repair: nothing re-runs it)."""
+    world.gco_report["work"] += len(world.entities)
     for ent in world.entities.values():
         if ent.kind in ("Hostile", "Converted"):
             alert = ent.state.get("alert_level", 0)
             if alert > 0:
                 ent.state["alert_level"] = max(0, alert - 0.01)
-    
-    world.gco_report = report
-    return report
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # GAME LOGIC
 # ═══════════════════════════════════════════════════════════════════════════════
-def consume_food(world: World) -> List[str]:
+@rule(META, reads=("entities", "kind", "pos"), writes=("entities", "score", "speed", "game_win"))
+def consume_food(world: World) -> List[GameEvent]:
     """Handle food consumption by player and passives."""
-    events: List[str] = []
-    food_ids = [e.id for e in world.entities.values() if e.kind == "Food"]
-    eaters = [e for e in world.entities.values() if e.kind in ("Passive", "Player")]
-    eaten = set()
+    events: List[GameEvent] = []
+    food_ids = scratch_list(world, "food.ids")
+    food_ids.extend(e.id for e in world.entities.values() if e.kind == "Food")
+    eaters = scratch_list(world, "food.eaters")
+    eaters.extend(e for e in world.entities.values() if e.kind in ("Passive", "Player"))
+    eaten = scratch_set(world, "food.eaten")
     player_ate = False
     
     for eater in eaters:
@@ -1085,31 +2315,36 @@ def consume_food(world: World) -> List[str]:
                 if eater.kind == "Player":
                     world.score += 1
                     player_ate = True
-                    events.append(f"Player ate {fid} (Score: {world.score})")
+                    events.append(GameEvent(EV_FOOD_EATEN, world.tick, (fid,), (world.score,)))
                     if world.score >= world.goal:
                         world.game_win = True
-                        events.append("VICTORY!")
+                        events.append(GameEvent(EV_VICTORY, world.tick))
     
     for fid in eaten:
         world.entities.pop(fid, None)
+    if eaten:
+        world.changes.touch("entities")
+    if player_ate:
+        world.changes.touch("score")
     
     # META rule: When player eats food, ALL enemies get faster!
     # This creates escalating tension as you collect more food
     if player_ate:
-        speed_boost = 0.08  # Each food makes enemies 8% faster
+        speed_boost = world.speed_boost_per_food  # Each food makes enemies faster (8% by default)
         world.enemy_speed_boost += speed_boost  # Track globally for new spawns
         for ent in world.entities.values():
             if ent.kind in ("Hostile", "Converted"):
                 old_speed = ent.state.get("speed", 1.3)
                 ent.state["speed"] = old_speed + speed_boost
-        events.append(f"META: Enemies accelerated! (+{speed_boost:.0%} speed)")
+        events.append(GameEvent(EV_ACCELERATED, world.tick, values=(speed_boost,)))
     
     return events
 
 
-def check_collisions(world: World) -> List[str]:
+@rule(META, reads=("entities", "kind", "pos", "shield", "invulnerable"), writes=("pos", "shield", "energy", "game_over"))
+def check_collisions(world: World) -> List[GameEvent]:
     """Check player-enemy collisions."""
-    events: List[str] = []
+    events: List[GameEvent] = []
     player = world.entities.get("player")
     if not player:
         return events
@@ -1126,7 +2361,7 @@ def check_collisions(world: World) -> List[str]:
             if player.state.get("shield_active", False):
                 player.state["shield_active"] = False
                 player.state["energy"] = 0
-                events.append(f"Shield blocked hit from {ent.id}!")
+                events.append(GameEvent(EV_SHIELD_BLOCK, world.tick, (ent.id,)))
                 # Push enemy back
                 dx = ent.x - player.x
                 dy = ent.y - player.y
@@ -1135,7 +2370,7 @@ def check_collisions(world: World) -> List[str]:
                 ent.y += (dy / dist) * 30
             else:
                 world.game_over = True
-                events.append(f"Game Over - Hit by {ent.id}")
+                events.append(GameEvent(EV_GAME_OVER, world.tick, (ent.id,)))
                 break
     
     return events
@@ -1144,6 +2379,7 @@ def check_collisions(world: World) -> List[str]:
 def step(world: World) -> None:
     """Execute one RPE tick cycle."""
     world.events.clear()
+    fire_timers(world)
     
     # ⭐ Step 1: GEOMETRY
     geo_ctx = apply_geometry(world)
@@ -1152,26 +2388,38 @@ def step(world: World) -> None:
     violations = apply_constraint(world)
     world.events.extend(violations)
     
+    # Later phases read last committed state (double-buffered mode only)
+    begin_buffered_tick(world)
+    
     # ⭐ Step 3: EPISTEMIC
     knowledge = apply_epistemic(world, geo_ctx)
     
+    resolve_tick(world, knowledge, geo_ctx)
+
+
+def resolve_tick(world: World, knowledge: Dict[str, KnowledgeGraph], geo_ctx: GeometryContext,
+                 dynamics: Callable[[World, Dict[str, KnowledgeGraph], GeometryContext], None] = apply_dynamics,
+                 meta: Callable[[World], List[GameEvent]] = apply_meta) -> None:
+    """
+    Second half of a tick: everything downstream of EPISTEMIC (shared by
+    alternate sensing backends, which may also bring their own DYNAMICS and
+    META phases).
+    """
+    # Influence maps catch up on last tick's food changes and the player's position
+    world.tactics.update(world)
+    
     # ⭐ Step 4: DYNAMICS
-    apply_dynamics(world, knowledge, geo_ctx)
+    dynamics(world, knowledge, geo_ctx)
     
-    # ⭐ Step 5: META
-    meta_events = apply_meta(world)
+    # ⭐ Step 5: META (including game logic: eating, player collisions)
+    meta_events = meta(world)
     world.events.extend(meta_events)
     
-    # Game logic (integrated with tick)
-    food_events = consume_food(world)
-    world.events.extend(food_events)
-    
-    collision_events = check_collisions(world)
-    world.events.extend(collision_events)
-    
     # ⭐ Step 6: GCO
     run_gco(world)
     
+    world.event_bus.publish(world.events)
+    commit_buffered_tick(world)
     world.tick += 1
 
 
@@ -1198,9 +2446,12 @@ def player_dash(world: World) -> bool:
         player.state["stamina"] = stamina - dash_cost
         player.state["dashing"] = True
         player.state["dash_direction"] = (vx, vy)
-        player.state["dash_frames"] = 5
+        player.state["dash_until"] = world.tick + 5  # Five dash ticks
         player.state["dash_cooldown"] = 15
         player.state["invulnerable_until"] = world.tick + 8  # Brief invuln
+        world.timers.schedule(world.tick + 5, TIMER_DASH_END, player.id)
+        world.timers.schedule(world.tick + 14, TIMER_DASH_READY, player.id)  # Usable again after 15 ticks
+        world.timers.schedule(world.tick + 8, TIMER_INVULN_END, player.id)
         return True
     return False
 
@@ -1221,10 +2472,45 @@ def player_shield(world: World) -> bool:
     return False
 
 
+def handle_key_press(world: World, keysym: str) -> None:
+    """Apply a key press to the player (shared by the Tk UI and scripted players)."""
+    player = world.entities.get("player")
+    if not player or world.game_over or world.game_win:
+        return
+    
+    if keysym == "Up":
+        player.state["vy"] = -1
+        player.state["vx"] = 0
+    elif keysym == "Down":
+        player.state["vy"] = 1
+        player.state["vx"] = 0
+    elif keysym == "Left":
+        player.state["vx"] = -1
+        player.state["vy"] = 0
+    elif keysym == "Right":
+        player.state["vx"] = 1
+        player.state["vy"] = 0
+    elif keysym == "space":
+        player_dash(world)
+    elif keysym.lower() == "s":
+        player_shield(world)
+
+
+def handle_key_release(world: World, keysym: str) -> None:
+    """Apply a key release to the player."""
+    player = world.entities.get("player")
+    if not player:
+        return
+    if keysym in ("Up", "Down"):
+        player.state["vy"] = 0
+    if keysym in ("Left", "Right"):
+        player.state["vx"] = 0
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # WORLD SETUP
 # ═══════════════════════════════════════════════════════════════════════════════
-def create_world(width: int, height: int) -> World:
+def create_world(width: int, height: int, seed: int = 0) -> World:
     """Initialize world with entities, relations, and walls."""
     entities: Dict[str, Entity] = {
         "player": Entity("player", "Player", "blue", width * 0.15, height * 0.5, {
@@ -1274,6 +2560,7 @@ def create_world(width: int, height: int) -> World:
         walls=walls,
         width=width,
         height=height,
+        seed=seed,
     )
     rebuild_relations(world)
     return world
@@ -1282,6 +2569,7 @@ def create_world(width: int, height: int) -> World:
 def rebuild_relations(world: World) -> None:
     """Rebuild all relations based on current entity configuration."""
     rels: List[Relation] = []
+    world.changes.touch("relations", "entities")
     width, height = world.width, world.height
     player = world.entities.get("player")
     
@@ -1297,9 +2585,8 @@ def rebuild_relations(world: World) -> None:
     if player:
         rels.append(Relation(CONSTRAINT, player.id, None, {"type": "resource", "resource": "stamina"}))
         rels.append(Relation(CONSTRAINT, player.id, None, {"type": "resource", "resource": "energy"}))
-        rels.append(Relation(CONSTRAINT, player.id, None, {"type": "cooldown", "ability": "dash"}))
         rels.append(Relation(DYNAMICS, player.id, None, {"speed": player.state.get("speed", 2.8)}))
-        rels.append(Relation(EPISTEMIC, player.id, None, {"sense_radius": 200, "memory_duration": 120}))
+        rels.append(Relation(EPISTEMIC, player.id, None, {"sense_radius": world.sense_radii["Player"], "memory_duration": 120}))
     
     hostiles = [e for e in world.entities.values() if e.kind == "Hostile"]
     converted = [e for e in world.entities.values() if e.kind == "Converted"]
@@ -1307,17 +2594,17 @@ def rebuild_relations(world: World) -> None:
     
     # Hostile relations
     for h in hostiles:
-        rels.append(Relation(EPISTEMIC, h.id, None, {"sense_radius": 140, "memory_duration": 60}))
+        rels.append(Relation(EPISTEMIC, h.id, None, {"sense_radius": world.sense_radii["Hostile"], "memory_duration": 60}))
         rels.append(Relation(DYNAMICS, h.id, None, {"speed": h.state.get("speed", 1.3)}))
     
     # Converted relations (more aggressive sensing)
     for c in converted:
-        rels.append(Relation(EPISTEMIC, c.id, None, {"sense_radius": 160, "memory_duration": 90}))
+        rels.append(Relation(EPISTEMIC, c.id, None, {"sense_radius": world.sense_radii["Converted"], "memory_duration": 90}))
         rels.append(Relation(DYNAMICS, c.id, None, {"speed": c.state.get("speed", 1.5)}))
     
     # Passive relations
     for p in passives:
-        rels.append(Relation(EPISTEMIC, p.id, None, {"sense_radius": 100, "memory_duration": 30}))
+        rels.append(Relation(EPISTEMIC, p.id, None, {"sense_radius": world.sense_radii["Passive"], "memory_duration": 30}))
         rels.append(Relation(DYNAMICS, p.id, None, {"speed": p.state.get("speed", 0.9), "mode": "wander"}))
     
     world.relations = rels
@@ -1327,190 +2614,375 @@ def reset_world(world: World, width: int, height: int) -> None:
     """Reset to fresh state."""
     fresh = create_world(width, height)
     world.entities = fresh.entities
-    world.relations = fresh.relations
     world.walls = fresh.walls
+    rebuild_relations(world)  # Keep this world's tuning (e.g. sense radii)
     world.tick = 0
     world.score = 0
     world.wave = 1
+    world.changes.touch("score", "wave")
     world.difficulty = 1.0
     world.enemy_speed_boost = 0.0  # Reset accumulated speed boost
     world.game_over = False
     world.game_win = False
     world.events.clear()
+    world.timers.clear()
+    world.tactics.clear()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # UI / RENDERING
 # ═══════════════════════════════════════════════════════════════════════════════
-def draw(world: World, canvas: tk.Canvas) -> None:
-    """Render the world state."""
-    canvas.delete("all")
-    
-    # Draw walls
-    for wall in world.walls:
-        canvas.create_line(wall.x1, wall.y1, wall.x2, wall.y2, fill="gray", width=4)
+# AI state icon and color - shows what hostiles are thinking
+STATE_INDICATORS = {
+    AI_STATE_PATROL: ("○", "gray"),       # Calm, patrolling
+    AI_STATE_HUNT: ("◆", "red"),          # Direct pursuit
+    AI_STATE_INTERCEPT: ("⟩", "orange"),  # Cutting off
+    AI_STATE_FLANK: ("↗", "yellow"),      # Flanking
+    AI_STATE_SEARCH: ("?", "cyan"),       # Searching
+    AI_STATE_AMBUSH: ("◇", "magenta"),    # Waiting in ambush
+}
+
+
+class Renderer:
+    """Retained-mode canvas renderer.
+    
+    Every visual element has a stable key; its canvas item is created the
+    first time the key is drawn and afterwards only touched through
+    coords()/itemconfig() when its geometry or options actually change.
+    Elements not drawn this frame are hidden, and items belonging to
+    entities that despawned are deleted.
+    """
     
-    # Draw danger gradient for player (subtle red glow)
-    player = world.entities.get("player")
-    if player:
-        danger = world.gco_report.get("influence_fields", {}).get("player_danger", 0)
-        # We don't have it in gco_report, compute from geo context implicitly
-        # Just use a simple calculation here
-        hostile_count = sum(1 for e in world.entities.values() if e.kind in ("Hostile", "Converted"))
-        if hostile_count > 0:
-            # Draw faint danger indicator
-            closest_dist = float('inf')
-            for ent in world.entities.values():
-                if ent.kind in ("Hostile", "Converted"):
-                    d = compute_distance(player, ent)
-                    closest_dist = min(closest_dist, d)
-            if closest_dist < 150:
-                alpha = int((1 - closest_dist / 150) * 80)
-                danger_color = f"#ff{255-alpha:02x}{255-alpha:02x}"
-                canvas.create_oval(
-                    player.x - 25, player.y - 25, player.x + 25, player.y + 25,
-                    fill="", outline=danger_color, width=2
-                )
-    
-    # Draw entities
-    for ent in world.entities.values():
-        x, y = ent.x, ent.y
-        size = 6 if ent.kind == "Food" else 8
+    def __init__(self, canvas: tk.Canvas) -> None:
+        self.canvas = canvas
+        self.items: Dict[Tuple, int] = {}
+        self.shown: Dict[Tuple, Tuple[Tuple, Dict[str, Any]]] = {}  # Last coords/options per key
+        self.hidden: Set[Tuple] = set()
+        self.live: Set[Tuple] = set()
+        self.created = False
+    
+    def put(self, key: Tuple, kind: str, coords: Tuple, layer: str = "world", **opts: Any) -> None:
+        """Draw element `key` this frame, creating or updating its item as needed."""
+        self.live.add(key)
+        item = self.items.get(key)
+        if item is None:
+            create = getattr(self.canvas, f"create_{kind}")
+            self.items[key] = create(*coords, tags=(layer,), **opts)
+            self.shown[key] = (coords, opts)
+            self.created = True
+            return
+        last_coords, last_opts = self.shown[key]
+        if coords != last_coords:
+            self.canvas.coords(item, *coords)
+        if key in self.hidden:
+            self.hidden.discard(key)
+            self.canvas.itemconfigure(item, state="normal", **opts)
+        elif opts != last_opts:
+            self.canvas.itemconfigure(item, **opts)
+        self.shown[key] = (coords, opts)
+    
+    def draw(self, world: World, alpha: float = 1.0, previous: Optional[Dict[str, Tuple[float, float]]] = None,
+             rates: str = "") -> None:
+        """Render the world state.
         
-        # Special rendering for player
-        if ent.kind == "Player":
-            # Shield indicator
-            if ent.state.get("shield_active", False):
-                canvas.create_oval(x - 12, y - 12, x + 12, y + 12, outline="cyan", width=2)
-            # Invulnerability indicator
-            if world.tick < ent.state.get("invulnerable_until", 0):
-                canvas.create_oval(x - 14, y - 14, x + 14, y + 14, outline="white", width=1, dash=(2, 2))
-            # Dashing trail
-            if ent.state.get("dashing", False):
-                canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="", outline="lightblue", width=2)
+        With `previous` (positions before the last step) entities are drawn
+        `alpha` of the way from there to where they are now, so motion
+        stays smooth when frames and ticks don't line up.
+        """
+        self.live = set()
+        self.created = False
+        put = self.put
         
-        # AI state indicator for hostiles - shows what they're thinking
-        if ent.kind in ("Hostile", "Converted"):
-            ai_state = ent.state.get("ai_state", AI_STATE_PATROL)
-            alert = ent.state.get("alert_level", 0)
+        def position(ent: Entity) -> Tuple[float, float]:
+            before = previous.get(ent.id) if previous else None
+            if before is None or alpha >= 1.0:
+                return ent.x, ent.y
+            return before[0] + (ent.x - before[0]) * alpha, before[1] + (ent.y - before[1]) * alpha
+        
+        # Draw walls
+        for i, wall in enumerate(world.walls):
+            put(("wall", i), "line", (wall.x1, wall.y1, wall.x2, wall.y2), fill="gray", width=4)
+        
+        # Draw danger gradient for player (subtle red glow)
+        player = world.entities.get("player")
+        if player:
+            hostile_count = sum(1 for e in world.entities.values() if e.kind in ("Hostile", "Converted"))
+            if hostile_count > 0:
+                # Draw faint danger indicator
+                closest_dist = float('inf')
+                for ent in world.entities.values():
+                    if ent.kind in ("Hostile", "Converted"):
+                        d = compute_distance(player, ent)
+                        closest_dist = min(closest_dist, d)
+                if closest_dist < 150:
+                    glow = int((1 - closest_dist / 150) * 80)
+                    danger_color = f"#ff{255-glow:02x}{255-glow:02x}"
+                    px, py = position(player)
+                    put(("danger",), "oval", (px - 25, py - 25, px + 25, py + 25),
+                        fill="", outline=danger_color, width=2)
+        
+        # Draw entities
+        for ent in world.entities.values():
+            x, y = position(ent)
+            eid = ent.id
+            size = 6 if ent.kind == "Food" else 8
             
-            # State icon and color
-            state_indicators = {
-                AI_STATE_PATROL: ("○", "gray"),       # Calm, patrolling
-                AI_STATE_HUNT: ("◆", "red"),          # Direct pursuit
-                AI_STATE_INTERCEPT: ("⟩", "orange"),  # Cutting off
-                AI_STATE_FLANK: ("↗", "yellow"),      # Flanking
-                AI_STATE_SEARCH: ("?", "cyan"),       # Searching
-                AI_STATE_AMBUSH: ("◇", "magenta"),    # Waiting in ambush
-            }
-            icon, color = state_indicators.get(ai_state, ("○", "gray"))
+            # Special rendering for player
+            if ent.kind == "Player":
+                # Shield indicator
+                if ent.state.get("shield_active", False):
+                    put(("ent", eid, "shield"), "oval", (x - 12, y - 12, x + 12, y + 12), outline="cyan", width=2)
+                # Invulnerability indicator
+                if world.tick < ent.state.get("invulnerable_until", 0):
+                    put(("ent", eid, "invuln"), "oval", (x - 14, y - 14, x + 14, y + 14),
+                        outline="white", width=1, dash=(2, 2))
+                # Dashing trail
+                if ent.state.get("dashing", False):
+                    put(("ent", eid, "dash"), "oval", (x - 10, y - 10, x + 10, y + 10),
+                        fill="", outline="lightblue", width=2)
             
-            # Show state icon above entity
-            if alert > 0.1 or ai_state != AI_STATE_PATROL:
-                canvas.create_text(x, y - 14, text=icon, fill=color, font=("Helvetica", 10, "bold"))
+            # AI state indicator for hostiles - shows what they're thinking
+            if ent.kind in ("Hostile", "Converted"):
+                ai_state = ent.state.get("ai_state", AI_STATE_PATROL)
+                alert = ent.state.get("alert_level", 0)
+                icon, color = STATE_INDICATORS.get(ai_state, ("○", "gray"))
+                
+                # Show state icon above entity
+                if alert > 0.1 or ai_state != AI_STATE_PATROL:
+                    put(("ent", eid, "icon"), "text", (x, y - 14), text=icon, fill=color,
+                        font=("Helvetica", 10, "bold"))
+                
+                # Alert level indicator (exclamation when highly alert)
+                if alert > 0.7:
+                    put(("ent", eid, "alert"), "text", (x + 8, y - 14), text="!", fill="yellow",
+                        font=("Helvetica", 8, "bold"))
             
-            # Alert level indicator (exclamation when highly alert)
-            if alert > 0.7:
-                canvas.create_text(x + 8, y - 14, text="!", fill="yellow", font=("Helvetica", 8, "bold"))
+            # Draw entity
+            put(("ent", eid, "body"), "rectangle", (x - size, y - size, x + size, y + size),
+                fill=ent.color, outline="")
         
-        # Draw entity
-        canvas.create_rectangle(x - size, y - size, x + size, y + size, fill=ent.color, outline="")
-    
-    # HUD
-    if player:
-        stamina = player.state.get("stamina", 0)
-        max_stamina = player.state.get("max_stamina", 100)
-        energy = player.state.get("energy", 0)
-        max_energy = player.state.get("max_energy", 50)
-        
-        # Calculate average enemy speed for display
-        enemies = [e for e in world.entities.values() if e.kind in ("Hostile", "Converted")]
-        avg_enemy_speed = sum(e.state.get("speed", 1.3) for e in enemies) / max(1, len(enemies)) if enemies else 1.3
-        speed_pct = int((avg_enemy_speed / 1.3) * 100)  # Base speed is 1.3
-        
-        # Score and wave
-        canvas.create_text(10, 10, anchor="nw", fill="white",
-                          text=f"Score: {world.score}/{world.goal}  Wave: {world.wave}  Tick: {world.tick}",
-                          font=("Helvetica", 11, "bold"))
+        self.draw_hud(world, player, rates)
+        self.sweep(world)
+        self.canvas.update()
+    
+    def draw_hud(self, world: World, player: Optional[Entity], rates: str = "") -> None:
+        put = self.put
+        if player:
+            stamina = player.state.get("stamina", 0)
+            energy = player.state.get("energy", 0)
+            
+            # Calculate average enemy speed for display
+            enemies = [e for e in world.entities.values() if e.kind in ("Hostile", "Converted")]
+            avg_enemy_speed = sum(e.state.get("speed", 1.3) for e in enemies) / max(1, len(enemies)) if enemies else 1.3
+            speed_pct = int((avg_enemy_speed / 1.3) * 100)  # Base speed is 1.3
+            
+            # Score and wave
+            put(("hud", "score"), "text", (10, 10), "hud", anchor="nw", fill="white",
+                text=f"Score: {world.score}/{world.goal}  Wave: {world.wave}  Tick: {world.tick}",
+                font=("Helvetica", 11, "bold"))
+            
+            # Enemy speed indicator (turns red as it increases)
+            speed_color = "lime" if speed_pct <= 120 else ("yellow" if speed_pct <= 150 else "red")
+            put(("hud", "speed"), "text", (10, 55), "hud", anchor="nw", fill=speed_color,
+                text=f"Enemy Speed: {speed_pct}%", font=("Helvetica", 8))
+            
+            # Stamina bar
+            bar_y = 30
+            put(("hud", "stamina_bg"), "rectangle", (10, bar_y, 110, bar_y + 8), "hud", fill="gray30", outline="")
+            put(("hud", "stamina"), "rectangle", (10, bar_y, 10 + stamina, bar_y + 8), "hud", fill="lime", outline="")
+            put(("hud", "stamina_label"), "text", (115, bar_y + 4), "hud", anchor="w", fill="lime",
+                text="Stamina", font=("Helvetica", 8))
+            
+            # Energy bar
+            bar_y = 42
+            put(("hud", "energy_bg"), "rectangle", (10, bar_y, 60, bar_y + 8), "hud", fill="gray30", outline="")
+            put(("hud", "energy"), "rectangle", (10, bar_y, 10 + energy, bar_y + 8), "hud", fill="cyan", outline="")
+            put(("hud", "energy_label"), "text", (65, bar_y + 4), "hud", anchor="w", fill="cyan",
+                text="Energy", font=("Helvetica", 8))
+            
+            # Shield indicator
+            if player.state.get("shield_active", False):
+                put(("hud", "shield"), "text", (10, 67), "hud", anchor="nw", fill="cyan",
+                    text="[SHIELD]", font=("Helvetica", 9, "bold"))
+            
+            # Controls help
+            put(("hud", "controls"), "text", (world.width - 10, 10), "hud", anchor="ne", fill="gray",
+                text="Arrows: Move | SPACE: Dash | S: Shield", font=("Helvetica", 9))
+            
+            # Simulation / render rates
+            if rates:
+                put(("hud", "rates"), "text", (world.width - 10, 26), "hud", anchor="ne", fill="gray",
+                    text=rates, font=("Helvetica", 8))
         
-        # Enemy speed indicator (turns red as it increases)
-        speed_color = "lime" if speed_pct <= 120 else ("yellow" if speed_pct <= 150 else "red")
-        canvas.create_text(10, 55, anchor="nw", fill=speed_color,
-                          text=f"Enemy Speed: {speed_pct}%", font=("Helvetica", 8))
+        # Legend - entities
+        legend_y = world.height - 70
+        legend_items = [
+            ("blue", "Player"), ("red", "Hostile"), ("purple", "Converted"),
+            ("green", "Passive"), ("yellow", "Food"), ("gray", "Wall")
+        ]
+        for i, (color, name) in enumerate(legend_items):
+            x = 10 + i * 80
+            put(("legend", name, "swatch"), "rectangle", (x, legend_y, x + 10, legend_y + 10), "hud",
+                fill=color, outline="")
+            put(("legend", name, "label"), "text", (x + 15, legend_y + 5), "hud", anchor="w", fill="white",
+                text=name, font=("Helvetica", 8))
         
-        # Stamina bar
-        bar_y = 30
-        canvas.create_rectangle(10, bar_y, 110, bar_y + 8, fill="gray30", outline="")
-        canvas.create_rectangle(10, bar_y, 10 + stamina, bar_y + 8, fill="lime", outline="")
-        canvas.create_text(115, bar_y + 4, anchor="w", fill="lime", text="Stamina", font=("Helvetica", 8))
+        # Legend - AI states (shows what enemies are thinking)
+        ai_legend_y = world.height - 50
+        ai_states = [
+            ("○", "gray", "Patrol"), ("◆", "red", "Hunt"), ("⟩", "orange", "Intercept"),
+            ("↗", "yellow", "Flank"), ("?", "cyan", "Search"), ("◇", "magenta", "Ambush")
+        ]
+        put(("legend", "ai"), "text", (10, ai_legend_y), "hud", anchor="nw", fill="gray", text="AI:",
+            font=("Helvetica", 8))
+        for i, (icon, color, name) in enumerate(ai_states):
+            x = 35 + i * 70
+            put(("legend", name, "icon"), "text", (x, ai_legend_y + 5), "hud", text=icon, fill=color,
+                font=("Helvetica", 9, "bold"))
+            put(("legend", name, "label"), "text", (x + 10, ai_legend_y + 5), "hud", anchor="w", fill="gray",
+                text=name, font=("Helvetica", 7))
         
-        # Energy bar
-        bar_y = 42
-        canvas.create_rectangle(10, bar_y, 60, bar_y + 8, fill="gray30", outline="")
-        canvas.create_rectangle(10, bar_y, 10 + energy, bar_y + 8, fill="cyan", outline="")
-        canvas.create_text(65, bar_y + 4, anchor="w", fill="cyan", text="Energy", font=("Helvetica", 8))
+        # Game over / win overlay
+        if world.game_over or world.game_win:
+            put(("overlay", "shade"), "rectangle", (0, 0, world.width, world.height), "overlay",
+                fill="black", stipple="gray50")
+        if world.game_over:
+            put(("overlay", "title"), "text", (world.width / 2, world.height / 2 - 15), "overlay", fill="red",
+                text="GAME OVER", font=("Helvetica", 24, "bold"))
+            put(("overlay", "subtitle"), "text", (world.width / 2, world.height / 2 + 15), "overlay", fill="white",
+                text="Resetting...", font=("Helvetica", 12))
         
-        # Shield indicator
-        if player.state.get("shield_active", False):
-            canvas.create_text(10, 67, anchor="nw", fill="cyan", text="[SHIELD]", font=("Helvetica", 9, "bold"))
+        if world.game_win:
+            put(("overlay", "title"), "text", (world.width / 2, world.height / 2 - 15), "overlay", fill="lime",
+                text="VICTORY!", font=("Helvetica", 24, "bold"))
+            put(("overlay", "subtitle"), "text", (world.width / 2, world.height / 2 + 15), "overlay", fill="white",
+                text=f"Final Score: {world.score} | Waves: {world.wave}", font=("Helvetica", 12))
         
-        # Controls help
-        canvas.create_text(world.width - 10, 10, anchor="ne", fill="gray",
-                          text="Arrows: Move | SPACE: Dash | S: Shield", font=("Helvetica", 9))
-    
-    # Legend - entities
-    legend_y = world.height - 70
-    legend_items = [
-        ("blue", "Player"), ("red", "Hostile"), ("purple", "Converted"),
-        ("green", "Passive"), ("yellow", "Food"), ("gray", "Wall")
-    ]
-    for i, (color, name) in enumerate(legend_items):
-        x = 10 + i * 80
-        canvas.create_rectangle(x, legend_y, x + 10, legend_y + 10, fill=color, outline="")
-        canvas.create_text(x + 15, legend_y + 5, anchor="w", fill="white", text=name, font=("Helvetica", 8))
-    
-    # Legend - AI states (shows what enemies are thinking)
-    ai_legend_y = world.height - 50
-    ai_states = [
-        ("○", "gray", "Patrol"), ("◆", "red", "Hunt"), ("⟩", "orange", "Intercept"),
-        ("↗", "yellow", "Flank"), ("?", "cyan", "Search"), ("◇", "magenta", "Ambush")
-    ]
-    canvas.create_text(10, ai_legend_y, anchor="nw", fill="gray", text="AI:", font=("Helvetica", 8))
-    for i, (icon, color, name) in enumerate(ai_states):
-        x = 35 + i * 70
-        canvas.create_text(x, ai_legend_y + 5, text=icon, fill=color, font=("Helvetica", 9, "bold"))
-        canvas.create_text(x + 10, ai_legend_y + 5, anchor="w", fill="gray", text=name, font=("Helvetica", 7))
-    
-    # Game over / win overlay
-    if world.game_over:
-        canvas.create_rectangle(0, 0, world.width, world.height, fill="black", stipple="gray50")
-        canvas.create_text(world.width / 2, world.height / 2 - 15, fill="red",
-                          text="GAME OVER", font=("Helvetica", 24, "bold"))
-        canvas.create_text(world.width / 2, world.height / 2 + 15, fill="white",
-                          text="Resetting...", font=("Helvetica", 12))
-    
-    if world.game_win:
-        canvas.create_rectangle(0, 0, world.width, world.height, fill="black", stipple="gray50")
-        canvas.create_text(world.width / 2, world.height / 2 - 15, fill="lime",
-                          text="VICTORY!", font=("Helvetica", 24, "bold"))
-        canvas.create_text(world.width / 2, world.height / 2 + 15, fill="white",
-                          text=f"Final Score: {world.score} | Waves: {world.wave}", font=("Helvetica", 12))
-    
-    # Recent events log (bottom right)
-    if world.events:
-        events_text = "\n".join(world.events[-3:])
-        canvas.create_text(world.width - 10, world.height - 70, anchor="se", fill="yellow",
-                          text=events_text, font=("Helvetica", 8), justify="right")
-    
-    canvas.update()
+        # Recent events log (bottom right)
+        if world.events:
+            events_text = "\n".join(str(e) for e in world.events[-3:])
+            put(("hud", "events"), "text", (world.width - 10, world.height - 70), "hud", anchor="se",
+                fill="yellow", text=events_text, font=("Helvetica", 8), justify="right")
+    
+    def sweep(self, world: World) -> None:
+        """Hide elements not drawn this frame; delete those of despawned entities."""
+        canvas = self.canvas
+        for key in [k for k in self.items if k not in self.live]:
+            if key[0] == "ent" and key[1] not in world.entities:
+                canvas.delete(self.items.pop(key))
+                del self.shown[key]
+                self.hidden.discard(key)
+            elif key not in self.hidden:
+                canvas.itemconfigure(self.items[key], state="hidden")
+                self.hidden.add(key)
+        # Keep HUD and overlays above entities that spawned after them
+        if self.created:
+            canvas.tag_raise("hud")
+            canvas.tag_raise("overlay")
+
+
+def draw(world: World, canvas: tk.Canvas, alpha: float = 1.0,
+         previous: Optional[Dict[str, Tuple[float, float]]] = None, rates: str = "") -> None:
+    """Render the world state with the canvas's retained renderer."""
+    renderer = getattr(canvas, "_rpe_renderer", None)
+    if renderer is None:
+        renderer = canvas._rpe_renderer = Renderer(canvas)
+    renderer.draw(world, alpha, previous, rates)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FRAME PACING - fixed simulation rate, independent render rate
+# ═══════════════════════════════════════════════════════════════════════════════
+SIM_DT = 0.040  # Seconds per simulation tick (25 Hz, the game's tuned speed)
+RENDER_INTERVAL_MS = 16  # Target ~60 fps; slow frames just lower the fps
+MAX_STEPS_PER_FRAME = 5  # Catch-up cap so a long stall doesn't spiral
+GAME_OVER_PAUSE = 1.5
+VICTORY_PAUSE = 2.5
+
+
+class FixedStepClock:
+    """Accumulator that converts elapsed wall time into whole simulation steps."""
+    
+    def __init__(self, dt: float = SIM_DT, max_steps: int = MAX_STEPS_PER_FRAME) -> None:
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.last: Optional[float] = None
+        self.dropped = 0.0  # Simulation time skipped because we fell too far behind
+        # Measured rates, refreshed about once a second
+        self.sim_hz = 0.0
+        self.fps = 0.0
+        self._window_start: Optional[float] = None
+        self._window_steps = 0
+        self._window_frames = 0
+    
+    def reset(self, now: float) -> None:
+        self.accumulator = 0.0
+        self.last = now
+    
+    def advance(self, now: float) -> int:
+        """Number of steps due at `now`; several when rendering fell behind."""
+        if self.last is None:
+            self.last = now
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator // self.dt)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        self._window_steps += steps
+        return steps
+    
+    @property
+    def alpha(self) -> float:
+        """How far between the last two ticks the current frame falls."""
+        return min(1.0, self.accumulator / self.dt)
+    
+    def frame_drawn(self, now: float) -> None:
+        self._window_frames += 1
+        if self._window_start is None:
+            self._window_start = now
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.sim_hz = self._window_steps / elapsed
+            self.fps = self._window_frames / elapsed
+            self._window_start = now
+            self._window_steps = 0
+            self._window_frames = 0
+    
+    def rates_text(self) -> str:
+        return f"Sim: {self.sim_hz:.0f} Hz  Render: {self.fps:.0f} fps"
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════════
 def main() -> None:
+    import argparse
+    from pathlib import Path
+    
+    p = argparse.ArgumentParser(description="RPE rule engine demo.")
+    p.add_argument("--seed", type=int, default=None, help="World seed (default: random).")
+    p.add_argument("--record", type=Path, default=None, help="Write an input log for toy_game/replay.py.")
+    p.add_argument("--rules", action="store_true", help="Print the compiled rule DAG and exit.")
+    p.add_argument("--lookahead", type=int, default=0,
+                   help="Ticks of forked rollouts behind hostile intercepts (0: straight-line prediction).")
+    args = p.parse_args()
+    if args.rules:
+        print(describe_rules())
+        return
+    
     width, height = 700, 500
-    world = create_world(width, height)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    world = create_world(width, height, seed=seed)
+    world.lookahead = args.lookahead
+    
+    recorder = None
+    if args.record:
+        from replay import InputRecorder
+        recorder = InputRecorder(args.record, world)
     
     root = tk.Tk()
     root.title("RPE Rule Engine Demo - Advanced Features")
@@ -1518,59 +2990,55 @@ def main() -> None:
     canvas.pack()
     
     def on_key(event: tk.Event) -> None:
-        player = world.entities.get("player")
-        if not player or world.game_over or world.game_win:
-            return
-        
-        if event.keysym == "Up":
-            player.state["vy"] = -1
-            player.state["vx"] = 0
-        elif event.keysym == "Down":
-            player.state["vy"] = 1
-            player.state["vx"] = 0
-        elif event.keysym == "Left":
-            player.state["vx"] = -1
-            player.state["vy"] = 0
-        elif event.keysym == "Right":
-            player.state["vx"] = 1
-            player.state["vy"] = 0
-        elif event.keysym == "space":
-            player_dash(world)
-        elif event.keysym.lower() == "s":
-            player_shield(world)
+        handle_key_press(world, event.keysym)
+        if recorder:
+            recorder.key(event.keysym, pressed=True)
     
     def on_key_release(event: tk.Event) -> None:
-        player = world.entities.get("player")
-        if not player:
-            return
-        if event.keysym in ("Up", "Down"):
-            player.state["vy"] = 0
-        if event.keysym in ("Left", "Right"):
-            player.state["vx"] = 0
+        handle_key_release(world, event.keysym)
+        if recorder:
+            recorder.key(event.keysym, pressed=False)
     
     root.bind("<KeyPress>", on_key)
     root.bind("<KeyRelease>", on_key_release)
     
-    def loop() -> None:
-        step(world)
-        draw(world, canvas)
-        
-        if world.game_over:
-            root.after(1500, lambda: reset_and_continue())
-        elif world.game_win:
-            root.after(2500, lambda: reset_and_continue())
+    clock = FixedStepClock()
+    previous: Dict[str, Tuple[float, float]] = {}  # Positions before the latest step
+    resume_at: Optional[float] = None  # End of the game-over / victory pause
+    
+    def frame() -> None:
+        nonlocal previous, resume_at
+        now = time.perf_counter()
+        if resume_at is not None:
+            if now >= resume_at:
+                world.game_over = False
+                world.game_win = False
+                reset_world(world, width, height)
+                if recorder:
+                    recorder.reset()
+                previous = {}
+                resume_at = None
+                clock.reset(now)
         else:
-            root.after(40, loop)
-    
-    def reset_and_continue():
-        if world.game_over or world.game_win:
-            world.game_over = False
-            world.game_win = False
-            reset_world(world, width, height)
-        root.after(40, loop)
-    
-    root.after(40, loop)
-    root.mainloop()
+            for _ in range(clock.advance(now)):
+                previous = {eid: (e.x, e.y) for eid, e in world.entities.items()}
+                step(world)
+                if recorder:
+                    recorder.step_done(world)
+                if world.game_over or world.game_win:
+                    resume_at = now + (GAME_OVER_PAUSE if world.game_over else VICTORY_PAUSE)
+                    previous = {}
+                    break
+        clock.frame_drawn(now)
+        draw(world, canvas, clock.alpha, previous, clock.rates_text())
+        root.after(RENDER_INTERVAL_MS, frame)
+    
+    root.after(RENDER_INTERVAL_MS, frame)
+    try:
+        root.mainloop()
+    finally:
+        if recorder:
+            recorder.close()
 
 
 if __name__ == "__main__":
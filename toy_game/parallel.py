@@ -0,0 +1,702 @@
+"""
+Sharded parallel tick: sensing, decision-making and contact tests in worker processes.
+
+Run:
+  python toy_game/parallel.py --entities 2000 --ticks 10 --workers 1 2 4 8 16
+  python toy_game/parallel.py --check          # sharded == serial, tick by tick
+
+ShardedStepper farms the per-entity and pairwise work of a tick out to a
+process pool, phase by phase, and keeps everything else in-process:
+
+  EPISTEMIC  Every sensing entity tests every other one for range and wall
+             occlusion. Positions are packed into a multiprocessing
+             shared_memory buffer; workers answer the range/LOS queries for
+             one spatial strip of sensing entities each and return compact
+             per-entity index lists, which the main process merges into
+             KnowledgeGraphs with the serial code (build_knowledge /
+             propagate_alerts).
+  DYNAMICS   The player moves in-process. Each AI entity's decision and
+             move (AI_BEHAVIOURS) runs in a worker on a copy of the entity
+             and its KnowledgeGraph, against a read-only view holding just
+             what the AI reads: the player, food, the passives' threats,
+             walls and the tactical map. Workers send back the position,
+             the state keys that changed and the entity's RNG counter.
+             Without double buffering passives see this tick's hostile
+             moves, so hostiles and converted go in one round and passives
+             in a second.
+  META       convert_factions and consume_food test every hostile against
+             every hostile and passive, and every eater against every food.
+             Workers find the pairs in reach (over the same shared buffer)
+             and the main process replays the serial rule over just those
+             pairs, in the same order.
+
+Timers, CONSTRAINT, the tactical map update, the other META rules and GCO
+run as in main.step(), and the result matches it bit for bit (--check runs
+both the single- and double-buffered modes). With World.lookahead set and
+no double buffering, DYNAMICS stays in-process: forecast_player() forks the
+world as it stands at the first pursuer's turn, half-way through the phase.
+
+Scaling: this has only been measured on a 1-CPU machine, where the workers
+take turns and no worker count beats --workers 1. No 1-16-core scaling curve
+has been measured. The benchmark reports speedup against --workers 1; the
+serial step() row is for reference only, since the workers also use
+x-sorted sweeps where step() tests every pair.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import math
+import os
+import pickle
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from itertools import count as counter
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from main import (
+    AI_BEHAVIOURS,
+    DYNAMICS,
+    EPISTEMIC,
+    EV_ACCELERATED,
+    EV_COLLIDED,
+    EV_CONVERTED,
+    EV_FOOD_EATEN,
+    EV_VICTORY,
+    META,
+    ChangeLog,
+    Entity,
+    EventBus,
+    GameEvent,
+    GeometryContext,
+    KnowledgeGraph,
+    TacticalMap,
+    TickArena,
+    TimerWheel,
+    Wall,
+    World,
+    apply_constraint,
+    apply_dynamics,
+    begin_buffered_tick,
+    build_knowledge,
+    compute_distance,
+    create_world,
+    dynamics_speed,
+    fire_timers,
+    forecast_player,
+    line_intersects_wall,
+    move_player,
+    observed_player_velocity,
+    phase_schedule,
+    propagate_alerts,
+    read_view,
+    rebuild_relations,
+    resolve_tick,
+    run_rule,
+    start_conversion_cooldown,
+    step,
+)
+
+# Per-entity record in shared memory (float64 each)
+X_GEO, Y_GEO, X, Y, KIND, RADIUS = range(6)
+STRIDE = 6
+KIND_CODES = {"Player": 1.0, "Hostile": 2.0, "Converted": 3.0, "Passive": 4.0, "Food": 5.0}
+HOSTILE_CODES = (2.0, 3.0)
+
+# Ranges hard-coded in apply_epistemic / propagate_alerts
+ALLY_RANGE = 150
+RELAY_RANGE = 120
+# ... and in convert_factions / consume_food
+COLLIDE_RANGE = 12
+CONVERT_RANGE = 10
+EAT_RANGE = 10
+
+# DYNAMICS rounds without double buffering: an AI entity may only read
+# entities of a lower rank, which have all moved before its round
+AI_RANK = {"Player": 0, "Hostile": 1, "Converted": 1, "Passive": 2}
+
+ShardResult = List[Tuple[int, List[int], List[int], List[int]]]
+AIJob = Tuple[Entity, Optional[KnowledgeGraph], float, Optional[int]]  # entity, knowledge, speed, RNG draws
+AIResult = Tuple[float, float, Dict[str, Any], Optional[int]]  # x, y, changed state, RNG draws
+
+_tokens = counter()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# WORKER SIDE
+# ═══════════════════════════════════════════════════════════════════════════════
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+_views: Dict[int, World] = {}  # Token -> unpickled DYNAMICS view, shared by a round's shards
+_static: Dict[Tuple, Tuple[dict, set]] = {}  # Map geometry -> TacticalMap static layers
+_MISSING = object()
+
+
+def _attach(name: str) -> memoryview:
+    """Attach (once per worker) to the main process's shared position buffer."""
+    shm = _attached.get(name)
+    if shm is None:
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm.buf.cast("d")
+
+
+def _records(shm_name: str, count: int) -> List[List[float]]:
+    data = _attach(shm_name)
+    rec = [data[i * STRIDE:(i + 1) * STRIDE].tolist() for i in range(count)]
+    data.release()
+    return rec
+
+
+def _blocked(x1: float, y1: float, x2: float, y2: float, walls: Sequence[Wall]) -> bool:
+    for wall in walls:
+        if line_intersects_wall(x1, y1, x2, y2, wall):
+            return True
+    return False
+
+
+def sense_shard(shm_name: str, count: int, shard: List[int], walls: List[Wall]) -> ShardResult:
+    """
+    Answer range/LOS queries for one strip of sensing entities.
+    Returns (index, visible, allies, relay) per entity, all as entity
+    indices; visible is in proximity order, the rest in entity order.
+    """
+    rec = _records(shm_name, count)
+    by_geo_x = sorted((r[X_GEO], i) for i, r in enumerate(rec))
+    by_x = sorted((r[X], i) for i, r in enumerate(rec))
+    geo_keys = [k for k, _ in by_geo_x]
+    x_keys = [k for k, _ in by_x]
+
+    def near(keys: List[float], order: List[Tuple[float, int]], x: float, reach: float) -> List[int]:
+        lo = bisect.bisect_left(keys, x - reach)
+        hi = bisect.bisect_right(keys, x + reach)
+        return sorted(idx for _, idx in order[lo:hi])
+
+    results: ShardResult = []
+    for i in shard:
+        me = rec[i]
+        gx, gy, x, y, kind, radius = me
+        is_hostile = kind in HOSTILE_CODES
+
+        # Visibility uses tick-start (GEOMETRY) positions, like geo_ctx
+        seen: List[Tuple[float, int]] = []
+        for j in near(geo_keys, by_geo_x, gx, radius):
+            if j == i:
+                continue
+            other = rec[j]
+            dist = math.sqrt((gx - other[X_GEO]) ** 2 + (gy - other[Y_GEO]) ** 2)
+            if dist <= radius and not _blocked(gx, gy, other[X_GEO], other[Y_GEO], walls):
+                seen.append((dist, j))
+        seen.sort()
+
+        # Allies and relays use post-CONSTRAINT positions, like the serial phase
+        allies: List[int] = []
+        relay: List[int] = []
+        if is_hostile:
+            for j in near(x_keys, by_x, x, ALLY_RANGE):
+                other = rec[j]
+                if j == i or other[KIND] not in HOSTILE_CODES:
+                    continue
+                dist = math.sqrt((x - other[X]) ** 2 + (y - other[Y]) ** 2)
+                if dist < ALLY_RANGE:
+                    allies.append(j)
+                if dist < RELAY_RANGE and not _blocked(gx, gy, other[X_GEO], other[Y_GEO], walls):
+                    relay.append(j)
+
+        results.append((i, [j for _, j in seen], allies, relay))
+    return results
+
+
+def contact_shard(shm_name: str, count: int, shard: List[int], kinds: Tuple[float, ...],
+                  reach: float) -> List[Tuple[int, List[int]]]:
+    """
+    For each entity of one strip, the entities of `kinds` at most `reach`
+    away (the compute_distance() test), in entity order.
+    """
+    rec = _records(shm_name, count)
+    by_x = sorted((r[X], i) for i, r in enumerate(rec) if r[KIND] in kinds)
+    keys = [k for k, _ in by_x]
+    window = reach + 1e-6  # The exact test below decides; the window only has to contain it
+
+    results: List[Tuple[int, List[int]]] = []
+    for i in shard:
+        x, y = rec[i][X], rec[i][Y]
+        lo = bisect.bisect_left(keys, x - window)
+        hi = bisect.bisect_right(keys, x + window)
+        hits = [j for _, j in by_x[lo:hi]
+                if j != i and math.sqrt((x - rec[j][X]) ** 2 + (y - rec[j][Y]) ** 2) <= reach]
+        hits.sort()
+        results.append((i, hits))
+    return results
+
+
+def _static_layers(view: World) -> Tuple[dict, set]:
+    """Per-worker TacticalMap wall layers; they only depend on the map, so they outlive the tick."""
+    key = (view.width, view.height, tuple((w.x1, w.y1, w.x2, w.y2) for w in view.walls))
+    layers = _static.get(key)
+    if layers is None:
+        _static.clear()
+        layers = _static[key] = ({}, set())
+    return layers
+
+
+def think_shard(token: int, view_blob: bytes, jobs: List[AIJob]) -> List[AIResult]:
+    """
+    Run AI_BEHAVIOURS for a batch of entities against the round's read-only
+    view. Each job's entity and knowledge are private copies; what comes
+    back is what the main process has to write into the live entity.
+    """
+    view = _views.get(token)
+    if view is None:
+        _views.clear()
+        view = _views[token] = pickle.loads(view_blob)
+        view.tactics.static, view.tactics.static_sectors = _static_layers(view)
+
+    results: List[AIResult] = []
+    for ent, kg, speed, draws in jobs:
+        view.rng_counters = {} if draws is None else {ent.id: draws}
+        before = dict(ent.state)
+        AI_BEHAVIOURS[ent.kind](ent, view, kg, speed)
+        changed = {k: v for k, v in ent.state.items() if before.get(k, _MISSING) is not v}
+        results.append((ent.x, ent.y, changed, view.rng_counters.get(ent.id)))
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAIN-PROCESS SIDE
+# ═══════════════════════════════════════════════════════════════════════════════
+class ShardedStepper:
+    """Steps a World with sensing, AI and META contact tests fanned out over worker processes."""
+
+    def __init__(self, workers: int, shards: Optional[int] = None) -> None:
+        self.workers = workers
+        self.shards = shards or workers * 4  # Several strips per worker to even out load
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.capacity = 0
+        # META rules replaced by sharded versions, by rule name
+        self.meta_rules = {"convert_factions": self.convert_factions, "consume_food": self.consume_food}
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self) -> "ShardedStepper":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _ensure_capacity(self, count: int) -> None:
+        if count <= self.capacity:
+            return
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+        self.capacity = max(count, self.capacity * 2, 64)
+        self.shm = shared_memory.SharedMemory(create=True, size=self.capacity * STRIDE * 8)
+
+    def _pack(self, records: array) -> None:
+        """Publish one record per entity to the workers in one write."""
+        self._ensure_capacity(len(records) // STRIDE)
+        self.shm.buf[:len(records) * 8] = records.tobytes()
+
+    def _strips(self, indices: List[int], key: Sequence[float]) -> List[List[int]]:
+        """Contiguous spatial strips of `indices`, sorted by x (`key`)."""
+        ordered = sorted(indices, key=lambda i: key[i])
+        size = max(1, math.ceil(len(ordered) / self.shards))
+        return [ordered[k:k + size] for k in range(0, len(ordered), size)]
+
+    def step(self, world: World) -> None:
+        """Same tick as main.step(), with sharded EPISTEMIC, DYNAMICS and META work."""
+        world.events.clear()
+        fire_timers(world)
+
+        # GEOMETRY positions are captured here; the full pairwise context isn't
+        # needed because workers answer the only queries EPISTEMIC makes of it
+        geo_positions = [(e.x, e.y) for e in world.entities.values()]
+
+        violations = apply_constraint(world)
+        world.events.extend(violations)
+
+        begin_buffered_tick(world)
+        knowledge = self.apply_epistemic(world, geo_positions)
+        resolve_tick(world, knowledge, GeometryContext({}, {}, {}, {}),
+                     dynamics=self.apply_dynamics, meta=self.apply_meta)
+
+    # --- EPISTEMIC --------------------------------------------------------
+    def apply_epistemic(self, world: World, geo_positions: List[Tuple[float, float]]) -> Dict[str, KnowledgeGraph]:
+        view = read_view(world)
+        ids = list(view.entities)
+        index = {eid: i for i, eid in enumerate(ids)}
+        radii: Dict[str, float] = {}
+        for rel in world.relations:
+            if rel.primitive == EPISTEMIC and rel.source in index:
+                radii[rel.source] = rel.payload.get("sense_radius", 100)
+
+        flat = array("d")
+        for eid, (gx, gy) in zip(ids, geo_positions):
+            ent = view.entities[eid]
+            flat.extend((gx, gy, ent.x, ent.y, KIND_CODES.get(ent.kind, 0.0), radii.get(eid, 0.0)))
+        self._pack(flat)
+
+        strips = self._strips([index[eid] for eid in radii], [gx for gx, _ in geo_positions])
+        futures = [
+            self.pool.submit(sense_shard, self.shm.name, len(ids), strip, world.walls)
+            for strip in strips
+        ]
+        sensed: Dict[str, Tuple[List[str], List[str], set]] = {}
+        for future in futures:
+            for i, visible, allies, relay in future.result():
+                sensed[ids[i]] = (
+                    [ids[j] for j in visible],
+                    [ids[j] for j in allies],
+                    {ids[j] for j in relay},
+                )
+
+        # Merge: identical to the serial phase from here on
+        knowledge: Dict[str, KnowledgeGraph] = {}
+        player_vel = observed_player_velocity(view)
+        for rel in world.relations:
+            if rel.primitive != EPISTEMIC:
+                continue
+            ent = world.entities.get(rel.source)
+            if not ent or ent.id not in sensed:
+                continue
+            visible, allies, _ = sensed[ent.id]
+            knowledge[ent.id] = build_knowledge(world, view, ent, rel, visible, list(allies), player_vel)
+
+        propagate_alerts(world, view, knowledge, lambda h1, h2: h2.id in sensed[h1.id][2])
+        return knowledge
+
+    # --- DYNAMICS ---------------------------------------------------------
+    def apply_dynamics(self, world: World, knowledge: Dict[str, KnowledgeGraph],
+                       geo_ctx: GeometryContext) -> None:
+        """main.apply_dynamics() with the AI entities' turns run in worker rounds."""
+        movers: List[Tuple[Entity, float]] = []
+        for rel in world.relations:
+            if rel.primitive == DYNAMICS and rel.source in world.entities:
+                ent = world.entities[rel.source]
+                movers.append((ent, dynamics_speed(ent, rel)))
+
+        if not world.double_buffered:
+            ranks = [AI_RANK.get(ent.kind, 0) for ent, _ in movers]
+            if world.lookahead or ranks != sorted(ranks):
+                apply_dynamics(world, knowledge, geo_ctx)  # Turn order matters; see the module docstring
+                return
+
+        rounds: List[List[Tuple[Entity, float]]] = [[], []]
+        for ent, speed in movers:
+            if ent.kind == "Player":
+                move_player(ent, speed)
+            elif ent.kind in AI_BEHAVIOURS:
+                late = ent.kind == "Passive" and not world.double_buffered
+                rounds[late].append((ent, speed))
+        for batch in rounds:
+            if batch:
+                self._think(world, batch, knowledge)
+
+    def _think(self, world: World, batch: List[Tuple[Entity, float]],
+               knowledge: Dict[str, KnowledgeGraph]) -> None:
+        view = read_view(world)
+        # What AI_BEHAVIOURS read of other entities: the player, passives' threats and food
+        wanted: Set[str] = {"player"}
+        food = False
+        for ent, _ in batch:
+            if ent.kind == "Passive":
+                food = True
+                kg = knowledge.get(ent.id)
+                if kg:
+                    wanted.update(kg.threats)
+        entities = {eid: e for eid, e in view.entities.items()
+                    if eid in wanted or (food and e.kind == "Food")}
+        scratch = TickArena()
+        if world.lookahead:
+            scratch.forecast = (world.tick, forecast_player(view))
+        tactics = world.tactics
+        round_view = replace(
+            view, entities=entities, relations=[], events=[], event_bus=EventBus(), previous=None,
+            rng_counters={}, timers=TimerWheel(), changes=ChangeLog(), scratch=scratch, gco_report={},
+            tactics=TacticalMap.restore(tactics.food_sources, tactics.heat, tactics.heat_scale),
+        )
+        blob = pickle.dumps(round_view, pickle.HIGHEST_PROTOCOL)
+        token = next(_tokens)
+
+        jobs: List[AIJob] = [(ent, knowledge.get(ent.id), speed, world.rng_counters.get(ent.id))
+                             for ent, speed in batch]
+        size = max(1, math.ceil(len(jobs) / self.shards))
+        futures = [self.pool.submit(think_shard, token, blob, jobs[k:k + size])
+                   for k in range(0, len(jobs), size)]
+        results = [r for future in futures for r in future.result()]
+        for (ent, _), (x, y, changed, draws) in zip(batch, results):
+            ent.x, ent.y = x, y
+            ent.state.update(changed)
+            if draws is not None:
+                world.rng_counters[ent.id] = draws
+
+    # --- META -------------------------------------------------------------
+    def apply_meta(self, world: World) -> List[GameEvent]:
+        """main.apply_meta() (sequential order) with the O(N^2) rules swapped for sharded ones."""
+        events: List[GameEvent] = []
+        for r in phase_schedule(META).order:
+            fn = self.meta_rules.get(r.name)
+            out = run_rule(world, r if fn is None else replace(r, fn=fn))
+            if out:
+                events.extend(out)
+        return events
+
+    def contacts(self, entities: Dict[str, Entity], queries: List[str], kinds: Sequence[str],
+                 reach: float) -> Dict[str, List[str]]:
+        """Ids of `kinds` within `reach` of each of `queries` (compute_distance <= reach), in entity order."""
+        ids = list(entities)
+        index = {eid: i for i, eid in enumerate(ids)}
+        flat = array("d")
+        for ent in entities.values():
+            flat.extend((ent.x, ent.y, ent.x, ent.y, KIND_CODES.get(ent.kind, 0.0), 0.0))
+        self._pack(flat)
+
+        codes = tuple(KIND_CODES[k] for k in kinds)
+        strips = self._strips([index[eid] for eid in queries], [e.x for e in entities.values()])
+        futures = [
+            self.pool.submit(contact_shard, self.shm.name, len(ids), strip, codes, reach)
+            for strip in strips
+        ]
+        near: Dict[str, List[str]] = {}
+        for future in futures:
+            for i, hits in future.result():
+                near[ids[i]] = [ids[j] for j in hits]
+        return near
+
+    def convert_factions(self, world: World) -> List[GameEvent]:
+        """main.convert_factions() over the contact pairs found by the workers."""
+        if world.double_buffered:
+            return self.resolve_conversions_buffered(world)
+        events: List[GameEvent] = []
+        ents = world.entities
+        hostile_ids = [e.id for e in ents.values() if e.kind == "Hostile"]
+        near = self.contacts(ents, hostile_ids, ("Hostile", "Passive"), COLLIDE_RANGE)
+
+        # Hostile-Hostile collision -> Converted, pairs in the serial (i, j) order
+        order = {eid: k for k, eid in enumerate(hostile_ids)}
+        for a_id in hostile_ids:
+            for b_id in near[a_id]:
+                if order.get(b_id, -1) <= order[a_id]:
+                    continue
+                a, b = ents[a_id], ents[b_id]
+                for ent in (a, b):
+                    ent.kind = "Converted"
+                    ent.color = "purple"
+                    ent.state["speed"] = 1.5 + world.enemy_speed_boost  # Inherit speed boost
+                    start_conversion_cooldown(world, ent)
+                events.append(GameEvent(EV_COLLIDED, world.tick, (a.id, b.id)))
+                rebuild_relations(world)
+
+        # Hostile converts Passive on contact
+        for h in [e for e in ents.values() if e.kind == "Hostile"]:
+            if h.state.get("conversion_cooldown"):
+                continue
+            for pid in near[h.id]:
+                p = ents[pid]
+                if p.kind != "Passive" or p.state.get("conversion_cooldown"):
+                    continue
+                if compute_distance(h, p) <= CONVERT_RANGE:
+                    p.kind = "Converted"
+                    p.color = "purple"
+                    p.state["speed"] = 1.4 + world.enemy_speed_boost  # Inherit speed boost
+                    start_conversion_cooldown(world, p)
+                    events.append(GameEvent(EV_CONVERTED, world.tick, (h.id, p.id)))
+                    rebuild_relations(world)
+                    break
+
+        return events
+
+    def resolve_conversions_buffered(self, world: World) -> List[GameEvent]:
+        """main.resolve_conversions_buffered() over the contact pairs found by the workers."""
+        events: List[GameEvent] = []
+        view = read_view(world)
+        hostiles = sorted((e for e in view.entities.values() if e.kind == "Hostile"), key=lambda e: e.id)
+        near = self.contacts(view.entities, [h.id for h in hostiles], ("Hostile", "Passive"), COLLIDE_RANGE)
+        new_speeds: Dict[str, float] = {}
+
+        # Hostile-Hostile collision -> Converted
+        for a in hostiles:
+            for b_id in sorted(near[a.id]):
+                if b_id > a.id and view.entities[b_id].kind == "Hostile":
+                    new_speeds[a.id] = new_speeds[b_id] = 1.5 + world.enemy_speed_boost
+                    events.append(GameEvent(EV_COLLIDED, world.tick, (a.id, b_id)))
+
+        # Hostile converts the nearest eligible Passive on contact
+        converted_by: Dict[str, str] = {}
+        for h in hostiles:
+            if h.id in new_speeds or h.state.get("conversion_cooldown"):
+                continue
+            in_reach = [
+                (compute_distance(h, p), p.id) for p in (view.entities[pid] for pid in near[h.id])
+                if p.kind == "Passive" and not p.state.get("conversion_cooldown")
+                and compute_distance(h, p) <= CONVERT_RANGE
+            ]
+            if in_reach:
+                converted_by.setdefault(min(in_reach)[1], h.id)
+        for pid, hid in sorted(converted_by.items()):
+            new_speeds[pid] = 1.4 + world.enemy_speed_boost
+            events.append(GameEvent(EV_CONVERTED, world.tick, (hid, pid)))
+
+        for eid, speed in new_speeds.items():
+            ent = world.entities[eid]
+            ent.kind = "Converted"
+            ent.color = "purple"
+            ent.state["speed"] = speed  # Inherit speed boost
+            start_conversion_cooldown(world, ent)
+        if new_speeds:
+            rebuild_relations(world)
+        return events
+
+    def consume_food(self, world: World) -> List[GameEvent]:
+        """main.consume_food() over the eater/food pairs found by the workers."""
+        events: List[GameEvent] = []
+        eaters = [e for e in world.entities.values() if e.kind in ("Passive", "Player")]
+        near = self.contacts(world.entities, [e.id for e in eaters], ("Food",), EAT_RANGE)
+        eaten: Set[str] = set()
+        player_ate = False
+
+        for eater in eaters:
+            for fid in near[eater.id]:
+                if fid in eaten:
+                    continue
+                eaten.add(fid)
+                if eater.kind == "Player":
+                    world.score += 1
+                    player_ate = True
+                    events.append(GameEvent(EV_FOOD_EATEN, world.tick, (fid,), (world.score,)))
+                    if world.score >= world.goal:
+                        world.game_win = True
+                        events.append(GameEvent(EV_VICTORY, world.tick))
+
+        for fid in eaten:
+            world.entities.pop(fid, None)
+        if eaten:
+            world.changes.touch("entities")
+        if player_ate:
+            world.changes.touch("score")
+            speed_boost = world.speed_boost_per_food
+            world.enemy_speed_boost += speed_boost
+            for ent in world.entities.values():
+                if ent.kind in ("Hostile", "Converted"):
+                    ent.state["speed"] = ent.state.get("speed", 1.3) + speed_boost
+            events.append(GameEvent(EV_ACCELERATED, world.tick, values=(speed_boost,)))
+
+        return events
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARK / CHECK
+# ═══════════════════════════════════════════════════════════════════════════════
+def crowded_world(entities: int, seed: int, double_buffered: bool = True) -> World:
+    """A world scaled so entity density matches the default 700x500 arena."""
+    random.seed(seed)
+    side = int(math.sqrt(700 * 500 / 12 * entities))
+    world = create_world(side, side, seed=seed)
+    world.double_buffered = double_buffered
+    for n in range(entities - len(world.entities)):
+        roll = n % 10
+        x, y = random.uniform(20, side - 20), random.uniform(20, side - 20)
+        if roll < 3:
+            eid = f"hostile_x{n}"
+            patrol = [(x, y), (min(side - 20, x + 80), y), (x, min(side - 20, y + 80))]
+            world.entities[eid] = Entity(eid, "Hostile", "red", x, y, {
+                "speed": 1.3, "vx": 0, "vy": 0, "patrol_points": patrol, "patrol_idx": 0,
+                "alert_level": 0, "memory": {},
+            })
+        elif roll < 8:
+            eid = f"passive_x{n}"
+            world.entities[eid] = Entity(eid, "Passive", "green", x, y, {
+                "vx": 0, "vy": 0, "speed": 0.9, "alert_level": 0, "memory": {},
+            })
+        else:
+            eid = f"food_x{n}"
+            world.entities[eid] = Entity(eid, "Food", "yellow", x, y)
+    rebuild_relations(world)
+    return world
+
+
+def world_signature(world: World) -> Tuple:
+    return (
+        world.tick, world.score, world.wave, world.game_over, world.enemy_speed_boost,
+        tuple(sorted(world.rng_counters.items())),
+        tuple((e.id, e.kind, e.x, e.y, repr(sorted(e.state.items())))
+              for e in world.entities.values()),
+    )
+
+
+def check(entities: int, ticks: int, workers: int, seed: int) -> bool:
+    """Run serial and sharded steps side by side, single- and double-buffered; report the first divergent tick."""
+    ok = True
+    for double_buffered in (False, True):
+        mode = "double-buffered" if double_buffered else "single-buffered"
+        serial = crowded_world(entities, seed, double_buffered)
+        sharded = crowded_world(entities, seed, double_buffered)
+        with ShardedStepper(workers) as stepper:
+            for t in range(ticks):
+                step(serial)
+                stepper.step(sharded)
+                if world_signature(serial) != world_signature(sharded):
+                    print(f"{mode}: diverged at tick {t}")
+                    ok = False
+                    break
+            else:
+                print(f"{mode}: serial and sharded agree for {ticks} ticks ({entities} entities, {workers} workers)")
+    return ok
+
+
+def bench(entities: int, ticks: int, worker_counts: List[int], seed: int, double_buffered: bool) -> None:
+    print(f"{entities} entities, {ticks} ticks, {'double' if double_buffered else 'single'}-buffered, "
+          f"{os.cpu_count()} CPUs")
+    world = crowded_world(entities, seed, double_buffered)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        step(world)
+    serial_ms = (time.perf_counter() - started) / ticks * 1000
+    print(f"  serial step():       {serial_ms:9.1f} ms/tick  (reference only: tests every pair)")
+
+    base_ms: Optional[float] = None
+    for workers in [1] + [w for w in worker_counts if w != 1]:
+        world = crowded_world(entities, seed, double_buffered)
+        with ShardedStepper(workers) as stepper:
+            stepper.step(world)  # Warm up the pool
+            started = time.perf_counter()
+            for _ in range(ticks):
+                stepper.step(world)
+            ms = (time.perf_counter() - started) / ticks * 1000
+        base_ms = base_ms or ms
+        print(f"  sharded x{workers:<3}         {ms:9.1f} ms/tick  speedup {base_ms / ms:5.2f}x vs x1")
+    if max(worker_counts) > (os.cpu_count() or 1):
+        print(f"  (worker counts above {os.cpu_count()} share CPUs; those rows are not a scaling curve)")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark or verify the sharded tick.")
+    p.add_argument("--entities", type=int, default=2000)
+    p.add_argument("--ticks", type=int, default=10)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--double-buffered", action="store_true", help="Benchmark double-buffered worlds.")
+    p.add_argument("--check", action="store_true", help="Verify sharded results match serial step().")
+    args = p.parse_args()
+    if args.check:
+        check(min(args.entities, 300), max(args.ticks, 50), args.workers[-1], args.seed)
+    else:
+        bench(args.entities, args.ticks, args.workers, args.seed, args.double_buffered)
+
+
+if __name__ == "__main__":
+    main()
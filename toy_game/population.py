@@ -0,0 +1,283 @@
+"""
+Statistical population tier for far-off crowds.
+
+Run:
+  python toy_game/population.py --grid 10 32 100 --density 10 --ticks 100
+
+Builds a third tier on top of chunks.py:
+
+  active     chunks near the player         full simulation (every phase)
+  dormant    a ring further out             exact entities, frozen + catch-up
+  aggregate  everything beyond that         per-chunk population counters
+
+Far from the player nobody sees individual wander paths or patrol routes,
+only how many of each kind there are. Aggregate chunks therefore hold just
+counts of Passive, Hostile, Converted and Food, advanced every
+`coarse_every` ticks with mean-field rates derived from the same rules the
+full simulation applies:
+
+  apply_meta    Hostile + Passive within CONVERT_RANGE -> Passive converts
+                (each hostile at most once per CONVERT_COOLDOWN ticks)
+                Hostile + Hostile within COLLIDE_RANGE -> both convert
+  consume_food  Passive within EAT_RANGE of Food -> food is eaten
+
+Contacts between randomly moving groups in area A happen at roughly
+n1 * n2 * 2r * v_rel / A per tick (the 2D collision kernel). Fractional
+expectations are resolved with the chunk's RNG stream, so runs are
+deterministic. When the player approaches, counts are re-expanded into
+concrete Entity objects at random spots in the chunk; when the player
+leaves, dormant chunks are collapsed back into counts. Memory and tick cost
+stay proportional to the live region plus one small record per chunk, so
+100k-entity maps are practical.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from chunks import ChunkKey, ChunkedWorld
+from main import (
+    Entity,
+    World,
+    create_world,
+    rebuild_relations,
+    rng_random,
+    rng_uniform,
+)
+from main import step as world_step
+from snapshot import load_value
+
+# Rule constants mirrored from apply_meta / consume_food / execute_patrol
+CONVERT_RANGE = 10.0  # Hostile converts Passive on contact
+CONVERT_COOLDOWN = 15  # Ticks between conversions by one hostile
+COLLIDE_RANGE = 12.0  # Hostile-Hostile collision
+EAT_RANGE = 10.0  # Eater reaches food
+HOSTILE_ROAM = 1.3 * 0.5  # Patrol moves at half speed
+PASSIVE_ROAM = 0.9 * 0.5
+
+
+@dataclass
+class RegionPopulation:
+    """Counts standing in for every entity of one aggregate chunk."""
+    passive: int = 0
+    hostile: int = 0
+    converted: int = 0
+    food: int = 0
+    spawned: int = 0  # Entities expanded from this region so far (keeps ids unique)
+
+    @property
+    def total(self) -> int:
+        return self.passive + self.hostile + self.converted + self.food
+
+
+def _resolve(world: World, stream: str, expected: float) -> int:
+    """Whole number of events from an expected count: floor plus one with the remaining probability."""
+    whole = int(expected)
+    return whole + (1 if rng_random(world, stream) < expected - whole else 0)
+
+
+def advance_region(world: World, key: ChunkKey, pop: RegionPopulation, area: float, ticks: int) -> Tuple[int, int]:
+    """Apply `ticks` worth of conversions and food consumption; returns (converted, eaten)."""
+    stream = f"pop.{key[0]}.{key[1]}"
+    h, p, f = pop.hostile, pop.passive, pop.food
+    converted = eaten = 0
+
+    if h and p:
+        v_rel = math.hypot(HOSTILE_ROAM, PASSIVE_ROAM)
+        contacts = h * p * 2 * CONVERT_RANGE * v_rel / area * ticks
+        limit = h * ticks / CONVERT_COOLDOWN
+        n = min(p, _resolve(world, stream, min(contacts, limit)))
+        pop.passive -= n
+        pop.converted += n
+        converted += n
+
+    if h >= 2:
+        pairs = h * (h - 1) / 2 * 2 * COLLIDE_RANGE * math.sqrt(2) * HOSTILE_ROAM / area * ticks
+        n = min(h // 2, _resolve(world, stream, pairs))
+        pop.hostile -= 2 * n
+        pop.converted += 2 * n
+        converted += 2 * n
+
+    if pop.passive and f:
+        meals = pop.passive * f * 2 * EAT_RANGE * PASSIVE_ROAM / area * ticks
+        n = min(f, _resolve(world, stream, meals))
+        pop.food -= n
+        eaten += n
+
+    return converted, eaten
+
+
+def expand_region(world: World, key: ChunkKey, pop: RegionPopulation,
+                  bounds: Tuple[float, float, float, float]) -> List[Entity]:
+    """Turn counts back into concrete entities scattered over the chunk."""
+    x0, y0, x1, y1 = bounds
+    stream = f"pop.{key[0]}.{key[1]}"
+    out: List[Entity] = []
+
+    def spot() -> Tuple[float, float]:
+        return (rng_uniform(world, stream, x0 + 20, x1 - 20), rng_uniform(world, stream, y0 + 20, y1 - 20))
+
+    def next_id(kind: str) -> str:
+        pop.spawned += 1
+        return f"{kind}_{key[0]}_{key[1]}_p{pop.spawned}"
+
+    for _ in range(pop.hostile):
+        x, y = spot()
+        patrol = [(x, y), (min(x1 - 20, x + 80), y), (x, min(y1 - 20, y + 80))]
+        out.append(Entity(next_id("hostile"), "Hostile", "red", x, y, {
+            "speed": 1.3 + world.enemy_speed_boost, "vx": 0, "vy": 0,
+            "patrol_points": patrol, "patrol_idx": 0, "alert_level": 0, "memory": {},
+        }))
+    for _ in range(pop.converted):
+        x, y = spot()
+        out.append(Entity(next_id("converted"), "Converted", "purple", x, y, {
+            "speed": 1.5 + world.enemy_speed_boost, "vx": 0, "vy": 0, "alert_level": 0, "memory": {},
+        }))
+    for _ in range(pop.passive):
+        x, y = spot()
+        out.append(Entity(next_id("passive"), "Passive", "green", x, y, {
+            "vx": 0, "vy": 0, "speed": 0.9, "alert_level": 0, "memory": {},
+        }))
+    for _ in range(pop.food):
+        x, y = spot()
+        out.append(Entity(next_id("food"), "Food", "yellow", x, y))
+    pop.passive = pop.hostile = pop.converted = pop.food = 0
+    return out
+
+
+def count_entities(entities: List[Entity], pop: RegionPopulation) -> None:
+    for ent in entities:
+        if ent.kind == "Passive":
+            pop.passive += 1
+        elif ent.kind == "Hostile":
+            pop.hostile += 1
+        elif ent.kind == "Converted":
+            pop.converted += 1
+        elif ent.kind == "Food":
+            pop.food += 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TIERED WORLD
+# ═══════════════════════════════════════════════════════════════════════════════
+class TieredWorld(ChunkedWorld):
+    """ChunkedWorld whose far chunks collapse into population counters."""
+
+    def __init__(self, world: World, chunk_size: float = 350.0, active_radius: int = 1,
+                 dormant_radius: int = 3, check_every: int = 10, coarse_every: int = 25) -> None:
+        self.dormant_radius = max(dormant_radius, active_radius)
+        self.coarse_every = coarse_every
+        self.regions: Dict[ChunkKey, RegionPopulation] = {}
+        self.expanded = 0
+        self.collapsed = 0
+        self.coarse_conversions = 0
+        self.coarse_meals = 0
+        super().__init__(world, chunk_size, active_radius, check_every)
+
+    def seed_regions(self, passive: int, hostile: int, food: int, skip: Optional[set] = None) -> None:
+        """Populate every chunk (except `skip`) with counts only - no Entity objects are built."""
+        for cx in range(self.cols):
+            for cy in range(self.rows):
+                if skip and (cx, cy) in skip:
+                    continue
+                pop = self.regions.setdefault((cx, cy), RegionPopulation())
+                pop.passive += passive
+                pop.hostile += hostile
+                pop.food += food
+        self.update_active()
+
+    def update_active(self) -> None:
+        near = self.wanted_chunks(self.dormant_radius)
+        # Re-expand counts the player is approaching into (frozen) entities first
+        for key in near:
+            pop = self.regions.get(key)
+            if pop is not None and pop.total:
+                ents = expand_region(self.world, key, pop, self.chunk_bounds(key))
+                self.expanded += len(ents)
+                self._freeze(key, ents)
+        super().update_active()
+        # Collapse dormant chunks that fell out of range
+        for key in [k for k in self.dormant if k not in near]:
+            chunk = self.dormant.pop(key)
+            ents: List[Entity] = load_value(zlib.decompress(chunk.data))
+            count_entities(ents, self.regions.setdefault(key, RegionPopulation()))
+            self.collapsed += len(ents)
+
+    def advance_regions(self, ticks: int) -> None:
+        area = self.chunk_size * self.chunk_size
+        for key, pop in self.regions.items():
+            if pop.total:
+                converted, eaten = advance_region(self.world, key, pop, area, ticks)
+                self.coarse_conversions += converted
+                self.coarse_meals += eaten
+
+    def step(self) -> None:
+        tick = self.world.tick
+        if tick % self.check_every == 0:
+            self.update_active()
+        if tick % self.coarse_every == 0:
+            self.advance_regions(self.coarse_every)
+        world_step(self.world)
+
+    def aggregate_entities(self) -> int:
+        return sum(pop.total for pop in self.regions.values())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+def tiered_world(grid: int, density: int, chunk_size: float = 350.0, seed: int = 0, **kwargs) -> TieredWorld:
+    """A grid x grid map seeded with `density` entities per chunk, in the open_world mix (3/5/2 per 10)."""
+    side = int(grid * chunk_size)
+    world = create_world(side, side, seed=seed)
+    world.entities = {"player": world.entities["player"]}
+    world.walls = []
+    player = world.entities["player"]
+    player.x = player.y = side / 2
+    rebuild_relations(world)
+    tiers = TieredWorld(world, chunk_size, **kwargs)
+    hostile = density * 3 // 10
+    food = density * 2 // 10
+    tiers.seed_regions(density - hostile - food, hostile, food)
+    return tiers
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Tick cost of the three-tier world as the map grows.")
+    p.add_argument("--grid", type=int, nargs="+", default=[10, 32, 100], help="Map sizes in chunks per side.")
+    p.add_argument("--density", type=int, default=10, help="Entities per chunk.")
+    p.add_argument("--chunk-size", type=float, default=350.0)
+    p.add_argument("--active-radius", type=int, default=1)
+    p.add_argument("--dormant-radius", type=int, default=3)
+    p.add_argument("--ticks", type=int, default=100)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    for grid in args.grid:
+        tracemalloc.start()
+        started = time.perf_counter()
+        tiers = tiered_world(grid, args.density, args.chunk_size, args.seed,
+                             active_radius=args.active_radius, dormant_radius=args.dormant_radius)
+        build_s = time.perf_counter() - started
+        total = len(tiers.world.entities) + tiers.dormant_entities() + tiers.aggregate_entities()
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            tiers.step()
+        per_tick = (time.perf_counter() - started) / args.ticks
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{grid:>4}x{grid:<4} chunks, {total:>7} entities | build {build_s:5.2f}s | "
+              f"{per_tick * 1000:7.2f} ms/tick (tracing on) | {len(tiers.world.entities)} live, "
+              f"{tiers.dormant_entities()} dormant, {tiers.aggregate_entities()} aggregate | "
+              f"coarse conversions {tiers.coarse_conversions}, meals {tiers.coarse_meals} | "
+              f"memory {current / 1e6:.1f} MB (peak {peak / 1e6:.1f})")
+
+
+if __name__ == "__main__":
+    main()
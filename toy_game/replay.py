@@ -0,0 +1,276 @@
+"""
+Input-log recording and max-speed deterministic replay.
+
+Run:
+  python toy_game/main.py --record session.rpil        # play and record
+  python toy_game/replay.py record bot.rpil --policy greedy --ticks 3000
+  python toy_game/replay.py play session.rpil [--profile]
+
+A game's only inputs are key presses/releases (which cover dash and shield)
+and the post-game-over reset, and the engine is deterministic for a given
+seed, so the log holds just those events plus a per-tick world hash. Replay
+rebuilds the world from the header, re-runs every tick headlessly at full
+CPU speed and checks each hash - handy for reproducing a slow session under
+a profiler without a human at the keyboard.
+
+Log format (little-endian):
+  b"RPIL" | version | seed u64 | width u32 | height u32 | varint len + JSON tuning
+  records: varint frame delta | type byte | payload
+    0x00-0x0F  key press   (low bits = key code)
+    0x10-0x1F  key release
+    0x20       reset
+    0x21       world hash (8 bytes, after the step that produced the frame)
+    0x22       end
+Frames count step() calls, so they keep increasing across resets even
+though world.tick starts over.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import hashlib
+import json
+import pstats
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from main import (
+    World,
+    create_world,
+    handle_key_press,
+    handle_key_release,
+    rebuild_relations,
+    reset_world,
+    step,
+)
+
+MAGIC = b"RPIL"
+VERSION = 1
+KEY_CODES: Dict[str, int] = {"Up": 0, "Down": 1, "Left": 2, "Right": 3, "space": 4, "s": 5}
+KEY_NAMES = {code: name for name, code in KEY_CODES.items()}
+EV_PRESS, EV_RELEASE, EV_RESET, EV_HASH, EV_END = 0x00, 0x10, 0x20, 0x21, 0x22
+
+_HEADER = struct.Struct("<QII")
+_STATE = struct.Struct("<qqqd??")
+_XY = struct.Struct("<dd")
+_HASH = struct.Struct("<Q")
+
+# World settings a replay needs to rebuild the starting state
+TUNING_FIELDS = ("difficulty", "wave_score_step", "speed_boost_per_food", "sense_radii", "double_buffered",
+                 "lookahead")
+
+
+class ReplayError(ValueError):
+    """Raised for malformed logs."""
+
+
+def world_hash(world: World) -> int:
+    """Cheap 64-bit digest of the state that matters for divergence checks."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(_STATE.pack(world.tick, world.score, world.wave, world.difficulty, world.game_over, world.game_win))
+    for ent in world.entities.values():
+        h.update(ent.id.encode())
+        h.update(ent.kind.encode())
+        h.update(_XY.pack(ent.x, ent.y))
+        h.update(str(ent.state.get("ai_state", "")).encode())
+    return _HASH.unpack(h.digest())[0]
+
+
+def _write_varint(f: BinaryIO, n: int) -> None:
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    f.write(out)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORDER
+# ═══════════════════════════════════════════════════════════════════════════════
+class InputRecorder:
+    """Appends input events for one world to a log file. Start it on a fresh world."""
+
+    def __init__(self, path: Path, world: World, hashes: bool = True) -> None:
+        self.f = open(path, "wb")
+        self.hashes = hashes
+        self.frame = 0
+        self._last_frame = 0
+        tuning = json.dumps({name: getattr(world, name) for name in TUNING_FIELDS}).encode()
+        self.f.write(MAGIC)
+        self.f.write(bytes([VERSION]))
+        self.f.write(_HEADER.pack(world.seed & (2 ** 64 - 1), world.width, world.height))
+        _write_varint(self.f, len(tuning))
+        self.f.write(tuning)
+
+    def _record(self, kind: int, payload: bytes = b"") -> None:
+        _write_varint(self.f, self.frame - self._last_frame)
+        self._last_frame = self.frame
+        self.f.write(bytes([kind]))
+        if payload:
+            self.f.write(payload)
+
+    def key(self, keysym: str, pressed: bool) -> None:
+        """Log a key event; keys the game ignores aren't recorded."""
+        code = KEY_CODES.get(keysym if keysym in KEY_CODES else keysym.lower())
+        if code is not None:
+            self._record((EV_PRESS if pressed else EV_RELEASE) | code)
+
+    def reset(self) -> None:
+        self._record(EV_RESET)
+
+    def step_done(self, world: World) -> None:
+        """Call after every step()."""
+        self.frame += 1
+        if self.hashes:
+            self._record(EV_HASH, _HASH.pack(world_hash(world)))
+
+    def close(self) -> None:
+        if not self.f.closed:
+            self._record(EV_END)
+            self.f.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REPLAYER
+# ═══════════════════════════════════════════════════════════════════════════════
+@dataclass
+class ReplayResult:
+    frames: int
+    hashes_checked: int
+    first_mismatch: Optional[int]  # Frame of the first hash mismatch, if any
+    elapsed: float
+    world: World
+
+
+def replay(path: Path, verify: bool = True, stop_on_mismatch: bool = True) -> ReplayResult:
+    """Re-run a recorded game headlessly as fast as possible."""
+    data = Path(path).read_bytes()
+    if data[:4] != MAGIC:
+        raise ReplayError("Not an input log (bad magic)")
+    if data[4] != VERSION:
+        raise ReplayError(f"Unsupported input log version {data[4]}")
+    seed, width, height = _HEADER.unpack_from(data, 5)
+    pos = 5 + _HEADER.size
+
+    def varint() -> int:
+        nonlocal pos
+        result = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    n = varint()
+    tuning = json.loads(data[pos:pos + n])
+    pos += n
+
+    world = create_world(width, height, seed=seed)
+    for name, value in tuning.items():
+        setattr(world, name, value)
+    rebuild_relations(world)
+
+    frame = 0
+    checked = 0
+    mismatch: Optional[int] = None
+    started = time.perf_counter()
+    while pos < len(data):
+        target = frame + varint()
+        kind = data[pos]
+        pos += 1
+        while frame < target:
+            step(world)
+            frame += 1
+        if kind == EV_HASH:
+            (expected,) = _HASH.unpack_from(data, pos)
+            pos += _HASH.size
+            if verify:
+                checked += 1
+                if mismatch is None and world_hash(world) != expected:
+                    mismatch = frame
+                    if stop_on_mismatch:
+                        break
+        elif kind == EV_RESET:
+            reset_world(world, width, height)
+        elif kind == EV_END:
+            break
+        elif kind & 0xF0 in (EV_PRESS, EV_RELEASE) and (kind & 0x0F) in KEY_NAMES:
+            keysym = KEY_NAMES[kind & 0x0F]
+            if kind & 0xF0 == EV_PRESS:
+                handle_key_press(world, keysym)
+            else:
+                handle_key_release(world, keysym)
+        else:
+            raise ReplayError(f"Unknown record type {kind:#x} at offset {pos - 1}")
+    return ReplayResult(frame, checked, mismatch, time.perf_counter() - started, world)
+
+
+def record_scripted(path: Path, seed: int, policy_name: str, ticks: int) -> int:
+    """Record a headless game driven by a batch.py policy; returns frames recorded."""
+    import random
+
+    from batch import POLICIES
+
+    random.seed(seed)
+    policy = POLICIES[policy_name]
+    world = create_world(700, 500, seed=seed)
+    recorder = InputRecorder(path, world)
+    try:
+        for _ in range(ticks):
+            for keysym in policy(world):
+                handle_key_press(world, keysym)
+                recorder.key(keysym, pressed=True)
+            step(world)
+            recorder.step_done(world)
+            if world.game_over or world.game_win:
+                reset_world(world, 700, 500)
+                recorder.reset()
+    finally:
+        recorder.close()
+    return recorder.frame
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Record or replay input logs.")
+    sub = p.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Record a scripted headless game.")
+    rec.add_argument("path", type=Path)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--policy", default="greedy")
+    rec.add_argument("--ticks", type=int, default=3000)
+    play = sub.add_parser("play", help="Replay a log at full speed.")
+    play.add_argument("path", type=Path)
+    play.add_argument("--no-verify", action="store_true", help="Skip per-tick hash checks.")
+    play.add_argument("--profile", action="store_true", help="Run under cProfile and print hot spots.")
+    args = p.parse_args()
+
+    if args.command == "record":
+        frames = record_scripted(args.path, args.seed, args.policy, args.ticks)
+        print(f"Recorded {frames} frames to {args.path} ({args.path.stat().st_size} bytes)")
+        return
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    result = replay(args.path, verify=not args.no_verify)
+    if profiler:
+        profiler.disable()
+    rate = result.frames / max(result.elapsed, 1e-9)
+    print(f"Replayed {result.frames} frames in {result.elapsed:.2f}s ({rate:.0f} ticks/s)")
+    if result.first_mismatch is None:
+        print(f"OK - {result.hashes_checked} tick hashes matched")
+    else:
+        print(f"MISMATCH at frame {result.first_mismatch}")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+
+
+if __name__ == "__main__":
+    main()
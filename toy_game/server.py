@@ -0,0 +1,481 @@
+"""
+asyncio simulation server - many worlds, one process, one fixed-timestep clock.
+
+Run:
+  python toy_game/server.py serve --port 8765            # or --unix /tmp/rpe.sock
+  python toy_game/server.py loadgen --port 8765 --clients 200 --worlds 20
+  python toy_game/server.py bench --clients 200 --worlds 20 --duration 10
+
+Wire format: every message is a u32 little-endian length followed by the
+payload. Client -> server payloads start with a type byte:
+  b"J" + world name   join (the world is created on first join)
+  b"P" + keysym       key press   (same keys as the Tk UI, incl. space/s)
+  b"R" + keysym       key release
+  b"A" + count        ack: frames read since the last join, as ASCII digits
+Server -> client payloads are delta.py frames for the joined world, one per
+tick that world is stepped.
+
+Scheduling: one coroutine steps every world each `tick_ms`. Inputs are
+queued and applied just before their world's next step, so a world only
+ever sees inputs between ticks. Stepping is capped at `budget` x tick
+period per round; worlds that don't fit are picked up first next round
+(they run slower rather than delaying everyone). A round that overruns the
+period doesn't try to catch up.
+
+Backpressure: each client has a small bounded frame queue drained by its
+own writer task. When it is full the frame is dropped, the client is
+marked for resync and only resumes at the next keyframe, which its world's
+encoder is asked to emit early - a slow reader costs bandwidth, never
+server memory or tick time.
+
+The queue alone doesn't bound how stale a client's view gets: frames are
+tiny, so the kernel socket buffers on both ends soak up hundreds of them and
+the queue never fills. Clients that send acks are therefore also held to
+`max_lag` frames in flight (sent minus acked). Past that the server stops
+sending and marks the client for resync; once its acks catch up, a keyframe
+is requested and it resumes from the current tick. A client reading r
+frames/s then sees at most about max_lag * tick rate / r ticks of lag,
+however long it stays connected. The keyframe is shared by the world's
+encoder, so each such resync costs every viewer of that world one early
+keyframe. Clients that never ack only get the queue limit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from delta import FRAME_KEY, DeltaDecoder, DeltaEncoder, DeltaError
+from main import (
+    World,
+    create_world,
+    handle_key_press,
+    handle_key_release,
+    reset_world,
+    stable_hash,
+    step,
+)
+
+_LEN = struct.Struct("<I")
+MAX_MESSAGE = 1 << 16  # Client messages are tiny; anything bigger is a broken client
+MSG_JOIN, MSG_PRESS, MSG_RELEASE, MSG_ACK = ord("J"), ord("P"), ord("R"), ord("A")
+INPUT_KEYS = ("Up", "Down", "Left", "Right", "space", "s")
+
+
+async def read_message(reader: asyncio.StreamReader, limit: int = MAX_MESSAGE) -> bytes:
+    (n,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    if n > limit:
+        raise ValueError(f"Message of {n} bytes exceeds limit of {limit}")
+    return await reader.readexactly(n)
+
+
+def write_message(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(_LEN.pack(len(payload)) + payload)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SERVER
+# ═══════════════════════════════════════════════════════════════════════════════
+@dataclass(eq=False)
+class Client:
+    """One connection: bounded outgoing queue plus resync and lag state."""
+    writer: asyncio.StreamWriter
+    queue: asyncio.Queue
+    hosted: Optional["HostedWorld"] = None
+    resync: bool = True  # Waiting for a keyframe before frames make sense
+    dropped: int = 0
+    sent: int = 0  # Frames queued since the last join
+    acked: Optional[int] = None  # Frames the client says it has read; None until it first acks
+
+    def lag(self) -> int:
+        """Frames sent but not yet acked (0 for clients that don't ack)."""
+        return 0 if self.acked is None else self.sent - self.acked
+
+
+@dataclass(eq=False)
+class HostedWorld:
+    name: str
+    world: World
+    encoder: DeltaEncoder
+    clients: Set[Client] = field(default_factory=set)
+    inputs: List[Tuple[str, bool]] = field(default_factory=list)
+
+
+@dataclass
+class ServerStats:
+    rounds: int = 0
+    world_steps: int = 0
+    step_seconds: float = 0.0
+    deferred: int = 0  # World steps pushed to a later round by the budget cap
+    overruns: int = 0  # Rounds that ran past their tick period
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    lag_resyncs: int = 0  # Times a client fell max_lag frames behind and was cut off
+    bytes_queued: int = 0
+
+
+class SimulationServer:
+    def __init__(self, tick_ms: float = 40.0, budget: float = 0.75, max_worlds: int = 256,
+                 queue_frames: int = 8, keyframe_interval: int = 50, write_buffer: int = 16384,
+                 max_lag: int = 8, width: int = 700, height: int = 500) -> None:
+        self.tick_s = tick_ms / 1000.0
+        self.budget_s = self.tick_s * budget
+        self.max_worlds = max_worlds
+        self.queue_frames = queue_frames
+        self.keyframe_interval = keyframe_interval
+        self.write_buffer = write_buffer
+        self.max_lag = max_lag
+        self.width = width
+        self.height = height
+        self.worlds: Dict[str, HostedWorld] = {}
+        self.stats = ServerStats()
+        self.connections: Set[Client] = set()
+        self._order: List[str] = []  # Round-robin order of world names
+        self._cursor = 0
+
+    # --- Worlds -----------------------------------------------------------
+    def get_world(self, name: str) -> Optional[HostedWorld]:
+        hosted = self.worlds.get(name)
+        if hosted is None and len(self.worlds) < self.max_worlds:
+            world = create_world(self.width, self.height, seed=stable_hash(name))
+            hosted = HostedWorld(name, world, DeltaEncoder(self.keyframe_interval))
+            self.worlds[name] = hosted
+            self._order.append(name)
+        return hosted
+
+    def _step_world(self, hosted: HostedWorld) -> None:
+        world = hosted.world
+        for keysym, pressed in hosted.inputs:
+            if pressed:
+                handle_key_press(world, keysym)
+            else:
+                handle_key_release(world, keysym)
+        hosted.inputs.clear()
+        if world.game_over or world.game_win:
+            world.game_over = False
+            world.game_win = False
+            reset_world(world, self.width, self.height)
+        step(world)
+        if hosted.clients:
+            self._publish(hosted, hosted.encoder.encode(world))
+
+    def _publish(self, hosted: HostedWorld, frame: bytes) -> None:
+        is_key = frame[0] == FRAME_KEY
+        for client in hosted.clients:
+            if client.lag() >= self.max_lag:
+                # Its acks will request a keyframe once it has caught up
+                if not client.resync:
+                    client.resync = True
+                    self.stats.lag_resyncs += 1
+                client.dropped += 1
+                self.stats.frames_dropped += 1
+                continue
+            if client.resync and not is_key:
+                continue
+            try:
+                client.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                client.dropped += 1
+                client.resync = True
+                hosted.encoder.request_keyframe()
+                self.stats.frames_dropped += 1
+                continue
+            client.resync = False
+            client.sent += 1
+            self.stats.frames_sent += 1
+            self.stats.bytes_queued += len(frame)
+
+    # --- Scheduler --------------------------------------------------------
+    def run_round(self) -> None:
+        """Step each world once, stopping early when the budget is spent."""
+        started = time.perf_counter()
+        count = len(self._order)
+        stepped = 0
+        while stepped < count:
+            if stepped and time.perf_counter() - started > self.budget_s:
+                self.stats.deferred += count - stepped
+                break
+            name = self._order[self._cursor % count]
+            self._cursor = (self._cursor + 1) % count
+            self._step_world(self.worlds[name])
+            stepped += 1
+        self.stats.world_steps += stepped
+        self.stats.step_seconds += time.perf_counter() - started
+        self.stats.rounds += 1
+
+    async def run_scheduler(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            if self._order:
+                self.run_round()
+            deadline += self.tick_s
+            delay = deadline - loop.time()
+            if delay < 0:
+                self.stats.overruns += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    # --- Connections ------------------------------------------------------
+    async def _drain(self, client: Client) -> None:
+        while True:
+            frame = await client.queue.get()
+            write_message(client.writer, frame)
+            await client.writer.drain()
+
+    def _leave(self, client: Client) -> None:
+        if client.hosted:
+            client.hosted.clients.discard(client)
+            client.hosted = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        client = Client(writer, asyncio.Queue(maxsize=self.queue_frames))
+        self.connections.add(client)
+        sender = asyncio.create_task(self._drain(client))
+        try:
+            while True:
+                msg = await read_message(reader)
+                if not msg:
+                    continue
+                kind, body = msg[0], msg[1:].decode("utf-8", "replace")
+                if kind == MSG_JOIN:
+                    self._leave(client)
+                    hosted = self.get_world(body)
+                    if hosted is None:
+                        break  # World cap reached
+                    client.hosted = hosted
+                    client.resync = True
+                    client.sent = 0
+                    client.acked = None
+                    hosted.clients.add(client)
+                    hosted.encoder.request_keyframe()
+                elif kind in (MSG_PRESS, MSG_RELEASE) and client.hosted:
+                    client.hosted.inputs.append((body, kind == MSG_PRESS))
+                elif kind == MSG_ACK and client.hosted:
+                    client.acked = int(body)
+                    if client.resync and client.lag() < self.max_lag:
+                        client.hosted.encoder.request_keyframe()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._leave(client)
+            self.connections.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix: Optional[str] = None):
+        """Start listening and the scheduler; returns (server, scheduler task)."""
+        if unix:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+        return server, asyncio.create_task(self.run_scheduler())
+
+    async def wait_disconnected(self, timeout: float = 2.0) -> None:
+        """Give handlers a moment to see their peers hang up (clean shutdown)."""
+        loop = asyncio.get_running_loop()
+        stop_at = loop.time() + timeout
+        while self.connections and loop.time() < stop_at:
+            await asyncio.sleep(0.02)
+
+    def report(self, elapsed: float) -> str:
+        s = self.stats
+        avg_ms = s.step_seconds / max(s.rounds, 1) * 1000
+        return (f"{len(self.worlds)} worlds, {len(self.connections)} connections | {s.rounds} rounds "
+                f"({s.rounds / max(elapsed, 1e-9):.1f}/s), {s.world_steps} world steps, "
+                f"{avg_ms:.2f} ms/round of {self.budget_s * 1000:.0f} ms budget | "
+                f"deferred {s.deferred}, overruns {s.overruns} | frames sent {s.frames_sent}, "
+                f"dropped {s.frames_dropped}, lag resyncs {s.lag_resyncs}, {s.bytes_queued / max(elapsed, 1e-9) / 1024:.0f} KiB/s")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOAD GENERATOR - fake clients
+# ═══════════════════════════════════════════════════════════════════════════════
+@dataclass
+class ClientStats:
+    frames: int = 0
+    keyframes: int = 0
+    bytes: int = 0
+    inputs: int = 0
+    decode_errors: int = 0
+    lag_samples: int = 0  # Frames whose tick lag was measured (needs world_tick)
+    lag_total: int = 0
+    lag_max: int = 0
+
+
+async def fake_client(connect, world_name: str, duration: float, read_delay: float,
+                      seed: int, stats: ClientStats,
+                      world_tick: Optional[Callable[[str], Optional[int]]] = None) -> None:
+    """Join a world, mash keys like random_policy and decode everything received.
+
+    Every frame read is acked. With `world_tick` (the server's current tick for
+    a world, only available in-process) each frame also records how many ticks
+    behind the live world it was when read; samples spanning a world reset are
+    skipped.
+    """
+    rng = random.Random(seed)
+    reader, writer = await connect()
+    write_message(writer, b"J" + world_name.encode())
+    decoder = DeltaDecoder()
+    stop_at = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < stop_at:
+            frame = await asyncio.wait_for(read_message(reader, limit=1 << 26), timeout=5)
+            stats.frames += 1
+            stats.bytes += len(frame)
+            if frame[0] == FRAME_KEY:
+                stats.keyframes += 1
+            write_message(writer, b"A" + str(stats.frames).encode())
+            try:
+                view = decoder.apply(frame)
+            except DeltaError:
+                stats.decode_errors += 1
+            else:
+                live = world_tick(world_name) if world_tick else None
+                if live is not None and live >= view.tick:
+                    lag = live - view.tick
+                    stats.lag_samples += 1
+                    stats.lag_total += lag
+                    stats.lag_max = max(stats.lag_max, lag)
+            if rng.random() < 0.1:
+                key = rng.choice(INPUT_KEYS)
+                write_message(writer, b"P" + key.encode())
+                stats.inputs += 1
+            if read_delay:
+                await asyncio.sleep(read_delay)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(connect, clients: int, worlds: int, duration: float, slow_fraction: float,
+                   slow_delay: float, seed: int,
+                   world_tick: Optional[Callable[[str], Optional[int]]] = None) -> List[Tuple[bool, ClientStats]]:
+    results: List[Tuple[bool, ClientStats]] = []
+    tasks = []
+    for i in range(clients):
+        slow = i < int(clients * slow_fraction)
+        stats = ClientStats()
+        results.append((slow, stats))
+        tasks.append(fake_client(connect, f"world-{i % worlds}", duration,
+                                 slow_delay if slow else 0.0, seed + i, stats, world_tick))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def summarize_load(results: List[Tuple[bool, ClientStats]], duration: float) -> str:
+    lines = []
+    for label, slow in (("fast", False), ("slow", True)):
+        group = [s for is_slow, s in results if is_slow == slow]
+        if not group:
+            continue
+        n = len(group)
+        line = (
+            f"  {label} clients: {n}, {sum(s.frames for s in group) / n / duration:.1f} frames/s each, "
+            f"{sum(s.keyframes for s in group) / n:.1f} keyframes each, "
+            f"{sum(s.bytes for s in group) / duration / 1024:.0f} KiB/s total, "
+            f"{sum(s.inputs for s in group)} inputs, {sum(s.decode_errors for s in group)} decode errors"
+        )
+        samples = sum(s.lag_samples for s in group)
+        if samples:
+            worst = sorted(s.lag_max for s in group)
+            line += (f" | tick lag mean {sum(s.lag_total for s in group) / samples:.1f}, "
+                     f"per-client max median {worst[len(worst) // 2]} / worst {worst[-1]}")
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _connector(host: str, port: int, unix: Optional[str]):
+    if unix:
+        return lambda: asyncio.open_unix_connection(unix)
+    return lambda: asyncio.open_connection(host, port)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ═══════════════════════════════════════════════════════════════════════════════
+def _server_from_args(args) -> SimulationServer:
+    return SimulationServer(tick_ms=args.tick_ms, budget=args.budget, max_worlds=args.max_worlds,
+                            queue_frames=args.queue_frames, keyframe_interval=args.keyframe_interval,
+                            write_buffer=args.write_buffer, max_lag=args.max_lag)
+
+
+async def _serve(args) -> None:
+    server = _server_from_args(args)
+    listener, scheduler = await server.serve(args.host, args.port, args.unix)
+    print(f"Listening on {args.unix or f'{args.host}:{args.port}'}")
+    started = time.perf_counter()
+    async with listener:
+        while True:
+            await asyncio.sleep(args.report_every)
+            print(server.report(time.perf_counter() - started))
+
+
+async def _loadgen(args) -> None:
+    results = await run_load(_connector(args.host, args.port, args.unix), args.clients, args.worlds,
+                             args.duration, args.slow_fraction, args.slow_delay, args.seed)
+    print(summarize_load(results, args.duration))
+
+
+async def _bench(args) -> None:
+    server = _server_from_args(args)
+    listener, scheduler = await server.serve(args.host, args.port, args.unix)
+    started = time.perf_counter()
+
+    def world_tick(name: str) -> Optional[int]:
+        hosted = server.worlds.get(name)
+        return hosted.world.tick if hosted else None
+
+    async with listener:
+        results = await run_load(_connector(args.host, args.port, args.unix), args.clients, args.worlds,
+                                 args.duration, args.slow_fraction, args.slow_delay, args.seed, world_tick)
+        elapsed = time.perf_counter() - started
+        await server.wait_disconnected()
+        scheduler.cancel()
+    print(server.report(elapsed))
+    print(summarize_load(results, args.duration))
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Host many worlds behind an asyncio socket server.")
+    sub = p.add_subparsers(dest="command", required=True)
+    for name in ("serve", "loadgen", "bench"):
+        sp = sub.add_parser(name)
+        sp.add_argument("--host", default="127.0.0.1")
+        sp.add_argument("--port", type=int, default=8765)
+        sp.add_argument("--unix", default=None, help="Unix socket path instead of TCP.")
+        if name in ("serve", "bench"):
+            sp.add_argument("--tick-ms", type=float, default=40.0)
+            sp.add_argument("--budget", type=float, default=0.75, help="Fraction of the tick period spent stepping.")
+            sp.add_argument("--max-worlds", type=int, default=256)
+            sp.add_argument("--queue-frames", type=int, default=8, help="Per-client outgoing frame queue.")
+            sp.add_argument("--keyframe-interval", type=int, default=50)
+            sp.add_argument("--write-buffer", type=int, default=16384, help="Per-client transport high-water mark.")
+            sp.add_argument("--max-lag", type=int, default=8, help="Unacked frames before a client is resynced.")
+            sp.add_argument("--report-every", type=float, default=5.0)
+        if name in ("loadgen", "bench"):
+            sp.add_argument("--clients", type=int, default=100)
+            sp.add_argument("--worlds", type=int, default=10)
+            sp.add_argument("--duration", type=float, default=10.0)
+            sp.add_argument("--slow-fraction", type=float, default=0.1, help="Share of clients that read slowly.")
+            sp.add_argument("--slow-delay", type=float, default=0.2, help="Seconds a slow client waits per frame.")
+            sp.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    runner = {"serve": _serve, "loadgen": _loadgen, "bench": _bench}[args.command]
+    try:
+        asyncio.run(runner(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
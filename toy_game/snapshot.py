@@ -0,0 +1,375 @@
+"""
+Compact binary World snapshots - checkpoint, restore and roll back.
+
+Run:
+  python toy_game/snapshot.py --entities 1000     # throughput/size vs pickle
+
+Format (little-endian):
+  b"RPSN" | version byte | World field names | World field values
+
+Values are tagged and written in a single pass. Strings are interned: the
+first occurrence is written in full, later ones as a varint back-reference,
+which collapses the entity ids repeated across relations, memories and
+counters. Entity/Relation/Wall get dedicated record tags so positions are
+raw float64 rather than generic values. Tuples stay tuples (memory entries,
+patrol points, dash_direction), so a restored World steps exactly like the
+original.
+
+VERSION changes whenever a tag or a World field is added:
+
+  1  entities, relations, walls and scalar World fields
+  2  T_EVENT (events), T_TIMERS (timers), T_TACTICS (tactics), lookahead
+  3  T_CHANGES (changes): the ChangeLog's clock, field versions and the
+     versions each skippable rule last ran on, so a restored world skips
+     the same rules (and reports the same GCO work) as the original
+
+Version 1 snapshots are rejected rather than loaded: their cooldowns and
+timed effects were entity counters the engine no longer polls, and loading
+them would silently drop every pending timer. Version 2 snapshots load with
+an empty ChangeLog: the first tick after loading runs every rule, which
+gives the same world, only with more GCO work.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import struct
+import time
+from collections import deque
+from dataclasses import fields, replace
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from main import ChangeLog, Entity, EventBus, GameEvent, Relation, TacticalMap, TimerWheel, Wall, World, step
+
+MAGIC = b"RPSN"
+VERSION = 3  # Bump when adding a tag or a World field (see the module docstring)
+
+# Value tags
+T_NONE, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_STR_REF = range(7)
+T_LIST, T_TUPLE, T_DICT, T_ENTITY, T_RELATION, T_WALL, T_EVENT, T_TIMERS, T_TACTICS, T_CHANGES = range(7, 17)
+
+_DOUBLE = struct.Struct("<d")
+_XY = struct.Struct("<dd")
+_WALL = struct.Struct("<dddd")
+
+# Transient per-tick fields and live subscribers are never part of a checkpoint
+_SKIPPED_FIELDS = {"previous", "event_bus", "scratch"}
+OLDEST_VERSION = 2  # Oldest version load_world() still reads
+
+
+class SnapshotError(ValueError):
+    """Raised when snapshot bytes are not a valid World snapshot."""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENCODER
+# ═══════════════════════════════════════════════════════════════════════════════
+class _Writer:
+    def __init__(self) -> None:
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, n: int) -> None:
+        out = self.out
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def string(self, s: str) -> None:
+        ref = self.strings.get(s)
+        if ref is not None:
+            self.out.append(T_STR_REF)
+            self.varint(ref)
+            return
+        self.strings[s] = len(self.strings)
+        raw = s.encode("utf-8")
+        self.out.append(T_STR)
+        self.varint(len(raw))
+        self.out += raw
+
+    def value(self, v: Any) -> None:
+        out = self.out
+        t = type(v)
+        if t is float:
+            out.append(T_FLOAT)
+            out += _DOUBLE.pack(v)
+        elif t is str:
+            self.string(v)
+        elif t is int:
+            out.append(T_INT)
+            self.varint((v << 1) if v >= 0 else ((-v << 1) - 1))  # Zigzag
+        elif t is tuple or t is list:
+            out.append(T_TUPLE if t is tuple else T_LIST)
+            self.varint(len(v))
+            for item in v:
+                self.value(item)
+        elif t is dict:
+            out.append(T_DICT)
+            self.varint(len(v))
+            for key, item in v.items():
+                self.value(key)
+                self.value(item)
+        elif v is None:
+            out.append(T_NONE)
+        elif t is bool:
+            out.append(T_TRUE if v else T_FALSE)
+        elif t is Entity:
+            out.append(T_ENTITY)
+            self.string(v.id)
+            self.string(v.kind)
+            self.string(v.color)
+            out += _XY.pack(v.x, v.y)
+            self.value(v.state)
+        elif t is Relation:
+            out.append(T_RELATION)
+            self.string(v.primitive)
+            self.string(v.source)
+            self.value(v.target)
+            self.value(v.payload)
+        elif t is Wall:
+            out.append(T_WALL)
+            out += _WALL.pack(v.x1, v.y1, v.x2, v.y2)
+        elif t is GameEvent:
+            out.append(T_EVENT)
+            self.string(v.kind)
+            self.value(v.tick)
+            self.value(v.ids)
+            self.value(v.values)
+            self.string(v.detail)
+        elif t is TimerWheel:
+            out.append(T_TIMERS)
+            self.value(v.now)
+            self.value(v.pending())
+        elif t is TacticalMap:
+            out.append(T_TACTICS)
+            self.value(v.food_sources)
+            self.value(v.heat)
+            self.value(v.heat_scale)
+        elif t is ChangeLog:
+            out.append(T_CHANGES)
+            self.value(v.clock)
+            self.value(v.versions)
+            self.value(v.seen)
+        else:
+            raise TypeError(f"Cannot snapshot value of type {t.__name__}")
+
+
+def _world_fields() -> List[str]:
+    return [f.name for f in fields(World) if f.name not in _SKIPPED_FIELDS]
+
+
+def dump_world(world: World) -> bytes:
+    """Serialize a World (between ticks) to snapshot bytes."""
+    w = _Writer()
+    w.out += MAGIC
+    w.out.append(VERSION)
+    names = _world_fields()
+    w.value(names)
+    for name in names:
+        w.value(getattr(world, name))
+    return bytes(w.out)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DECODER
+# ═══════════════════════════════════════════════════════════════════════════════
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+        self.strings: List[str] = []
+
+    def varint(self) -> int:
+        data = self.data
+        result = shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def value(self) -> Any:
+        data = self.data
+        tag = data[self.pos]
+        self.pos += 1
+        if tag == T_FLOAT:
+            (v,) = _DOUBLE.unpack_from(data, self.pos)
+            self.pos += 8
+            return v
+        if tag == T_STR_REF:
+            return self.strings[self.varint()]
+        if tag == T_STR:
+            n = self.varint()
+            s = data[self.pos:self.pos + n].decode("utf-8")
+            self.pos += n
+            self.strings.append(s)
+            return s
+        if tag == T_INT:
+            z = self.varint()
+            return (z >> 1) if not z & 1 else -((z + 1) >> 1)
+        if tag == T_TUPLE:
+            return tuple([self.value() for _ in range(self.varint())])
+        if tag == T_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == T_DICT:
+            n = self.varint()
+            out = {}
+            for _ in range(n):
+                key = self.value()
+                out[key] = self.value()
+            return out
+        if tag == T_NONE:
+            return None
+        if tag == T_FALSE:
+            return False
+        if tag == T_TRUE:
+            return True
+        if tag == T_ENTITY:
+            eid, kind, color = self.value(), self.value(), self.value()
+            x, y = _XY.unpack_from(data, self.pos)
+            self.pos += 16
+            return Entity(eid, kind, color, x, y, self.value())
+        if tag == T_RELATION:
+            return Relation(self.value(), self.value(), self.value(), self.value())
+        if tag == T_WALL:
+            wall = Wall(*_WALL.unpack_from(data, self.pos))
+            self.pos += 32
+            return wall
+        if tag == T_EVENT:
+            return GameEvent(self.value(), self.value(), self.value(), self.value(), self.value())
+        if tag == T_TIMERS:
+            wheel = TimerWheel(self.value())
+            for due, kind, eid in self.value():
+                wheel.schedule(due, kind, eid)
+            return wheel
+        if tag == T_TACTICS:
+            return TacticalMap.restore(self.value(), self.value(), self.value())
+        if tag == T_CHANGES:
+            log = ChangeLog()
+            log.clock, log.versions, log.seen = self.value(), self.value(), self.value()
+            return log
+        raise SnapshotError(f"Unknown tag {tag} at offset {self.pos - 1}")
+
+
+def load_world(data: bytes) -> World:
+    """Rebuild a ready-to-step World from snapshot bytes."""
+    if data[:4] != MAGIC:
+        raise SnapshotError("Not a world snapshot (bad magic)")
+    if data[4] < OLDEST_VERSION:
+        raise SnapshotError(f"Snapshot version {data[4]} predates timers and tactical maps "
+                            f"(current {VERSION}); re-record it")
+    if data[4] > VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {data[4]}")
+    r = _Reader(data)
+    r.pos = 5
+    try:
+        names = r.value()
+        values = {name: r.value() for name in names}
+    except (IndexError, struct.error) as exc:
+        raise SnapshotError("Truncated snapshot") from exc
+    known = set(_world_fields())
+    return World(**{k: v for k, v in values.items() if k in known})
+
+
+def dump_value(value: Any) -> bytes:
+    """Encode any snapshot-able value (e.g. a list of Entities) without a header."""
+    w = _Writer()
+    w.value(value)
+    return bytes(w.out)
+
+
+def load_value(data: bytes) -> Any:
+    try:
+        return _Reader(data).value()
+    except (IndexError, struct.error) as exc:
+        raise SnapshotError("Truncated value") from exc
+
+
+def save_world(world: World, path: Path) -> int:
+    """Write a snapshot file; returns its size in bytes."""
+    data = dump_world(world)
+    Path(path).write_bytes(data)
+    return len(data)
+
+
+def read_world(path: Path) -> World:
+    return load_world(Path(path).read_bytes())
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHECKPOINT RING - roll back to earlier ticks
+# ═══════════════════════════════════════════════════════════════════════════════
+class CheckpointRing:
+    """Keeps the last `capacity` snapshots, one every `every` ticks."""
+
+    def __init__(self, capacity: int = 32, every: int = 25) -> None:
+        self.every = every
+        self.snapshots: Deque[Tuple[int, bytes]] = deque(maxlen=capacity)
+
+    def record(self, world: World) -> None:
+        """Call after step(); snapshots on every `every`th tick."""
+        if world.tick % self.every == 0:
+            self.snapshots.append((world.tick, dump_world(world)))
+
+    def rollback(self, tick: int) -> Optional[World]:
+        """Restore the newest checkpoint at or before `tick`, dropping later ones."""
+        while self.snapshots and self.snapshots[-1][0] > tick:
+            self.snapshots.pop()
+        if not self.snapshots:
+            return None
+        return load_world(self.snapshots[-1][1])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════════════════════════════
+def _timed(fn, repeat: int) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    from parallel import crowded_world
+
+    p = argparse.ArgumentParser(description="Benchmark world snapshots against pickle.")
+    p.add_argument("--entities", type=int, default=1000)
+    p.add_argument("--warmup-ticks", type=int, default=5, help="Ticks to run first so memories fill in.")
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    world = crowded_world(args.entities, args.seed, double_buffered=False)
+    for _ in range(args.warmup_ticks):
+        step(world)
+
+    data, dump_s = _timed(lambda: dump_world(world), args.repeat)
+    restored, load_s = _timed(lambda: load_world(data), args.repeat)
+    # Pickle what the snapshot keeps (_SKIPPED_FIELDS left at their empty values)
+    baseline = replace(world, previous=None, event_bus=EventBus(), scratch=None)
+    pickled, pdump_s = _timed(lambda: pickle.dumps(baseline, protocol=pickle.HIGHEST_PROTOCOL), args.repeat)
+    _, pload_s = _timed(lambda: pickle.loads(pickled), args.repeat)
+
+    assert restored == world, "round trip changed the world"
+    step(world)
+    step(restored)
+    assert restored == world, "restored world diverged after a step"
+
+    mb = len(data) / 1e6
+    print(f"{len(world.entities)} entities, {len(world.relations)} relations")
+    print(f"  snapshot: {len(data):>9} bytes  dump {dump_s * 1000:7.2f} ms ({mb / dump_s:6.1f} MB/s)  "
+          f"load {load_s * 1000:7.2f} ms ({mb / load_s:6.1f} MB/s)")
+    pmb = len(pickled) / 1e6
+    print(f"  pickle:   {len(pickled):>9} bytes  dump {pdump_s * 1000:7.2f} ms ({pmb / pdump_s:6.1f} MB/s)  "
+          f"load {pload_s * 1000:7.2f} ms ({pmb / pload_s:6.1f} MB/s)")
+    print(f"  size ratio snapshot/pickle: {len(data) / len(pickled):.2f}")
+
+
+if __name__ == "__main__":
+    main()